@@ -0,0 +1,94 @@
+# benchmarks/bench_ignore.py
+
+"""
+Compare IgnoreRules with ``git check-ignore --stdin`` on a synthetic monorepo.
+
+Creates a git worktree with many packages (200 by default), each with its own
+``.gitignore`` (build outputs, caches, a re-included file) next to a root
+``.gitignore`` and ``.git/info/exclude``, then asks both implementations
+which of the files are ignored.  Reports wall time for git, for a cold
+IgnoreRules (every ``.gitignore`` read and compiled) and for a warm one (the
+daemon/GUI case), and exits non-zero if the two disagree on any path.
+
+Usage::
+
+    python benchmarks/bench_ignore.py [--packages N] [--files-per-dir F]
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from reposnap.core.ignore import IgnoreRules
+
+ROOT_GITIGNORE = "*.log\n__pycache__/\nnode_modules/\n/dist\n.env\n"
+PACKAGE_GITIGNORE = "build/\n*.tmp\n!keep.tmp\ncoverage/\n/generated/*.py\n"
+DIRS = ["src", "src/core", "build", "build/lib", "coverage", "generated", "tests"]
+NAMES = ["mod.py", "data.tmp", "keep.tmp", "run.log", "notes.md"]
+
+
+def make_monorepo(root: Path, packages: int, files_per_dir: int) -> List[str]:
+    """Create the tree and return every file path (POSIX, relative)."""
+    paths = []
+    (root / ".gitignore").write_text(ROOT_GITIGNORE)
+    for p in range(packages):
+        package = root / f"pkg{p:04d}"
+        package.mkdir()
+        (package / ".gitignore").write_text(PACKAGE_GITIGNORE)
+        for rel_dir in DIRS:
+            (package / rel_dir).mkdir(parents=True, exist_ok=True)
+            for i in range(files_per_dir):
+                name = f"{i}_{NAMES[i % len(NAMES)]}"
+                (package / rel_dir / name).touch()
+                paths.append(f"pkg{p:04d}/{rel_dir}/{name}")
+    subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+    (root / ".git" / "info" / "exclude").write_text("*.md\n")
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--packages", type=int, default=200)
+    parser.add_argument("--files-per-dir", type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp).resolve()
+        paths = make_monorepo(root, args.packages, args.files_per_dir)
+        print(f"{len(paths)} files, {args.packages + 1} .gitignore files")
+
+        start = time.perf_counter()
+        output = subprocess.run(
+            ["git", "check-ignore", "--no-index", "--stdin"],
+            cwd=root,
+            input="".join(f"{p}\n" for p in paths),
+            capture_output=True,
+            text=True,
+        ).stdout
+        git_seconds = time.perf_counter() - start
+        git_ignored = set(output.splitlines())
+
+        start = time.perf_counter()
+        rules = IgnoreRules.for_worktree(root)
+        ignored = {p for p in paths if rules.is_ignored(p)}
+        cold_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        warm = {p for p in paths if rules.is_ignored(p)}
+        warm_seconds = time.perf_counter() - start
+
+    print(f"{'implementation':<24} {'ms':>8} {'ignored':>8}")
+    print(f"{'git check-ignore':<24} {git_seconds * 1000:>8.1f} {len(git_ignored):>8}")
+    print(f"{'IgnoreRules (cold)':<24} {cold_seconds * 1000:>8.1f} {len(ignored):>8}")
+    print(f"{'IgnoreRules (warm)':<24} {warm_seconds * 1000:>8.1f} {len(warm):>8}")
+    if ignored != git_ignored or warm != git_ignored:
+        print("IgnoreRules disagrees with git check-ignore", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# benchmarks/bench_import_time.py
+
+"""
+Track the startup cost of the ``reposnap`` command.
+
+Runs a few short invocations in fresh interpreters under ``python -X
+importtime`` and reports wall time, total import time and which heavy
+optional modules (GitPython, pathspec, urwid) each one pulled in.  The
+script exits non-zero when a scenario imports a heavy module it should not,
+or exceeds ``--max-import-ms`` when given, so it can guard against
+regressions in CI.
+
+Usage::
+
+    python benchmarks/bench_import_time.py [--runs N] [--max-import-ms MS]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+HEAVY_MODULES = ("git", "pathspec", "urwid")
+
+_RUN_CLI = (
+    "import sys; sys.argv = ['reposnap'] + sys.argv[1:]\n"
+    "from reposnap.interfaces.cli import main\n"
+    "try:\n"
+    "    main()\n"
+    "except SystemExit:\n"
+    "    pass\n"
+)
+
+# name -> (python -c code, CLI arguments, heavy modules the scenario may use)
+SCENARIOS: Dict[str, Tuple[str, List[str], Set[str]]] = {
+    "import cli": ("import reposnap.interfaces.cli", [], set()),
+    "--help": (_RUN_CLI, ["--help"], set()),
+    "bad argument": (_RUN_CLI, ["--no-such-option"], set()),
+    "--structure-only": (
+        _RUN_CLI,
+        [".", "--structure-only", "--no-daemon", "-o", "out.md"],
+        set(),
+    ),
+}
+
+
+def make_repo(root: Path) -> None:
+    """A small git repository without .gitignore (nothing to match)."""
+    for i in range(20):
+        path = root / f"pkg{i % 4}" / f"module_{i}.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"x = {i}\n")
+    env = dict(os.environ, GIT_AUTHOR_NAME="b", GIT_AUTHOR_EMAIL="b@b")
+    env.update(GIT_COMMITTER_NAME="b", GIT_COMMITTER_EMAIL="b@b")
+    for cmd in (["git", "init", "-q"], ["git", "add", "."]):
+        subprocess.run(cmd, cwd=root, check=True, env=env)
+
+
+def parse_importtime(stderr: str) -> Tuple[float, Set[str]]:
+    """Return total import time (ms) and the imported top-level packages."""
+    total_us = 0
+    packages: Set[str] = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:") :].split("|")
+        total_us += int(self_us)
+        packages.add(name.strip().split(".")[0])
+    return total_us / 1000, packages
+
+
+def run_scenario(
+    code: str, argv: List[str], cwd: Path
+) -> Tuple[float, float, Set[str]]:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code, *argv],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    import_ms, packages = parse_importtime(proc.stderr)
+    return wall_ms, import_ms, packages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Best of N runs.")
+    parser.add_argument(
+        "--max-import-ms",
+        type=float,
+        help="Fail if any scenario spends longer than this importing.",
+    )
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_repo(root)
+        print(f"{'scenario':<18} {'wall ms':>9} {'import ms':>10}  heavy modules")
+        for name, (code, argv, allowed) in SCENARIOS.items():
+            results = [run_scenario(code, argv, root) for _ in range(args.runs)]
+            wall_ms = min(r[0] for r in results)
+            import_ms = min(r[1] for r in results)
+            heavy = sorted(set(HEAVY_MODULES) & results[0][2])
+            print(
+                f"{name:<18} {wall_ms:>9.1f} {import_ms:>10.1f}  "
+                f"{', '.join(heavy) or '-'}"
+            )
+            if set(heavy) - allowed:
+                failed = True
+            if args.max_import_ms is not None and import_ms > args.max_import_ms:
+                failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
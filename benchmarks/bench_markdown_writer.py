@@ -0,0 +1,133 @@
+# benchmarks/bench_markdown_writer.py
+
+"""
+Compare the streaming Markdown writer with the historical per-file append.
+
+Builds a synthetic tree (50k files by default), renders it with both writers
+and reports wall time plus the number of ``open`` calls observed through an
+audit hook.  When ``strace`` is available the run is repeated under
+``strace -c`` for exact ``openat``/``write``/``close`` syscall counts.
+
+Usage::
+
+    python benchmarks/bench_markdown_writer.py [--files N] [--buffer-size B]
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from reposnap.core.file_system import FileSystem
+from reposnap.core.markdown_generator import DEFAULT_BUFFER_SIZE, MarkdownGenerator
+
+
+class LegacyMarkdownGenerator(MarkdownGenerator):
+    """Reference implementation: reopen the output in append mode per file."""
+
+    def generate_markdown(self, tree_structure, files):
+        with self.output_file.open(mode="w", encoding="utf-8") as fh:
+            self._write_header(fh, tree_structure)
+        for rel_path in files:
+            abs_path = self.root_dir / rel_path
+            if not abs_path.exists():
+                continue
+            with abs_path.open(encoding="utf-8") as src:
+                content = src.read()
+            with self.output_file.open(mode="a", encoding="utf-8") as dst:
+                dst.write(self._render_section(abs_path, rel_path.as_posix(), content))
+
+
+WRITERS = {"legacy": LegacyMarkdownGenerator, "streaming": MarkdownGenerator}
+
+_open_calls = 0
+
+
+def _audit(event: str, args) -> None:
+    global _open_calls
+    if event == "open":
+        _open_calls += 1
+
+
+def make_tree(root: Path, count: int) -> List[Path]:
+    """Create *count* small files spread over 100 directories."""
+    files = []
+    for i in range(count):
+        rel = Path(f"pkg{i % 100:03d}") / f"module_{i}.py"
+        target = root / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(f"def f_{i}():\n    return {i}\n")
+        files.append(rel)
+    return files
+
+
+def run_writer(name: str, root: Path, files: List[Path], buffer_size: int) -> dict:
+    global _open_calls
+    output = root.parent / f"{name}.md"
+    tree = FileSystem(root).build_tree_structure(files)
+    kwargs = {"buffer_size": buffer_size} if name == "streaming" else {}
+    generator = WRITERS[name](root_dir=root, output_file=output, **kwargs)
+    _open_calls = 0
+    start = time.perf_counter()
+    generator.generate_markdown(tree, files)
+    elapsed = time.perf_counter() - start
+    return {"wall": elapsed, "opens": _open_calls, "output": output}
+
+
+def strace_counts(name: str, files: int, buffer_size: int) -> str:
+    cmd = [
+        "strace",
+        "-f",
+        "-c",
+        "-e",
+        "trace=openat,write,close",
+        sys.executable,
+        __file__,
+        "--files",
+        str(files),
+        "--buffer-size",
+        str(buffer_size),
+        "--only",
+        name,
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    return result.stderr
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=50_000)
+    parser.add_argument("--buffer-size", type=int, default=DEFAULT_BUFFER_SIZE)
+    parser.add_argument("--only", choices=sorted(WRITERS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sys.addaudithook(_audit)
+    workdir = Path(tempfile.mkdtemp(prefix="reposnap-bench-"))
+    try:
+        root = workdir / "tree"
+        files = make_tree(root, args.files)
+        names = [args.only] if args.only else ["legacy", "streaming"]
+        results = {n: run_writer(n, root, files, args.buffer_size) for n in names}
+        if args.only:
+            return
+        for name, res in results.items():
+            print(f"{name:>10}: {res['wall']:.3f}s, {res['opens']} open() calls")
+        same = (
+            results["legacy"]["output"].read_bytes()
+            == results["streaming"]["output"].read_bytes()
+        )
+        print(f"byte-identical output: {same}")
+        if shutil.which("strace"):
+            for name in names:
+                print(f"--- strace -c ({name}) ---")
+                print(strace_counts(name, args.files, args.buffer_size))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
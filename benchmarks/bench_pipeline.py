@@ -0,0 +1,260 @@
+# benchmarks/bench_pipeline.py
+
+"""
+Time every stage of ProjectController.run on a synthetic repository.
+
+Generates a git repository of configurable shape (file count, directory
+depth and fan-out, log-normal file sizes, share of binary files, number of
+nested ``.gitignore`` files and patterns per file), then runs the pipeline
+stage by stage: listing the candidate files, include/exclude, ``.gitignore``,
+the content search, building the tree and rendering the Markdown.  An
+end-to-end ``run()`` is timed as well, since the real pipeline fuses the
+path filters into one pass.  Each measurement is the best of ``--repeat``
+runs.
+
+Results can be saved as JSON and compared with an earlier run (e.g. of
+another commit); ``--compare`` exits non-zero if a stage got slower than
+``--max-slowdown``.
+
+Usage::
+
+    python benchmarks/bench_pipeline.py [--files N] [--depth D] [--fanout F]
+        [--mean-size BYTES] [--binary-ratio R] [--gitignores G]
+        [--ignore-patterns P] [--repeat R] [--json OUT] [--compare OLD]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from reposnap.controllers.project_controller import ProjectController
+from reposnap.interfaces.cli import build_parser
+from reposnap.models.file_tree import FileTree
+
+STAGES = [
+    "setup",
+    "collect",
+    "include/exclude",
+    "gitignore",
+    "contains",
+    "tree",
+    "render",
+    "run",
+]
+# Marker planted in some files so that --contains has something to find.
+NEEDLE = "REPOSNAP_NEEDLE"
+SUFFIXES = [".py", ".md", ".txt", ".json", ".log", ".tmp"]
+
+
+def make_repo(root: Path, args: argparse.Namespace) -> Dict[str, int]:
+    """Create and ``git add`` the synthetic repository; return its shape."""
+    rng = random.Random(args.seed)
+    dirs = [Path(".")]
+    frontier = [Path(".")]
+    for _ in range(args.depth):
+        frontier = [d / f"d{i}" for d in frontier for i in range(args.fanout)]
+        dirs.extend(frontier)
+    total_bytes = binaries = 0
+    for i in range(args.files):
+        rel = rng.choice(dirs) / f"f{i}{SUFFIXES[i % len(SUFFIXES)]}"
+        target = root / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        size = max(1, int(rng.lognormvariate(0, 1) * args.mean_size / 1.65))
+        if rng.random() < args.binary_ratio:
+            data = b"\0" + os.urandom(size - 1)
+            binaries += 1
+        else:
+            line = f"value_{i} = {i}  # {NEEDLE if i % 10 == 0 else 'filler'}\n"
+            data = (line * (size // len(line) + 1)).encode()[:size]
+        target.write_bytes(data)
+        total_bytes += size
+    ignore_dirs = rng.sample(dirs, min(args.gitignores, len(dirs)))
+    for directory in ignore_dirs:
+        patterns = [f"*.tmp{i}" for i in range(args.ignore_patterns - 2)]
+        patterns += ["*.log", "!keep.log"]
+        (root / directory).mkdir(parents=True, exist_ok=True)
+        (root / directory / ".gitignore").write_text("\n".join(patterns) + "\n")
+    subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+    subprocess.run(["git", "add", "-f", "."], cwd=root, check=True)
+    return {
+        "files": args.files,
+        "dirs": len(dirs),
+        "bytes": total_bytes,
+        "binary": binaries,
+        "gitignores": len(ignore_dirs),
+    }
+
+
+@contextmanager
+def timed(results: Dict[str, Dict[str, Any]], stage: str) -> Iterator[Dict[str, Any]]:
+    """Record the wall time of the block as the stage's best time."""
+    counts: Dict[str, Any] = {}
+    start = time.perf_counter()
+    yield counts
+    elapsed = time.perf_counter() - start
+    best = results.get(stage)
+    if best is None or elapsed < best["seconds"]:
+        results[stage] = {"seconds": elapsed, **counts}
+
+
+def run_stages(argv: List[str], results: Dict[str, Dict[str, Any]]) -> None:
+    """Run the pipeline once, stage by stage, then once end to end."""
+    args = build_parser().parse_args(argv)
+    with timed(results, "setup"):
+        controller = ProjectController(args)
+    try:
+        with timed(results, "collect") as counts:
+            files = controller._list_candidate_files()
+            counts["out"] = len(files)
+        with timed(results, "include/exclude") as counts:
+            counts["in"] = len(files)
+            for _, keep in controller._include_exclude_filters():
+                files = [f for f in files if keep(f.as_posix())]
+            counts["out"] = len(files)
+        with timed(results, "gitignore") as counts:
+            counts["in"] = len(files)
+            keep = controller._gitignore_filter()
+            if keep is not None:
+                files = [f for f in files if keep(f.as_posix())]
+            counts["out"] = len(files)
+        with timed(results, "contains") as counts:
+            counts["in"] = len(files)
+            files = controller._apply_content_filter(files)
+            counts["out"] = len(files)
+        with timed(results, "tree") as counts:
+            controller.file_tree = FileTree.from_paths(files)
+            counts["out"] = len(files)
+        with timed(results, "render") as counts:
+            controller.generate_output()
+            counts["in"] = len(files)
+            counts["bytes"] = controller.output_file.stat().st_size
+    finally:
+        controller._close_cache()
+        controller._close_blob_readers()
+
+    with timed(results, "run") as counts:
+        runner = ProjectController(args)
+        runner.run()
+        counts["bytes"] = runner.output_file.stat().st_size
+    # The run's own per-stage metrics (as printed by --profile json).
+    results["run"].setdefault("metrics", runner.metrics.to_dict()["stages"])
+
+
+def reposnap_commit() -> Optional[str]:
+    """Commit of the reposnap checkout being measured, if it is one."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], max_slowdown: float) -> bool:
+    """Print old/new times per stage; return False if one regressed."""
+    ok = True
+    print(f"\n{'stage':<16} {'old ms':>10} {'new ms':>10} {'ratio':>7}")
+    for stage in STAGES:
+        if stage not in old["stages"] or stage not in new["stages"]:
+            continue
+        before = old["stages"][stage]["seconds"]
+        after = new["stages"][stage]["seconds"]
+        ratio = after / before if before else 1.0
+        flag = ""
+        # Ignore noise on stages that take next to no time.
+        if ratio > max_slowdown and after - before > 0.005:
+            flag, ok = "  slower", False
+        print(
+            f"{stage:<16} {before * 1000:>10.1f} {after * 1000:>10.1f} "
+            f"{ratio:>7.2f}{flag}"
+        )
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=20_000)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=6)
+    parser.add_argument("--mean-size", type=int, default=2048)
+    parser.add_argument("--binary-ratio", type=float, default=0.05)
+    parser.add_argument("--gitignores", type=int, default=20)
+    parser.add_argument("--ignore-patterns", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Write the results here.")
+    parser.add_argument("--compare", type=Path, help="Earlier --json results.")
+    parser.add_argument("--max-slowdown", type=float, default=1.25)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="reposnap-bench-")).resolve()
+    cwd = os.getcwd()
+    try:
+        root = workdir / "repo"
+        root.mkdir()
+        shape = make_repo(root, args)
+        print(
+            f"{shape['files']} files in {shape['dirs']} directories, "
+            f"{shape['bytes'] / 2**20:.1f} MiB, {shape['binary']} binary, "
+            f"{shape['gitignores']} .gitignore files"
+        )
+        argv = [
+            ".",
+            "-o",
+            str(workdir / "out.md"),
+            "-e",
+            "*.json",
+            "-S",
+            NEEDLE,
+            "-j",
+            str(args.jobs),
+        ]
+        os.chdir(root)
+        stages: Dict[str, Dict[str, Any]] = {}
+        for _ in range(args.repeat):
+            run_stages(argv, stages)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'stage':<16} {'ms':>10} {'in':>8} {'out':>8}")
+    for stage in STAGES:
+        res = stages[stage]
+        print(
+            f"{stage:<16} {res['seconds'] * 1000:>10.1f} "
+            f"{res.get('in', ''):>8} {res.get('out', ''):>8}"
+        )
+    result = {
+        "commit": reposnap_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("json", "compare")},
+        "shape": shape,
+        "stages": stages,
+    }
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"Results written to {args.json}")
+    if args.compare:
+        old = json.loads(args.compare.read_text())
+        if not compare(old, result, args.max_slowdown):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
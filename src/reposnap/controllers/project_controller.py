@@ -1,9 +1,26 @@
+import io
 import logging
+import sys
 from pathlib import Path
-from reposnap.core.file_system import FileSystem
+from reposnap.core.metrics import Metrics
+from reposnap.core.pipeline import CollectionPipeline, PrefixRouter
 from reposnap.models.file_tree import FileTree
-import pathspec
-from typing import List, Optional
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, TextIO, Tuple
+
+if TYPE_CHECKING:
+    from reposnap.core.cache import SnapshotCache
+    from reposnap.core.diff_scope import DiffScope
+    from reposnap.core.git_objects import GitRevision
+    from reposnap.core.ignore import IgnoreRules
+    from reposnap.core.tokens import TokenStats
+
+# Output name that means "write to stdout".
+STDOUT = "-"
+
+
+def range_target(revs: str) -> str:
+    """Return the last revision of ``A..B`` / ``A...B`` (HEAD if omitted)."""
+    return revs.rpartition("..")[2] or "HEAD"
 
 
 class ProjectController:
@@ -13,6 +30,15 @@ class ProjectController:
         self.root_dir = self._get_repo_root().resolve()
         if args:
             self.args = args
+            # Snapshot this commit instead of the working tree (--rev).
+            self.rev: Optional[str] = getattr(args, "rev", None)
+            # Only files changed since a revision / in a range (--since, --range).
+            self.since: Optional[str] = getattr(args, "since", None)
+            self.diff_range: Optional[str] = getattr(args, "range", None)
+            self.hunks: bool = getattr(args, "hunks", False)
+            if self.diff_range:
+                # Files of a range are read from its last revision.
+                self.rev = range_target(self.diff_range)
             # Treat positional arguments as literal file/directory names.
             input_paths = [
                 Path(p) for p in (args.paths if hasattr(args, "paths") else [])
@@ -26,7 +52,8 @@ class ProjectController:
                     # Handle relative paths - join with root_dir
                     candidate = (self.root_dir / p).resolve()
 
-                if candidate.exists():
+                # With --rev a path may exist only in the revision.
+                if candidate.exists() or self.rev:
                     try:
                         rel = candidate.relative_to(self.root_dir)
                         if rel != Path("."):
@@ -39,6 +66,8 @@ class ProjectController:
                     self.logger.warning(
                         f"Path {p} does not exist or is not under repository root {self.root_dir}."
                     )
+            # "-o -" writes the snapshot to stdout.
+            self.to_stdout: bool = args.output == STDOUT
             self.output_file: Path = (
                 Path(args.output).resolve()
                 if args.output
@@ -56,9 +85,31 @@ class ProjectController:
             self.changes_only: bool = getattr(args, "changes", False)
             self.contains: List[str] = getattr(args, "contains", [])
             self.contains_case: bool = getattr(args, "contains_case", False)
+            # None keeps the default size limit of the content search, 0 lifts it.
+            self.contains_max_size: Optional[int] = getattr(
+                args, "contains_max_size", None
+            )
+            # Same convention for files rendered into the output.
+            self.max_file_size: Optional[int] = getattr(args, "max_file_size", None)
+            self.jobs: int = getattr(args, "jobs", 1)
+            self.use_cache: bool = getattr(args, "cache", False)
+            self.incremental: bool = getattr(args, "incremental", False)
+            self.max_bytes: Optional[int] = getattr(args, "max_bytes", None)
+            self.max_tokens: Optional[int] = getattr(args, "max_tokens", None)
+            self.budget_policy: str = getattr(args, "budget_policy", "smallest")
+            self.budget_weights: List[Tuple[str, float]] = (
+                getattr(args, "budget_weight", None) or []
+            )
+            self.stats: bool = getattr(args, "stats", False)
+            self.tokenizer: str = getattr(args, "tokenizer", None) or "bytes"
         else:
             self.args = None
+            self.rev = None
+            self.since = None
+            self.diff_range = None
+            self.hunks = False
             self.input_paths = []
+            self.to_stdout = False
             self.output_file = self.root_dir / "output.md"
             self.structure_only = False
             self.include_patterns = []
@@ -66,36 +117,69 @@ class ProjectController:
             self.changes_only = False
             self.contains = []
             self.contains_case = False
+            self.contains_max_size = None
+            self.max_file_size = None
+            self.jobs = 1
+            self.use_cache = False
+            self.incremental = False
+            self.max_bytes = None
+            self.max_tokens = None
+            self.budget_policy = "smallest"
+            self.budget_weights = []
+            self.stats = False
+            self.tokenizer = "bytes"
+        self.cache: Optional["SnapshotCache"] = None
+        # Files of self.rev, read from the object database.
+        self.revision: Optional["GitRevision"] = None
+        # Files changed in self.since / self.diff_range, with their old blobs.
+        self.diff: Optional["DiffScope"] = None
+        # Blob ids of clean tracked files (POSIX relative path -> id); only
+        # collected when the cache is enabled.
+        self.blob_ids: Dict[str, str] = {}
         self.file_tree: Optional[FileTree] = None
-        self.gitignore_patterns: List[str] = []
+        # Per-section token counts of the last generate_output() (--stats).
+        self.token_stats: Optional["TokenStats"] = None
+        self.collection_pipeline: Optional[CollectionPipeline] = None
+        # Per-stage timings and counters of the last run (--profile).
+        self.metrics = Metrics()
+        self._gitignore_applied = False
+        self.ignore_rules: Optional["IgnoreRules"] = None
         if self.root_dir:
-            self.gitignore_patterns = self._load_gitignore_patterns()
+            self.ignore_rules = self._load_ignore_rules()
 
     def _get_repo_root(self) -> Path:
         """
         Determine the repository root using Git if available,
         otherwise use the current directory.
         """
-        from git import Repo, InvalidGitRepositoryError
+        from reposnap.core.git_index import find_worktree, has_git_overrides
+
+        cwd = Path.cwd().resolve()
+        if not has_git_overrides():
+            # Finding .git ourselves avoids importing GitPython at startup.
+            located = find_worktree(cwd)
+            if located is not None:
+                return located[0]
+        else:
+            from git import Repo, InvalidGitRepositoryError
 
-        try:
-            repo = Repo(Path.cwd(), search_parent_directories=True)
-            return Path(repo.working_tree_dir).resolve()
-        except InvalidGitRepositoryError:
-            self.logger.warning(
-                "Not a git repository. Using current directory as root."
-            )
-            return Path.cwd().resolve()
+            try:
+                repo = Repo(cwd, search_parent_directories=True)
+                return Path(repo.working_tree_dir).resolve()
+            except InvalidGitRepositoryError:
+                pass
+        self.logger.warning("Not a git repository. Using current directory as root.")
+        return cwd
 
     def set_root_dir(self, root_dir: Path) -> None:
         self.root_dir = root_dir.resolve()
-        self.gitignore_patterns = self._load_gitignore_patterns()
+        self.ignore_rules = self._load_ignore_rules()
 
     def get_file_tree(self) -> Optional[FileTree]:
         return self.file_tree
 
-    def _apply_include_exclude(self, files: List[Path]) -> List[Path]:
-        """Filter a list of file paths using include and exclude patterns."""
+    def _include_exclude_filters(self) -> List[Tuple[str, Callable[[str], bool]]]:
+        """Return the include/exclude stages as ``(name, keep(posix_path))``."""
 
         def adjust_patterns(patterns):
             adjusted = []
@@ -106,18 +190,44 @@ class ProjectController:
                     adjusted.append(f"*{p}*")
             return adjusted
 
+        if not self.include_patterns and not self.exclude_patterns:
+            return []
+        from reposnap.core.path_matcher import compile_matcher
+
+        filters = []
         if self.include_patterns:
-            inc = adjust_patterns(self.include_patterns)
-            spec_inc = pathspec.PathSpec.from_lines(
-                pathspec.patterns.GitWildMatchPattern, inc
-            )
-            files = [f for f in files if spec_inc.match_file(f.as_posix())]
+            spec_inc = compile_matcher(adjust_patterns(self.include_patterns))
+            filters.append(("include", spec_inc.match_file))
         if self.exclude_patterns:
-            exc = adjust_patterns(self.exclude_patterns)
-            spec_exc = pathspec.PathSpec.from_lines(
-                pathspec.patterns.GitWildMatchPattern, exc
-            )
-            files = [f for f in files if not spec_exc.match_file(f.as_posix())]
+            spec_exc = compile_matcher(adjust_patterns(self.exclude_patterns))
+            filters.append(("exclude", lambda path: not spec_exc.match_file(path)))
+        return filters
+
+    def _gitignore_filter(self) -> Optional[Callable[[str], bool]]:
+        """Return ``keep(posix_path)`` for the ignore rules, if any."""
+        rules = self.ignore_rules
+        if rules is None or self.rev:
+            # Files committed in a revision are never ignored.
+            return None
+        return lambda path: not rules.is_ignored(path)
+
+    def _ignored_dir_filter(self) -> Optional[Callable[[str], bool]]:
+        """Return ``prune(posix_dir)`` for the filesystem scan, if any."""
+        rules = self.ignore_rules
+        if rules is None:
+            return None
+        return lambda rel_dir: rules.is_ignored(rel_dir, is_dir=True)
+
+    def _input_path_router(self) -> Optional[PrefixRouter]:
+        """Route a path to the first input path containing it (or None)."""
+        if not self.input_paths:
+            return None
+        return PrefixRouter(p.as_posix() for p in self.input_paths)
+
+    def _apply_include_exclude(self, files: List[Path]) -> List[Path]:
+        """Filter a list of file paths using include and exclude patterns."""
+        for _, keep in self._include_exclude_filters():
+            files = [f for f in files if keep(f.as_posix())]
         return files
 
     def _apply_content_filter(self, files: List[Path]) -> List[Path]:
@@ -134,45 +244,159 @@ class ProjectController:
 
         Note:
             Uses case-insensitive matching by default unless self.contains_case
-            is True. Skips binary files and files larger than 5MB for performance.
+            is True. Skips binary files and files larger than
+            self.contains_max_size (5 MiB by default, 0 for no limit).
+            Files are searched in parallel with up to self.jobs workers.
         """
         if not self.contains:
             return files
 
-        from reposnap.core.content_search import filter_files_by_content
+        from reposnap.core.content_search import MAX_FILE_SIZE, filter_files_by_content
 
         initial_count = len(files)
         ignore_case = not self.contains_case
+        if self.contains_max_size is None:
+            max_file_size = MAX_FILE_SIZE
+        else:
+            max_file_size = self.contains_max_size or None
 
         self.logger.debug(
             f"Applying content filter with patterns: {self.contains}, "
             f"ignore_case: {ignore_case}"
         )
 
-        # Convert relative paths to absolute for content search
-        absolute_paths = [self.root_dir / file_path for file_path in files]
-        filtered_absolute = filter_files_by_content(
-            absolute_paths, self.contains, ignore_case
-        )
+        # Results for clean tracked files may already be cached by blob id.
+        known: Dict[Path, bool] = {}
+        if self.cache is not None and self.blob_ids:
+            from reposnap.core.cache import matcher_key
+
+            key = matcher_key(self.contains, ignore_case, max_file_size)
+            blobs = {f: self.blob_ids.get(f.as_posix()) for f in files}
+            cached = self.cache.get_matches(key, [b for b in blobs.values() if b])
+            known = {f: cached[b] for f, b in blobs.items() if b in cached}
+            self.metrics.record("contains", cache_hits=len(known))
+            self.logger.debug(f"Content filter cache hits: {len(known)}")
+
+        if self.revision is not None:
+            matched = self._search_revision(
+                [f for f in files if f not in known], ignore_case, max_file_size
+            )
+        else:
+            # Convert relative paths to absolute for content search
+            absolute_paths = [
+                self.root_dir / file_path
+                for file_path in files
+                if file_path not in known
+            ]
+            filtered_absolute = filter_files_by_content(
+                absolute_paths,
+                self.contains,
+                ignore_case,
+                jobs=self.jobs,
+                max_file_size=max_file_size,
+            )
 
-        # Convert back to relative paths
-        filtered_files = []
-        for abs_path in filtered_absolute:
-            try:
-                rel_path = abs_path.relative_to(self.root_dir)
-                filtered_files.append(rel_path)
-            except ValueError:
-                continue
+            # Convert back to relative paths
+            matched = set()
+            for abs_path in filtered_absolute:
+                try:
+                    matched.add(abs_path.relative_to(self.root_dir))
+                except ValueError:
+                    continue
+        if self.cache is not None and self.blob_ids:
+            self.cache.put_matches(
+                key,
+                (
+                    (blobs[f], f in matched)
+                    for f in files
+                    if f not in known and blobs[f]
+                ),
+            )
+        filtered_files = [f for f in files if known.get(f, f in matched)]
 
         kept_count = len(filtered_files)
         self.logger.info(
             f"Applied content filter (kept {kept_count} / {initial_count})"
         )
-        self.logger.debug(f"Files kept after content filter: {filtered_files}")
 
         return filtered_files
 
-    def collect_file_tree(self) -> None:
+    def _search_revision(
+        self, files: List[Path], ignore_case: bool, max_file_size: Optional[int]
+    ) -> Set[Path]:
+        """Return the *files* of self.revision whose blob contains a pattern."""
+        from reposnap.core.content_search import ContentMatcher, looks_binary
+
+        matcher = ContentMatcher(self.contains, ignore_case)
+        matched = set()
+        for rel_path in files:
+            entry = self.revision.entry(rel_path)
+            if entry is None or entry.size == 0:
+                continue
+            if max_file_size is not None and entry.size > max_file_size:
+                continue
+            try:
+                data = self.revision.read(entry.blob)
+            except OSError as e:
+                self.logger.debug(f"Could not read {rel_path} at {self.rev}: {e}")
+                continue
+            if not looks_binary(data) and matcher.search(data):
+                matched.add(rel_path)
+        return matched
+
+    def _list_revision_files(self) -> List[Path]:
+        """List the files of self.rev below root_dir, from the git tree."""
+        self._open_revision()
+        return self.revision.files()
+
+    def _open_revision(self) -> None:
+        from reposnap.core.git_objects import GitRevision
+
+        self.revision = GitRevision(self.root_dir, self.rev)
+        self.logger.info(
+            f"Collecting files of revision {self.rev} ({self.revision.commit[:12]})."
+        )
+        if self.use_cache:
+            self._open_cache()
+            self.blob_ids = {
+                path: entry.blob for path, entry in self.revision.entries.items()
+            }
+
+    def _list_changed_files(self) -> List[Path]:
+        """
+        List the files changed in self.diff_range (read from its last
+        revision) or since self.since (read from the working tree).
+        """
+        from reposnap.core.diff_scope import DiffScope
+        from reposnap.core.git_objects import BlobReader
+        from reposnap.core.git_repo import GitRepo
+
+        revs = self.diff_range or self.since
+        git_repo = GitRepo(self.root_dir)
+        changes = git_repo.get_changed_files(revs)
+        self.logger.info(f"Collecting {len(changes)} files changed in {revs}.")
+        if self.rev:
+            self._open_revision()
+            blobs = self.revision
+        else:
+            blobs = BlobReader(self.root_dir)
+            if self.use_cache:
+                self._open_cache()
+                self.blob_ids = git_repo.get_blob_ids()
+        self.diff = DiffScope(changes, blobs)
+        return self.diff.files()
+
+    def _list_candidate_files(self) -> List[Path]:
+        """
+        List every candidate file relative to root_dir: Git tracked (or only
+        uncommitted) files, falling back to a filesystem scan.  With --rev,
+        the files of that revision, with --since/--range the changed files
+        (no fallback).
+        """
+        if self.since or self.diff_range:
+            return self._list_changed_files()
+        if self.rev:
+            return self._list_revision_files()
         if self.changes_only:
             self.logger.info("Collecting uncommitted files from Git repository.")
         else:
@@ -189,91 +413,147 @@ class ProjectController:
             else:
                 all_files = git_repo.get_git_files()
                 self.logger.info("Using all Git tracked files.")
-            self.logger.debug(f"Git files: {all_files}")
+                if self.use_cache:
+                    self._open_cache()
+                    self.blob_ids = git_repo.get_blob_ids()
+            self.logger.debug(f"Git files: {len(all_files)}")
         except Exception as e:
             self.logger.warning(f"Error obtaining Git tracked files: {e}.")
             all_files = []
         # If Git returns an empty list but files exist on disk, fall back to filesystem scan.
         if not all_files:
-            file_list = [p for p in self.root_dir.rglob("*") if p.is_file()]
+            from reposnap.core.file_system import FileSystem
+
+            file_list = FileSystem(self.root_dir).list_files(self._ignored_dir_filter())
             if file_list:
                 self.logger.info(
                     "Git tracked files empty, using filesystem scan fallback."
                 )
-                all_files = []
-                for path in file_list:
-                    try:
-                        rel = path.relative_to(self.root_dir)
-                        all_files.append(rel)
-                    except ValueError:
-                        continue
-        all_files = self._apply_include_exclude(all_files)
-        self.logger.debug(f"All files after applying include/exclude: {all_files}")
-        all_files = self._apply_content_filter(all_files)
-        self.logger.debug(f"All files after applying content filter: {all_files}")
-        if self.input_paths:
-            trees = []
-            for input_path in self.input_paths:
-                subset = [
-                    f
-                    for f in all_files
-                    if f == input_path
-                    or list(f.parts[: len(input_path.parts)]) == list(input_path.parts)
-                ]
-                self.logger.debug(f"Files for input path '{input_path}': {subset}")
-                if subset:
-                    tree = FileSystem(self.root_dir).build_tree_structure(subset)
-                    trees.append(tree)
-            if trees:
-                merged_tree = self.merge_trees(trees)
-            else:
-                merged_tree = {}
-        else:
-            merged_tree = FileSystem(self.root_dir).build_tree_structure(all_files)
-        self.logger.info("Merged tree built from input paths.")
-        self.file_tree = FileTree(merged_tree)
-        self.logger.debug(f"Merged tree structure: {self.file_tree.structure}")
-
-    def merge_trees(self, trees: List[dict]) -> dict:
-        """Recursively merge a list of tree dictionaries."""
-        merged = {}
-        for tree in trees:
-            merged = self._merge_two_trees(merged, tree)
-        return merged
-
-    def _merge_two_trees(self, tree1: dict, tree2: dict) -> dict:
-        merged = dict(tree1)
-        for key, value in tree2.items():
-            if key in merged:
-                if isinstance(merged[key], dict) and isinstance(value, dict):
-                    merged[key] = self._merge_two_trees(merged[key], value)
-                else:
-                    merged[key] = value
-            else:
-                merged[key] = value
-        return merged
+                all_files = file_list
+        return all_files
+
+    def collect_file_tree(self) -> None:
+        """
+        Collect the candidate files into self.file_tree in a single pass.
+
+        Input-path routing, include/exclude and .gitignore run per path in
+        one sweep (see CollectionPipeline); the content search runs last,
+        on the survivors only.
+        """
+        pipeline = CollectionPipeline(self._input_path_router())
+        for name, keep in self._include_exclude_filters():
+            pipeline.add_filter(name, keep)
+        gitignore = self._gitignore_filter()
+        if gitignore is not None:
+            pipeline.add_filter(".gitignore", gitignore)
+
+        with self.metrics.stage("collect") as stage:
+            candidates = self._list_candidate_files()
+            stage.files_out = len(candidates)
+        with self.metrics.stage("path filters") as stage:
+            all_files = pipeline.run(candidates, key=Path.as_posix)
+            stage.files_in, stage.files_out = len(candidates), len(all_files)
+        # The path filters share one pass: count each, time them together.
+        for counter in pipeline.counters():
+            self.metrics.record(
+                f"path filters/{counter.name}",
+                files_in=counter.seen,
+                files_out=counter.kept,
+            )
+        self.logger.debug(f"Files after path filters: {len(all_files)}")
+        if self.contains:
+            seen = len(all_files)
+            with self.metrics.stage("contains") as stage:
+                all_files = self._apply_content_filter(all_files)
+                stage.files_in, stage.files_out = seen, len(all_files)
+            pipeline.record("contains", seen, len(all_files))
+
+        self.collection_pipeline = pipeline
+        self._gitignore_applied = gitignore is not None
+        self.logger.info(f"Collection stages: {pipeline.summary()}")
+        with self.metrics.stage("tree") as stage:
+            self.file_tree = FileTree.from_paths(all_files)
+            stage.files_out = len(all_files)
 
     def apply_filters(self) -> None:
+        if self._gitignore_applied:
+            # collect_file_tree already dropped ignored paths in its pass.
+            return
         self.logger.info("Applying .gitignore filters to the merged tree.")
-        spec = pathspec.PathSpec.from_lines(
-            pathspec.patterns.GitWildMatchPattern, self.gitignore_patterns
-        )
-        self.logger.debug(f".gitignore patterns: {self.gitignore_patterns}")
-        self.file_tree.filter_files(spec)
+        keep = self._gitignore_filter()
+        if keep is None:
+            return
+        with self.metrics.stage("gitignore") as stage:
+            files = self.file_tree.get_all_files()
+            kept = [f for f in files if keep(f.as_posix())]
+            self.file_tree = FileTree.from_paths(kept)
+            stage.files_in, stage.files_out = len(files), len(kept)
 
     def generate_output(self) -> None:
         self.logger.info("Starting Markdown generation.")
+        from reposnap.core.budget import OutputBudget
         from reposnap.core.markdown_generator import MarkdownGenerator
 
+        self.token_stats = self._new_token_stats() if self.stats else None
+        sink = self._stdout_sink() if self.to_stdout else None
         markdown_generator = MarkdownGenerator(
             root_dir=self.root_dir,
             output_file=self.output_file,
+            sink=sink,
             structure_only=self.structure_only,
+            jobs=self.jobs,
+            cache=self.cache,
+            blob_ids=self.blob_ids,
+            incremental=self.incremental,
+            budget=OutputBudget.from_limits(
+                self.max_bytes,
+                self.max_tokens,
+                self.budget_policy,
+                self.budget_weights,
+            ),
+            token_stats=self.token_stats,
+            max_file_size=self._output_max_file_size(),
+            revision=self.revision,
+            hunks=self.diff if self.hunks else None,
         )
-        markdown_generator.generate_markdown(
-            self.file_tree.structure, self.file_tree.get_all_files()
-        )
-        self.logger.info(f"Markdown generated at {self.output_file}.")
+        files = self.file_tree.get_all_files()
+        hits = self.cache.hits if self.cache is not None else None
+        try:
+            with self.metrics.stage("render") as stage:
+                markdown_generator.generate_markdown(self.file_tree.view(), files)
+        finally:
+            if sink is not None and sink is not sys.stdout:
+                sink.detach()  # leave sys.stdout open
+        stage.files_in = len(files)
+        stage.bytes_read = markdown_generator.read_stats.bytes_read
+        if not self.to_stdout:
+            try:
+                stage.bytes_written = self.output_file.stat().st_size
+            except OSError:
+                pass
+        if hits is not None:
+            stage.cache_hits = self.cache.hits - hits
+        if self.to_stdout:
+            self.logger.info("Markdown written to stdout.")
+        else:
+            self.logger.info(f"Markdown generated at {self.output_file}.")
+
+    def _output_max_file_size(self) -> Optional[int]:
+        """Size above which files are omitted from the output (None: no limit)."""
+        from reposnap.core.content_search import MAX_FILE_SIZE
+
+        if self.max_file_size is None:
+            return MAX_FILE_SIZE
+        return self.max_file_size or None
+
+    @staticmethod
+    def _stdout_sink() -> TextIO:
+        """UTF-8 text stream over stdout, independent of the locale encoding."""
+        buffer = getattr(sys.stdout, "buffer", None)
+        if buffer is None:
+            return sys.stdout
+        sys.stdout.flush()
+        return io.TextIOWrapper(buffer, encoding="utf-8", write_through=False)
 
     def generate_output_from_selected(self, selected_files: set) -> None:
         self.logger.info("Generating Markdown from selected files.")
@@ -285,6 +565,8 @@ class ProjectController:
             output_file=self.output_file,
             structure_only=False,
             hide_untoggled=True,
+            jobs=self.jobs,
+            max_file_size=self._output_max_file_size(),
         )
         markdown_generator.generate_markdown(
             pruned_tree, [Path(f) for f in selected_files]
@@ -293,31 +575,56 @@ class ProjectController:
 
     def run(self) -> None:
         """Run the entire process: collect files, apply filters, and generate Markdown."""
-        self.collect_file_tree()
-        self.apply_filters()
-        self.generate_output()
-
-    def _load_gitignore_patterns(self) -> List[str]:
-        gitignore_path = self.root_dir / ".gitignore"
-        if not gitignore_path.exists():
-            for parent in self.root_dir.parents:
-                candidate = parent / ".gitignore"
-                if candidate.exists():
-                    gitignore_path = candidate
-                    break
-            else:
-                gitignore_path = None
-        if gitignore_path and gitignore_path.exists():
-            with gitignore_path.open("r") as gitignore:
-                patterns = [
-                    line.strip()
-                    for line in gitignore
-                    if line.strip() and not line.strip().startswith("#")
-                ]
-            self.logger.debug(
-                f"Loaded .gitignore patterns from {gitignore_path.parent}: {patterns}"
-            )
-            return patterns
-        else:
-            self.logger.debug(f"No .gitignore found starting from {self.root_dir}.")
-            return []
+        try:
+            self.collect_file_tree()
+            self.apply_filters()
+            self.generate_output()
+        finally:
+            self._close_cache()
+            self._close_blob_readers()
+
+    def _new_token_stats(self) -> "TokenStats":
+        """Token counter for --stats; real tokenizers keep counts in the cache."""
+        from reposnap.core.tokens import TokenStats, get_tokenizer
+
+        tokenizer = get_tokenizer(self.tokenizer)
+        if tokenizer.cacheable:
+            self._open_cache()
+        return TokenStats(tokenizer, self.cache)
+
+    def _open_cache(self) -> None:
+        if self.cache is not None:
+            return
+        from reposnap.core.cache import SnapshotCache
+
+        try:
+            self.cache = SnapshotCache.for_repo(self.root_dir)
+            self.logger.info(f"Using content cache at {self.cache.path}.")
+        except Exception as e:
+            self.logger.warning(f"Could not open content cache: {e}.")
+
+    def _close_cache(self) -> None:
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+
+    def _close_blob_readers(self) -> None:
+        if self.diff is not None:
+            self.diff.close()
+        if self.revision is not None:
+            self.revision.close()
+            self.revision = None
+
+    def _load_ignore_rules(self) -> "IgnoreRules":
+        """
+        Load git's ignore rules for root_dir: nested .gitignore files (read
+        lazily), .git/info/exclude and core.excludesFile.
+        """
+        from reposnap.core.ignore import IgnoreRules
+
+        rules = IgnoreRules.for_worktree(self.root_dir)
+        self.logger.debug(
+            f"Ignore rules for {self.root_dir}: .gitignore files plus "
+            f"{[str(p) for p in rules.exclude_files]}"
+        )
+        return rules
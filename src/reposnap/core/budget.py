@@ -0,0 +1,216 @@
+# src/reposnap/core/budget.py
+
+"""
+Output size budget for ``--max-bytes`` / ``--max-tokens``.
+
+Before anything is read, every candidate file is ``stat``-ed and the size of
+its Markdown section is estimated from the file size.  Files are then taken
+in priority order (path weights first, then the policy: smallest first,
+most recently modified first, or as listed), each one in full if it fits.
+A file that does not fit is truncated to the space left, which uses up the
+budget, provided that leaves a useful amount; otherwise it is skipped and
+later files that still fit are taken.  Skipped files are never opened,
+truncated ones are read only up to their limit.
+
+A binary or oversized file is rendered as a placeholder that may be longer
+than the file itself.  Whether a file is binary is only known once it is
+read, so every file is charged at least the size of the placeholder it
+could get.
+
+Tokens are estimated as one per :data:`BYTES_PER_TOKEN` bytes, so a token
+budget is simply a byte budget four times as large.
+"""
+
+import math
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+BYTES_PER_TOKEN = 4
+POLICIES = ("smallest", "recent", "listed")
+# A truncated file shows at least this much content; otherwise it is skipped.
+MIN_TRUNCATED_BYTES = 256
+
+TRUNCATED = "truncated"
+SKIPPED = "skipped"
+
+
+def tree_marker(status: str) -> str:
+    """Suffix appended to a file's line in the project structure."""
+    return f"  [{status}]"
+
+
+def truncation_note(shown: int, size: int) -> str:
+    """Last line of a truncated file's section (inside the code fence)."""
+    return f"... [truncated: first {shown} of {size} bytes shown]\n"
+
+
+def section_overhead(rel_str: str) -> int:
+    """Bytes a file section adds around the content (upper bound)."""
+    fence = "```python\n" if rel_str.endswith(".py") else "```\n"
+    # "## path", fences, and a newline that may be added to the content
+    return len(f"## {rel_str}\n\n{fence}\n```\n\n".encode("utf-8"))
+
+
+class BudgetPlan:
+    """
+    Outcome of :meth:`OutputBudget.plan`.
+
+    Attributes:
+        files: Files to render, in their original order
+        limits: Files to truncate -> number of content bytes to show
+        sizes: File sizes from ``stat`` (POSIX relative path -> bytes)
+        markers: POSIX relative path -> ``TRUNCATED`` or ``SKIPPED``
+        estimated_bytes: Estimated size of the whole output
+    """
+
+    def __init__(self) -> None:
+        self.files: List[Path] = []
+        self.limits: Dict[Path, int] = {}
+        self.sizes: Dict[str, int] = {}
+        self.markers: Dict[str, str] = {}
+        self.estimated_bytes = 0
+
+    def summary(self) -> str:
+        truncated = sum(1 for m in self.markers.values() if m == TRUNCATED)
+        skipped = len(self.markers) - truncated
+        return (
+            f"{len(self.files) - truncated} files in full, {truncated} truncated, "
+            f"{skipped} skipped (about {self.estimated_bytes} bytes, "
+            f"~{math.ceil(self.estimated_bytes / BYTES_PER_TOKEN)} tokens)"
+        )
+
+
+class OutputBudget:
+    """
+    Pick the files that fit into a byte budget.
+
+    Args:
+        max_bytes: Upper bound on the size of the output
+        policy: Order in which files claim the budget: ``smallest``,
+            ``recent`` (newest ``mtime`` first) or ``listed``
+        weights: ``(pattern, weight)`` pairs; files matching a pattern with
+            a higher weight go first (first matching pattern wins, default 0)
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        policy: str = "smallest",
+        weights: Sequence[Tuple[str, float]] = (),
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown budget policy: {policy}")
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.weights = list(weights)
+
+    @classmethod
+    def from_limits(
+        cls,
+        max_bytes: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        policy: str = "smallest",
+        weights: Sequence[Tuple[str, float]] = (),
+    ) -> Optional["OutputBudget"]:
+        """Return the budget for the given limits, or None if there are none."""
+        limits = [n for n in (max_bytes,) if n is not None]
+        if max_tokens is not None:
+            limits.append(max_tokens * BYTES_PER_TOKEN)
+        if not limits:
+            return None
+        return cls(min(limits), policy, weights)
+
+    def _weight_of(self) -> Callable[[str], float]:
+        if not self.weights:
+            return lambda path: 0.0
+        from reposnap.core.path_matcher import compile_matcher
+
+        matchers = [(compile_matcher([p]), w) for p, w in self.weights]
+
+        def weight_of(path: str) -> float:
+            for matcher, weight in matchers:
+                if matcher.match_file(path):
+                    return weight
+            return 0.0
+
+        return weight_of
+
+    @staticmethod
+    def _stat(path: Path) -> Tuple[int, int]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            # Missing files are reported (and skipped) by the writer.
+            return 0, 0
+        return st.st_size, st.st_mtime_ns
+
+    def plan(
+        self,
+        root_dir: Path,
+        files: Iterable[Path],
+        header_bytes: int,
+        sizes: Optional[Dict[str, int]] = None,
+        placeholder_size: Optional[Callable[[int], int]] = None,
+    ) -> BudgetPlan:
+        """
+        Decide which of *files* are rendered in full, truncated or skipped.
+
+        Args:
+            root_dir: Directory the relative *files* live in
+            files: Candidate files, in output order
+            header_bytes: Size of everything written before the first file
+            sizes: Known file sizes (POSIX relative path -> bytes) to use
+                instead of ``stat``, e.g. from a git tree; these files have
+                no modification time
+            placeholder_size: Size of the placeholder a file of the given
+                size is rendered as if it turns out binary or oversized
+        """
+        plan = BudgetPlan()
+        weight_of = self._weight_of()
+        ranked = []
+        for index, rel_path in enumerate(files):
+            rel_str = rel_path.as_posix()
+            if sizes is not None:
+                size, mtime = sizes.get(rel_str, 0), 0
+            else:
+                size, mtime = self._stat(root_dir / rel_path)
+            plan.sizes[rel_str] = size
+            if self.policy == "smallest":
+                key = size
+            elif self.policy == "recent":
+                key = -mtime
+            else:
+                key = 0
+            ranked.append((-weight_of(rel_str), key, index, rel_path, rel_str, size))
+        ranked.sort(key=lambda item: item[:3])
+
+        remaining = self.max_bytes - header_bytes
+        chosen = set()
+        skip_marker = len(tree_marker(SKIPPED).encode("utf-8"))
+        trunc_marker = len(tree_marker(TRUNCATED).encode("utf-8"))
+        for position, (_, _, index, rel_path, rel_str, size) in enumerate(ranked):
+            # Every later file costs at least a skip marker, so keep that much.
+            reserve = (len(ranked) - position - 1) * skip_marker
+            overhead = section_overhead(rel_str)
+            cost = size
+            if placeholder_size is not None:
+                cost = max(size, placeholder_size(size))
+            if overhead + cost + reserve <= remaining:
+                remaining -= overhead + cost
+                chosen.add(index)
+                continue
+            note = len(truncation_note(size, size).encode("utf-8"))
+            shown = remaining - reserve - overhead - trunc_marker - note
+            if shown >= MIN_TRUNCATED_BYTES:
+                remaining -= overhead + trunc_marker + note + shown
+                chosen.add(index)
+                plan.limits[rel_path] = shown
+                plan.markers[rel_str] = TRUNCATED
+            else:
+                remaining -= skip_marker
+                plan.markers[rel_str] = SKIPPED
+        ranked.sort(key=lambda item: item[2])
+        plan.files = [item[3] for item in ranked if item[2] in chosen]
+        plan.estimated_bytes = self.max_bytes - remaining
+        return plan
@@ -0,0 +1,238 @@
+# src/reposnap/core/cache.py
+
+"""
+Persistent cache keyed by git blob ids.
+
+A blob id names the exact bytes of a clean tracked file, so anything derived
+from those bytes alone (the decoded section body, whether a set of
+``--contains`` patterns occurs) can be reused across runs without touching
+the file again.  Token counts for ``--stats`` are keyed the same way, by
+the SHA-256 of the counted section.  Entries live in a small SQLite
+database under ``.git/`` when the repository has a regular git directory,
+otherwise under ``$XDG_CACHE_HOME/reposnap``.
+
+Several runs may share the database: writes are committed in small batches
+and wait a moment for a lock held by another run.  A cache that cannot be
+read or written behaves like an empty one; the snapshot never fails on it.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE_NAME = "cache.sqlite3"
+# Bump when the meaning of stored values changes.
+SCHEMA_VERSION = 1
+# Seconds a statement waits while another run holds the database lock.
+BUSY_TIMEOUT = 2.0
+# Pending writes are committed once there are this many.
+COMMIT_EVERY = 200
+
+
+def default_cache_path(repo_root: Path) -> Path:
+    """
+    Return where the cache for *repo_root* lives.
+
+    Args:
+        repo_root: Working tree root of the repository
+
+    Returns:
+        ``<repo>/.git/reposnap/cache.sqlite3`` when ``.git`` is a directory,
+        otherwise a per-repository file under ``$XDG_CACHE_HOME/reposnap``.
+    """
+    git_dir = repo_root / ".git"
+    if git_dir.is_dir():
+        return git_dir / "reposnap" / CACHE_FILE_NAME
+    base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    digest = hashlib.sha1(str(repo_root.resolve()).encode("utf-8")).hexdigest()
+    return base / "reposnap" / digest[:16] / CACHE_FILE_NAME
+
+
+def matcher_key(
+    patterns: List[str], ignore_case: bool, max_file_size: Optional[int]
+) -> str:
+    """Return a stable key for one ``--contains`` configuration."""
+    payload = json.dumps([sorted(patterns), ignore_case, max_file_size])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class SnapshotCache:
+    """
+    Blob-id keyed store for section bodies and content-match results, plus
+    token counts keyed by section hash.
+
+    Reads are served straight from SQLite; writes are committed every
+    :data:`COMMIT_EVERY` writes and by :meth:`close`.  Database errors (such
+    as a lock held too long by another run) turn reads into misses and drop
+    writes.  The object may be shared between reader threads.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._pending = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(path), timeout=BUSY_TIMEOUT, check_same_thread=False
+        )
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS sections (
+                blob TEXT PRIMARY KEY, content TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS matches (
+                matcher TEXT NOT NULL, blob TEXT NOT NULL, matched INTEGER NOT NULL,
+                PRIMARY KEY (matcher, blob)
+            );
+            CREATE TABLE IF NOT EXISTS tokens (
+                tokenizer TEXT NOT NULL, digest TEXT NOT NULL, count INTEGER NOT NULL,
+                PRIMARY KEY (tokenizer, digest)
+            );
+            """
+        )
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'schema'"
+        ).fetchone()
+        if row is None or int(row[0]) != SCHEMA_VERSION:
+            logger.debug(f"Resetting cache {path} (schema {row and row[0]})")
+            self._conn.execute("DELETE FROM sections")
+            self._conn.execute("DELETE FROM matches")
+            self._conn.execute("DELETE FROM tokens")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('schema', ?)",
+                (str(SCHEMA_VERSION),),
+            )
+            self._conn.commit()
+
+    @classmethod
+    def for_repo(cls, repo_root: Path) -> "SnapshotCache":
+        """Open (or create) the cache that belongs to *repo_root*."""
+        return cls(default_cache_path(repo_root))
+
+    # --------------------------------------------------------------
+    # section bodies
+    # --------------------------------------------------------------
+    def get_section(self, blob: str) -> Optional[str]:
+        """Return the cached decoded content of *blob*, if any."""
+        with self._lock:
+            row = self._fetch_one(
+                "SELECT content FROM sections WHERE blob = ?", (blob,)
+            )
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put_section(self, blob: str, content: str) -> None:
+        """Remember the decoded content of *blob*."""
+        self._write("INSERT OR REPLACE INTO sections VALUES (?, ?)", [(blob, content)])
+
+    # --------------------------------------------------------------
+    # content-match results
+    # --------------------------------------------------------------
+    def get_matches(self, matcher: str, blobs: Iterable[str]) -> Dict[str, bool]:
+        """Return the cached match result for every known blob in *blobs*."""
+        wanted = list(blobs)
+        found: Dict[str, bool] = {}
+        with self._lock:
+            # Stay well below SQLite's host-parameter limit.
+            for start in range(0, len(wanted), 500):
+                batch = wanted[start : start + 500]
+                placeholders = ",".join("?" * len(batch))
+                try:
+                    rows = self._conn.execute(
+                        "SELECT blob, matched FROM matches "
+                        f"WHERE matcher = ? AND blob IN ({placeholders})",
+                        (matcher, *batch),
+                    ).fetchall()
+                except sqlite3.Error as e:
+                    logger.debug("Cache read from %s failed: %s", self.path, e)
+                    continue
+                found.update((blob, bool(matched)) for blob, matched in rows)
+            self.hits += len(found)
+            self.misses += len(wanted) - len(found)
+        return found
+
+    def put_matches(self, matcher: str, results: Iterable[Tuple[str, bool]]) -> None:
+        """Remember ``(blob, matched)`` pairs for *matcher*."""
+        self._write(
+            "INSERT OR REPLACE INTO matches VALUES (?, ?, ?)",
+            [(matcher, blob, int(matched)) for blob, matched in results],
+        )
+
+    # --------------------------------------------------------------
+    # token counts
+    # --------------------------------------------------------------
+    def get_tokens(self, tokenizer: str, digest: str) -> Optional[int]:
+        """Return the cached token count of the text hashing to *digest*."""
+        with self._lock:
+            row = self._fetch_one(
+                "SELECT count FROM tokens WHERE tokenizer = ? AND digest = ?",
+                (tokenizer, digest),
+            )
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put_tokens(self, tokenizer: str, digest: str, count: int) -> None:
+        """Remember the token count of the text hashing to *digest*."""
+        self._write(
+            "INSERT OR REPLACE INTO tokens VALUES (?, ?, ?)",
+            [(tokenizer, digest, count)],
+        )
+
+    # --------------------------------------------------------------
+    # database access
+    # --------------------------------------------------------------
+    def _fetch_one(self, sql: str, params: Tuple) -> Optional[Tuple]:
+        """Run a query under self._lock; a database error reads as no row."""
+        try:
+            return self._conn.execute(sql, params).fetchone()
+        except sqlite3.Error as e:
+            logger.debug("Cache read from %s failed: %s", self.path, e)
+            return None
+
+    def _write(self, sql: str, rows: List[Tuple]) -> None:
+        """Write *rows*, committing every COMMIT_EVERY writes."""
+        with self._lock:
+            try:
+                self._conn.executemany(sql, rows)
+                self._pending += 1
+                if self._pending >= COMMIT_EVERY:
+                    self._conn.commit()
+                    self._pending = 0
+            except sqlite3.Error as e:
+                logger.debug("Cache write to %s failed: %s", self.path, e)
+                self._rollback()
+
+    def _rollback(self) -> None:
+        """Drop the pending writes (under self._lock)."""
+        self._pending = 0
+        try:
+            self._conn.rollback()
+        except sqlite3.Error:
+            pass
+
+    def close(self) -> None:
+        """Commit pending writes and close the database."""
+        with self._lock:
+            try:
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.debug("Cache write to %s failed: %s", self.path, e)
+                self._rollback()
+            self._conn.close()
+        logger.debug(f"Cache {self.path}: {self.hits} hits, {self.misses} misses")
@@ -0,0 +1,78 @@
+# src/reposnap/core/compression.py
+
+"""
+Streaming compressors for the snapshot output, chosen by file suffix.
+
+``.gz``, ``.bz2`` and ``.xz`` use the standard library.  ``.zst`` uses
+``compression.zstd`` (Python 3.14+) and falls back to the ``zstandard``
+package; without either a ``.zst`` output is refused rather than written
+in another format.  Every compressor writes into an already-open binary
+handle and leaves it open, so the caller closes the file itself.
+"""
+
+import io
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional
+
+CODECS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd"}
+# Levels favour speed, snapshots are rewritten often (bz2's level only picks
+# the block size).
+GZIP_LEVEL = 6
+BZ2_LEVEL = 9
+XZ_PRESET = 3
+ZSTD_LEVEL = 3
+
+
+def codec_for(path: Path) -> Optional[str]:
+    """Return the codec implied by *path*'s suffix, or None for plain text."""
+    return CODECS.get(path.suffix.lower())
+
+
+def _zstd() -> Callable[[BinaryIO], BinaryIO]:
+    try:
+        from compression import zstd  # type: ignore[import-not-found]
+    except ImportError:
+        pass
+    else:
+        return lambda raw: zstd.ZstdFile(raw, mode="w", level=ZSTD_LEVEL)
+    try:
+        import zstandard  # type: ignore[import-not-found]
+    except ImportError:
+        raise ValueError(
+            "Writing .zst output needs Python 3.14 or the 'zstandard' package; "
+            "use .gz, .bz2 or .xz instead."
+        ) from None
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+    return lambda raw: io.BufferedWriter(compressor.stream_writer(raw, closefd=False))
+
+
+def compressor(codec: str) -> Callable[[BinaryIO], BinaryIO]:
+    """
+    Return a function that wraps a binary handle in a buffered stream
+    compressing with *codec*.
+
+    Closing the wrapping stream finishes the compressed data but does not
+    close the handle.  Checking the codec up front lets callers fail before
+    they create the output file.
+
+    Raises:
+        ValueError: *codec* is unknown or its implementation is missing
+    """
+    if codec == "gzip":
+        import gzip
+
+        # mtime=0 keeps the output identical for identical snapshots.
+        return lambda raw: gzip.GzipFile(
+            filename="", mode="wb", compresslevel=GZIP_LEVEL, fileobj=raw, mtime=0
+        )
+    if codec == "bz2":
+        import bz2
+
+        return lambda raw: bz2.BZ2File(raw, mode="wb", compresslevel=BZ2_LEVEL)
+    if codec == "xz":
+        import lzma
+
+        return lambda raw: lzma.LZMAFile(raw, mode="wb", preset=XZ_PRESET)
+    if codec == "zstd":
+        return _zstd()
+    raise ValueError(f"Unknown compression codec: {codec}")
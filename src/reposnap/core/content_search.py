@@ -3,14 +3,25 @@
 """
 Private content search helpers for substring matching in files.
 
-This module provides stateless utility functions for searching file contents.
-It is intended for internal use by the project controller and should not be
+This module provides utility functions for searching file contents and a
+small multi-pattern matcher that is compiled once per search. It is
+intended for internal use by the project controller and should not be
 imported directly by external consumers.
 """
 
+import codecs
 import logging
+import mmap
+import os
+import re
+import stat
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, BinaryIO, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from multiprocessing.context import BaseContext
 
 
 logger = logging.getLogger(__name__)
@@ -18,9 +29,110 @@ logger = logging.getLogger(__name__)
 # Configuration constants
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 MiB
 BINARY_CHECK_SIZE = 1024  # First 1KB to check for binary content
+# Below this many candidates a pool costs more than it saves.
+PARALLEL_MIN_FILES = 64
+# Files handed to a worker process per task.
+PROCESS_CHUNK_SIZE = 256
+# Bytes read per scan step; consecutive chunks overlap so no match is missed.
+SCAN_CHUNK_SIZE = 256 * 1024
+
+# File classes returned by classify() (None means text).
+BINARY = "binary"
+OVERSIZED = "oversized"
+
+
+def looks_binary(head: bytes) -> bool:
+    """Return True if *head*, the start of a file, marks it as binary."""
+    return b"\0" in head[:BINARY_CHECK_SIZE]
+
 
+def classify(
+    raw: BinaryIO, size: int, max_file_size: Optional[int] = MAX_FILE_SIZE
+) -> Tuple[Optional[str], bytes]:
+    """
+    Classify an open file from its size and first bytes.
+
+    Args:
+        raw: File opened in binary mode, positioned at the start
+        size: Size of the file in bytes (from ``fstat``)
+        max_file_size: Larger files are OVERSIZED without being read;
+            ``None`` disables the limit
 
-def file_matches(path: Path, patterns: List[str], ignore_case: bool = True) -> bool:
+    Returns:
+        ``(kind, head)``: kind is OVERSIZED, BINARY or None for text, head
+        the bytes consumed from *raw* (at most BINARY_CHECK_SIZE)
+    """
+    if max_file_size is not None and size > max_file_size:
+        return OVERSIZED, b""
+    head = raw.read(BINARY_CHECK_SIZE)
+    return (BINARY if looks_binary(head) else None), head
+
+
+class ContentMatcher:
+    """
+    Match any of several substrings in a single pass over a file.
+
+    All patterns are compiled into one alternation so each chunk is scanned
+    once by the regex engine regardless of how many patterns there are.
+    Matching runs on raw bytes; ASCII case-insensitivity is handled by the
+    engine (no lower-cased copies). Only case-insensitive *non-ASCII* patterns
+    need decoded text.
+
+    Args:
+        patterns: Substrings to search for (OR logic)
+        ignore_case: Whether to perform case-insensitive matching
+    """
+
+    def __init__(self, patterns: List[str], ignore_case: bool = True):
+        self.patterns = list(patterns)
+        self.ignore_case = ignore_case
+        self.needs_decode = ignore_case and not all(p.isascii() for p in patterns)
+        flags = re.IGNORECASE if ignore_case else 0
+        if self.needs_decode:
+            alternatives = sorted(set(patterns), key=len, reverse=True)
+            self._regex = re.compile("|".join(map(re.escape, alternatives)), flags)
+            longest = max(len(p) for p in alternatives)
+        else:
+            alternatives = sorted(
+                {p.encode("utf-8") for p in patterns}, key=len, reverse=True
+            )
+            self._regex = re.compile(b"|".join(map(re.escape, alternatives)), flags)
+            longest = max(len(p) for p in alternatives)
+        self._overlap = max(longest - 1, 0)
+
+    def search(self, data: Union[bytes, str]) -> bool:
+        """Return True if *data* contains any pattern."""
+        return self._regex.search(data) is not None
+
+    def scan(self, stream: BinaryIO) -> bool:
+        """Scan a binary stream chunk by chunk; return True on the first match."""
+        decoder = (
+            codecs.getincrementaldecoder("utf-8")(errors="ignore")
+            if self.needs_decode
+            else None
+        )
+        tail = "" if decoder else b""
+        while True:
+            chunk = stream.read(SCAN_CHUNK_SIZE)
+            if not chunk:
+                return False
+            if decoder:
+                chunk = decoder.decode(chunk)
+            window = tail + chunk
+            if self._regex.search(window):
+                return True
+            tail = (
+                window[len(window) - self._overlap :] if self._overlap else window[:0]
+            )
+
+
+def file_matches(
+    path: Path,
+    patterns: List[str],
+    ignore_case: bool = True,
+    matcher: Optional[ContentMatcher] = None,
+    max_file_size: Optional[int] = MAX_FILE_SIZE,
+) -> bool:
     """
     Check if a file contains any of the given patterns.
 
@@ -28,59 +140,79 @@ def file_matches(path: Path, patterns: List[str], ignore_case: bool = True) -> b
         path: Path to the file to search
         patterns: List of substring patterns to search for
         ignore_case: Whether to perform case-insensitive matching (default: True)
+        matcher: Pre-compiled matcher for *patterns*; built on the fly if omitted
+        max_file_size: Skip files larger than this many bytes; ``None`` disables
+            the limit (default: MAX_FILE_SIZE)
 
     Returns:
         True if file contains any pattern, False otherwise
 
     Note:
-        Uses streaming read with utf-8 encoding and error handling for binary files.
+        Memory-maps the file and searches the encoded pattern bytes in place.
+        Falls back to a chunked scan for case-insensitive non-ASCII patterns
+        (which need decoding) and for files that cannot be mapped.
         Returns False if file cannot be read as text or if file is too large/binary.
     """
     if not patterns:
         return True
 
-    if not path.is_file():
-        return False
+    if matcher is None:
+        matcher = ContentMatcher(patterns, ignore_case)
 
-    # Check file size - skip files larger than MAX_FILE_SIZE
+    # One open serves the size check, the binary probe and the scan.
     try:
-        file_size = path.stat().st_size
-        if file_size > MAX_FILE_SIZE:
-            logger.debug(f"Skipping large file {path} ({file_size} bytes)")
-            return False
-    except OSError as e:
-        logger.debug(f"Could not stat file {path}: {e}")
-        return False
+        with path.open("rb") as raw:
+            st = os.fstat(raw.fileno())
+            if not stat.S_ISREG(st.st_mode):
+                return False
 
-    # Check for binary content in first KB
-    try:
-        with path.open("rb") as f:
-            first_chunk = f.read(BINARY_CHECK_SIZE)
-            if b"\0" in first_chunk:
-                logger.debug(f"Skipping binary file {path}")
+            # Check file size - skip files larger than max_file_size
+            if max_file_size is not None and st.st_size > max_file_size:
+                logger.debug("Skipping large file %s (%d bytes)", path, st.st_size)
+                return False
+            if st.st_size == 0:
                 return False
-    except Exception as e:
-        logger.debug(f"Could not read file {path} for binary check: {e}")
-        return False
 
-    # Pre-compute search patterns (case-normalized if needed)
-    search_patterns = [p.lower() if ignore_case else p for p in patterns]
+            if not matcher.needs_decode:
+                try:
+                    mapped = mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError) as e:
+                    logger.debug("Could not mmap %s, scanning instead: %s", path, e)
+                else:
+                    with mapped:
+                        if looks_binary(mapped[:BINARY_CHECK_SIZE]):
+                            logger.debug("Skipping binary file %s", path)
+                            return False
+                        return matcher.search(mapped)
 
-    try:
-        with path.open("r", encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                search_line = line.lower() if ignore_case else line
+            if looks_binary(raw.read(BINARY_CHECK_SIZE)):
+                logger.debug("Skipping binary file %s", path)
+                return False
+            raw.seek(0)
 
-                if any(pattern in search_line for pattern in search_patterns):
-                    return True
-        return False
+            return matcher.scan(raw)
     except Exception as e:
-        logger.debug(f"Could not read file {path} for content search: {e}")
+        logger.debug("Could not read file %s for content search: %s", path, e)
         return False
 
 
+def _process_context() -> "BaseContext":
+    """Start method for worker processes: never fork a threaded process."""
+    import multiprocessing
+
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+
 def filter_files_by_content(
-    files: List[Path], patterns: List[str], ignore_case: bool = True
+    files: List[Path],
+    patterns: List[str],
+    ignore_case: bool = True,
+    jobs: Optional[int] = None,
+    pool: str = "auto",
+    max_file_size: Optional[int] = MAX_FILE_SIZE,
 ) -> List[Path]:
     """
     Filter a list of files to only include those containing the given patterns.
@@ -89,16 +221,45 @@ def filter_files_by_content(
         files: List of file paths to filter
         patterns: List of substring patterns to search for
         ignore_case: Whether to perform case-insensitive matching (default: True)
+        jobs: Number of workers; ``None`` or ``0`` means one per CPU
+        pool: ``"thread"``, ``"process"``, ``"serial"`` or ``"auto"``, which
+            picks serial or thread execution by candidate count.  Processes
+            are only used on request: the caller may have threads of its
+            own (e.g. the daemon), so they are started without ``fork``
+        max_file_size: Skip files larger than this many bytes; ``None`` disables
+            the limit (default: MAX_FILE_SIZE)
 
     Returns:
-        Filtered list of files that contain at least one pattern
+        Filtered list of files that contain at least one pattern, in input order
     """
     if not patterns:
         return files
 
-    matched_files = []
-    for file_path in files:
-        if file_matches(file_path, patterns, ignore_case):
-            matched_files.append(file_path)
+    workers = jobs or os.cpu_count() or 1
+    if pool == "auto":
+        if workers <= 1 or len(files) < PARALLEL_MIN_FILES:
+            pool = "serial"
+        else:
+            pool = "thread"
+    logger.debug(
+        "Content search over %d files (%s, %d jobs)", len(files), pool, workers
+    )
+
+    matcher = ContentMatcher(patterns, ignore_case)
+    check = partial(
+        file_matches, patterns=patterns, matcher=matcher, max_file_size=max_file_size
+    )
+    if pool == "serial":
+        return [f for f in files if check(f)]
+    if pool == "process":
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=_process_context()
+        ) as executor:
+            results = list(executor.map(check, files, chunksize=PROCESS_CHUNK_SIZE))
+    elif pool == "thread":
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(check, files))
+    else:
+        raise ValueError(f"Unknown content search pool: {pool!r}")
 
-    return matched_files
+    return [f for f, matched in zip(files, results) if matched]
@@ -0,0 +1,90 @@
+# src/reposnap/core/diff_scope.py
+
+"""
+Snapshots limited to the files changed between two revisions (``--since`` /
+``--range``), optionally showing only the changed hunks (``--hunks``).
+
+The old side of every file is read by blob id through the
+:class:`~reposnap.core.git_objects.BlobReader` that serves the new side, so
+a diff snapshot costs one ``git diff`` plus one ``cat-file`` process.
+"""
+
+import difflib
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from reposnap.core.content_search import looks_binary
+from reposnap.core.git_objects import BlobReader
+from reposnap.core.git_repo import ChangedFile
+
+# Lines of unchanged context around each hunk, as in ``git diff``.
+HUNK_CONTEXT = 3
+
+
+class DiffScope:
+    """
+    Files changed between two revisions and their old contents.
+
+    Args:
+        changes: The changed files (from ``GitRepo.get_changed_files``)
+        blobs: Reader for the old blobs
+        context: Unchanged lines shown around each hunk
+    """
+
+    def __init__(
+        self,
+        changes: Sequence[ChangedFile],
+        blobs: BlobReader,
+        context: int = HUNK_CONTEXT,
+    ):
+        self.changes: Dict[str, ChangedFile] = {
+            change.path.as_posix(): change for change in changes
+        }
+        self.blobs = blobs
+        self.context = context
+
+    def files(self) -> List[Path]:
+        """The changed files, relative to the snapshot root."""
+        return [change.path for change in self.changes.values()]
+
+    def hunks(self, rel_path: Path, new_text: str) -> str:
+        """
+        Return the unified diff turning the old contents of *rel_path* into
+        *new_text* (empty if the text did not change, just the headers for
+        an unchanged renamed file).
+
+        Raises:
+            OSError: The old blob cannot be read
+        """
+        change = self.changes.get(rel_path.as_posix())
+        if change is None:
+            return ""
+        old_text = ""
+        if change.old_blob is not None:
+            data = self.blobs.read(change.old_blob)
+            if not looks_binary(data):
+                old_text = data.decode("utf-8", errors="replace")
+                old_text = old_text.replace("\r\n", "\n").replace("\r", "\n")
+        old_name = f"a/{change.old_path}" if change.old_blob else "/dev/null"
+        new_name = f"b/{rel_path.as_posix()}"
+        diff = difflib.unified_diff(
+            _lines(old_text), _lines(new_text), old_name, new_name, n=self.context
+        )
+        text = "".join(diff)
+        if not text and change.old_path != rel_path.as_posix():
+            # A pure rename or copy: only the headers tell what happened.
+            text = f"--- {old_name}\n+++ {new_name}\n"
+        return text
+
+    def close(self) -> None:
+        self.blobs.close()
+
+
+def _lines(text: str) -> List[str]:
+    """Split *text* after each "\\n", marking a missing final newline like git."""
+    lines = [f"{line}\n" for line in text.split("\n")]
+    if lines[-1] == "\n":
+        lines.pop()
+    else:
+        lines[-1] += "\\ No newline at end of file\n"
+    return lines
@@ -1,8 +1,12 @@
 # src/reposnap/core/file_system.py
 
 import logging
+import os
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Callable, FrozenSet, List, Dict, Any, Optional
+
+# Never descended into by the filesystem scan.
+SKIPPED_DIRS: FrozenSet[str] = frozenset({".git"})
 
 
 class FileSystem:
@@ -28,5 +32,54 @@ class FileSystem:
             for part in parts[:-1]:
                 current_level = current_level.setdefault(part, {})
             current_level[parts[-1]] = None  # Indicate a file node
-        self.logger.debug(f"Tree structure built: {tree}")
+        self.logger.debug("Tree structure built: %d files.", len(files))
         return tree
+
+    def list_files(
+        self, prune_dir: Optional[Callable[[str], bool]] = None
+    ) -> List[Path]:
+        """
+        List every file below root_dir with ``os.scandir``.
+
+        Directories are checked when they are reached, so an ignored
+        subtree (``node_modules``, ``.venv``) is never read at all, and the
+        type information ``scandir`` already returned is reused instead of
+        a ``stat`` per path.  Entries are visited in name order; ``.git``
+        is always skipped and directory symlinks are not followed.
+
+        Args:
+            prune_dir: Called with a directory's POSIX path relative to
+                root_dir; returning True skips the whole directory.
+
+        Returns:
+            List[Path]: File paths relative to root_dir.
+        """
+        files: List[Path] = []
+        pruned = 0
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            try:
+                with os.scandir(self.root_dir / rel_dir) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError as e:
+                self.logger.debug(f"Cannot scan {rel_dir or '.'}: {e}")
+                continue
+            subdirs = []
+            for entry in entries:
+                rel_path = f"{rel_dir}{entry.name}"
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name in SKIPPED_DIRS or (
+                            prune_dir is not None and prune_dir(rel_path)
+                        ):
+                            pruned += 1
+                        else:
+                            subdirs.append(f"{rel_path}/")
+                    elif entry.is_file():
+                        files.append(Path(rel_path))
+                except OSError:
+                    continue
+            stack.extend(reversed(subdirs))
+        self.logger.debug(f"Scanned {len(files)} files, pruned {pruned} directories.")
+        return files
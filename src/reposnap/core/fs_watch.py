@@ -0,0 +1,249 @@
+# src/reposnap/core/fs_watch.py
+
+"""
+Minimal recursive filesystem watcher built on Linux inotify via ctypes.
+
+Only what the snapshot daemon needs: a callback per created, deleted or
+modified path (relative to the watched root), a ``written`` event once a
+file's new content is complete (closed after writing, or renamed into
+place), plus an ``overflow`` event when the kernel queue overflowed and the
+caller has to assume anything changed.
+On platforms without inotify :meth:`InotifyWatcher.available` is False.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, List, Optional
+
+logger = logging.getLogger(__name__)
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+# (kind, relative POSIX path, is_dir); kind is "created", "deleted",
+# "modified", "written" or "overflow" (path is "" for overflow).
+WatchCallback = Callable[[str, str, bool], None]
+
+_libc: Optional[ctypes.CDLL] = None
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    global _libc
+    if _libc is None and sys.platform.startswith("linux"):
+        try:
+            libc = ctypes.CDLL(
+                ctypes.util.find_library("c") or "libc.so.6", use_errno=True
+            )
+            libc.inotify_init1  # noqa: B018 - probe for the symbol
+            libc.inotify_add_watch.argtypes = [
+                ctypes.c_int,
+                ctypes.c_char_p,
+                ctypes.c_uint32,
+            ]
+            libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+            _libc = libc
+        except (OSError, AttributeError):
+            _libc = None
+    return _libc
+
+
+class InotifyWatcher:
+    """
+    Watch *root* recursively and report changes from a background thread.
+
+    Args:
+        root: Directory to watch
+        callback: Called as ``callback(kind, rel_path, is_dir)`` per event
+        shallow_dirs: Top-level directory names that are watched themselves
+            but not descended into (``.git`` by default: its direct entries
+            such as ``index`` and ``HEAD`` matter, the object store does not)
+        prune: Called with a directory's relative path; directories it
+            returns True for (e.g. ignored ones) are not watched at all
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        callback: WatchCallback,
+        shallow_dirs: FrozenSet[str] = frozenset({".git"}),
+        prune: Optional[Callable[[str], bool]] = None,
+    ):
+        self.root = root.resolve()
+        self.callback = callback
+        self.shallow_dirs = shallow_dirs
+        self.prune = prune
+        self._wd_paths: Dict[int, str] = {}
+        self._fd = -1
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def available() -> bool:
+        return _load_libc() is not None
+
+    def start(self) -> None:
+        libc = _load_libc()
+        if libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._add_tree("")
+        self._thread = threading.Thread(
+            target=self._run, name="reposnap-watch", daemon=True
+        )
+        self._thread.start()
+        logger.debug(f"Watching {len(self._wd_paths)} directories under {self.root}")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    # --------------------------------------------------------------
+    # watches
+    # --------------------------------------------------------------
+    def _add_watch(self, rel_dir: str) -> bool:
+        path = os.path.join(self.root, rel_dir) if rel_dir else str(self.root)
+        wd = _libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                logger.warning(
+                    "inotify watch limit reached (fs.inotify.max_user_watches); "
+                    "changes below %s will be missed.",
+                    path,
+                )
+            return False
+        self._wd_paths[wd] = rel_dir
+        return True
+
+    def rescan(self, rel_dir: str = "") -> None:
+        """
+        Apply *prune* again below *rel_dir*, e.g. after a ``.gitignore``
+        change: stop watching directories it now prunes and watch those it
+        no longer does (watcher thread only).
+        """
+        if self.prune is not None:
+            prefix = f"{rel_dir}/" if rel_dir else ""
+            pruned: List[str] = []
+            # Sorted, so a directory is seen before its subdirectories.
+            for wd, path in sorted(self._wd_paths.items(), key=lambda item: item[1]):
+                if not path or not (path == rel_dir or path.startswith(prefix)):
+                    continue
+                if any(path.startswith(f"{p}/") for p in pruned) or (
+                    path not in self.shallow_dirs and self.prune(path)
+                ):
+                    pruned.append(path)
+                    _libc.inotify_rm_watch(self._fd, wd)
+                    del self._wd_paths[wd]
+        self._add_tree(rel_dir)
+
+    def _add_tree(self, rel_dir: str) -> None:
+        stack = [rel_dir]
+        while stack:
+            current = stack.pop()
+            if (
+                current
+                and self.prune is not None
+                and current not in self.shallow_dirs
+                and self.prune(current)
+            ):
+                continue
+            if not self._add_watch(current):
+                continue
+            if current in self.shallow_dirs:
+                continue
+            try:
+                with os.scandir(os.path.join(self.root, current)) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(f"{current}/{entry.name}".lstrip("/"))
+            except OSError:
+                continue
+
+    # --------------------------------------------------------------
+    # event loop
+    # --------------------------------------------------------------
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._fd], [], [], 0.2)
+            if not ready:
+                continue
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            self._dispatch(data)
+
+    def _dispatch(self, data: bytes) -> None:
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                self._notify("overflow", "", False)
+                continue
+            parent = self._wd_paths.get(wd)
+            if parent is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._wd_paths[wd]
+                continue
+            rel_path = f"{parent}/{name}".lstrip("/") if name else parent
+            is_dir = bool(mask & IN_ISDIR)
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                if is_dir:
+                    self._add_tree(rel_path)
+                self._notify("created", rel_path, is_dir)
+                if mask & IN_MOVED_TO and not is_dir:
+                    self._notify("written", rel_path, is_dir)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self._notify("deleted", rel_path, is_dir)
+            elif mask & IN_CLOSE_WRITE:
+                self._notify("written", rel_path, is_dir)
+            elif mask & IN_MODIFY:
+                self._notify("modified", rel_path, is_dir)
+
+    def _notify(self, kind: str, rel_path: str, is_dir: bool) -> None:
+        try:
+            self.callback(kind, rel_path, is_dir)
+        except Exception as e:
+            logger.error(f"Watch callback failed for {kind} {rel_path}: {e}")
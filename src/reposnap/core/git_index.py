@@ -0,0 +1,184 @@
+# src/reposnap/core/git_index.py
+
+"""
+Direct reader for git's ``index`` file (formats v2, v3 and v4).
+
+Listing tracked files this way avoids spawning ``git ls-files`` and the
+GitPython layer in front of it.  The reader is deliberately conservative:
+whenever the repository uses something it does not understand (split or
+sparse indexes, ``GIT_DIR``-style overrides, an unknown version) it returns
+None and the caller falls back to asking git.
+"""
+
+import logging
+import os
+import re
+import struct
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">4sLL")
+# ctime, mtime (seconds + nanoseconds), dev, ino, mode, uid, gid, size
+_STAT_DATA = struct.Struct(">10L")
+_FLAGS = struct.Struct(">H")
+
+_NAME_MASK = 0x0FFF
+_STAGE_SHIFT = 12
+_EXTENDED_FLAG = 0x4000
+_SPARSE_DIR_MODE = 0o040000
+_OBJECT_FORMAT = re.compile(rb"^\s*objectformat\s*=\s*sha256\s*$", re.I | re.M)
+
+# Environment variables that make git look somewhere other than .git/index.
+_OVERRIDES = ("GIT_DIR", "GIT_WORK_TREE", "GIT_INDEX_FILE", "GIT_COMMON_DIR")
+
+
+class IndexEntry(NamedTuple):
+    path: str  # POSIX path relative to the worktree root
+    mode: int
+    object_id: bytes
+    stage: int
+
+
+def has_git_overrides() -> bool:
+    """Return True if the environment redirects git away from ``.git``."""
+    return any(name in os.environ for name in _OVERRIDES)
+
+
+def find_worktree(start: Path) -> Optional[Tuple[Path, Path]]:
+    """
+    Locate the repository containing *start* without running git.
+
+    Returns:
+        ``(worktree_root, git_dir)``, or None when no ``.git`` is found or git
+        would be steered elsewhere by the environment.
+    """
+    if has_git_overrides():
+        return None
+    for candidate in (start, *start.parents):
+        dot_git = candidate / ".git"
+        if dot_git.is_dir():
+            return candidate, dot_git
+        if dot_git.is_file():
+            # Linked worktrees and submodules: "gitdir: <path>"
+            try:
+                text = dot_git.read_text(encoding="utf-8").strip()
+            except OSError:
+                return None
+            if not text.startswith("gitdir:"):
+                return None
+            git_dir = Path(text[len("gitdir:") :].strip())
+            return candidate, (candidate / git_dir).resolve()
+    return None
+
+
+def common_dir(git_dir: Path) -> Path:
+    """Return the directory shared by all worktrees (config, info, objects)."""
+    try:
+        common = (git_dir / "commondir").read_text(encoding="utf-8").strip()
+    except OSError:
+        return git_dir
+    return (git_dir / common).resolve()
+
+
+def _object_id_size(git_dir: Path) -> int:
+    try:
+        config = (common_dir(git_dir) / "config").read_bytes()
+    except OSError:
+        return 20
+    return 32 if _OBJECT_FORMAT.search(config) else 20
+
+
+def _decode_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    # git's offset varint (varint.c), not LEB128
+    byte = data[pos]
+    pos += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, pos
+
+
+def read_index(git_dir: Path) -> Optional[List[IndexEntry]]:
+    """
+    Parse ``<git_dir>/index``.
+
+    Returns:
+        Entries in index order (sorted by path, then stage), or None if the
+        index is missing or uses a feature this reader does not handle.
+    """
+    try:
+        data = (git_dir / "index").read_bytes()
+    except OSError as e:
+        logger.debug(f"Cannot read git index in {git_dir}: {e}")
+        return None
+    try:
+        return _parse_index(data, _object_id_size(git_dir))
+    except (struct.error, IndexError, ValueError) as e:
+        logger.debug(f"Cannot parse git index in {git_dir}: {e}")
+        return None
+
+
+def _parse_index(data: bytes, id_size: int) -> Optional[List[IndexEntry]]:
+    signature, version, count = _HEADER.unpack_from(data, 0)
+    if signature != b"DIRC" or version not in (2, 3, 4):
+        logger.debug(f"Unsupported git index (signature {signature}, v{version})")
+        return None
+
+    entries: List[IndexEntry] = []
+    pos = _HEADER.size
+    previous = b""
+    stat_size = _STAT_DATA.size
+    for _ in range(count):
+        start = pos
+        mode = _STAT_DATA.unpack_from(data, pos)[6]
+        pos += stat_size
+        object_id = data[pos : pos + id_size]
+        pos += id_size
+        (flags,) = _FLAGS.unpack_from(data, pos)
+        pos += _FLAGS.size
+        if flags & _EXTENDED_FLAG:
+            if version < 3:
+                raise ValueError("extended flags in a v2 index")
+            pos += _FLAGS.size
+        if mode == _SPARSE_DIR_MODE:
+            logger.debug("Sparse git index; falling back to git ls-files")
+            return None
+
+        if version == 4:
+            strip, pos = _decode_varint(data, pos)
+            end = data.index(b"\0", pos)
+            name = previous[: len(previous) - strip] + data[pos:end]
+            pos = end + 1
+            previous = name
+        else:
+            length = flags & _NAME_MASK
+            if length == _NAME_MASK:
+                end = data.index(b"\0", pos)
+            else:
+                end = pos + length
+            name = data[pos:end]
+            # Entries are NUL padded to a multiple of eight bytes.
+            pos = start + ((end - start + 8) & ~7)
+
+        entries.append(
+            IndexEntry(
+                name.decode("utf-8", "surrogateescape"),
+                mode,
+                object_id,
+                (flags >> _STAGE_SHIFT) & 3,
+            )
+        )
+
+    # Extensions: a split index keeps most entries in another file.
+    end_of_extensions = len(data) - id_size
+    while pos + 8 <= end_of_extensions:
+        signature, size = struct.unpack_from(">4sL", data, pos)
+        if signature in (b"link", b"sdir"):
+            logger.debug(f"Git index uses '{signature.decode()}'; falling back")
+            return None
+        pos += 8 + size
+    return entries
@@ -0,0 +1,146 @@
+# src/reposnap/core/git_objects.py
+
+"""
+Files of a git revision, read straight from the object database (``--rev``).
+
+``git ls-tree -r -z --long`` lists every file of the commit with its blob id
+and size in one call, and contents are streamed through one long-lived
+``git cat-file --batch`` process, so a snapshot of a tag needs neither a
+checkout nor a process per file.
+"""
+
+import logging
+import subprocess
+import threading
+from pathlib import Path
+from typing import IO, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Tree entry modes of regular files; symlinks and submodules are left out.
+_REGULAR_FILE_MODES = ("100644", "100755")
+
+
+class TreeEntry(NamedTuple):
+    mode: str
+    blob: str
+    size: int
+
+
+def _git(cwd: Path, *args: str) -> bytes:
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True
+    ).stdout
+
+
+class BlobReader:
+    """
+    Reads blobs by id through one ``git cat-file --batch`` process.
+
+    The process is started on the first read; callers on several threads
+    are served one at a time.
+
+    Args:
+        root_dir: Any directory of the repository
+    """
+
+    def __init__(self, root_dir: Path):
+        self.root_dir = root_dir
+        self._batch: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def read(self, blob: str) -> bytes:
+        """
+        Return the contents of *blob*.
+
+        Raises:
+            FileNotFoundError: The object does not exist
+            OSError: The batch process failed
+        """
+        with self._lock:
+            batch = self._batch_process()
+            batch.stdin.write(f"{blob}\n".encode("ascii"))
+            batch.stdin.flush()
+            header = batch.stdout.readline().split()
+            if len(header) != 3:
+                if header[1:2] == [b"missing"]:
+                    raise FileNotFoundError(f"Missing git object: {blob}")
+                raise OSError(f"git cat-file --batch failed for {blob}")
+            data = self._read_exactly(batch.stdout, int(header[2]))
+            batch.stdout.read(1)  # the newline after the contents
+            return data
+
+    @staticmethod
+    def _read_exactly(stream: IO[bytes], size: int) -> bytes:
+        data = stream.read(size)
+        if len(data) != size:
+            raise OSError("git cat-file --batch ended early")
+        return data
+
+    def _batch_process(self) -> subprocess.Popen:
+        if self._batch is None:
+            self._batch = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=self.root_dir,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        return self._batch
+
+    def close(self) -> None:
+        """Stop the ``cat-file`` process, if one was started."""
+        if self._batch is not None:
+            self._batch.stdin.close()
+            self._batch.stdout.close()
+            self._batch.wait()
+            self._batch = None
+
+
+class GitRevision(BlobReader):
+    """
+    The regular files of one commit below a directory of the worktree.
+
+    Args:
+        root_dir: Directory inside the worktree; paths are relative to it and
+            only files below it are listed
+        rev: Anything ``git rev-parse`` accepts that names a commit
+
+    Raises:
+        ValueError: *rev* does not name a commit of the repository
+    """
+
+    def __init__(self, root_dir: Path, rev: str):
+        super().__init__(root_dir)
+        self.rev = rev
+        try:
+            commit = _git(root_dir, "rev-parse", "--verify", "-q", f"{rev}^{{commit}}")
+        except (OSError, subprocess.CalledProcessError):
+            raise ValueError(f"Unknown revision: {rev}") from None
+        self.commit = commit.decode("ascii").strip()
+        self._entries: Optional[Dict[str, TreeEntry]] = None
+
+    @property
+    def entries(self) -> Dict[str, TreeEntry]:
+        """POSIX path relative to root_dir -> entry, in git's path order."""
+        if self._entries is None:
+            # Without --full-tree, ls-tree lists (and names relative to) the
+            # directory it runs in.
+            output = _git(self.root_dir, "ls-tree", "-r", "-z", "--long", self.commit)
+            entries: Dict[str, TreeEntry] = {}
+            for record in output.decode("utf-8", errors="surrogateescape").split("\0"):
+                info, _, path = record.partition("\t")
+                if not path:
+                    continue
+                mode, _, blob, size = info.split()
+                if mode in _REGULAR_FILE_MODES:
+                    entries[path] = TreeEntry(mode, blob, int(size))
+            logger.debug(f"Revision {self.commit[:12]}: {len(entries)} files")
+            self._entries = entries
+        return self._entries
+
+    def files(self) -> List[Path]:
+        """Every file of the revision, relative to root_dir."""
+        return [Path(path) for path in self.entries]
+
+    def entry(self, rel_path: Path) -> Optional[TreeEntry]:
+        return self.entries.get(rel_path.as_posix())
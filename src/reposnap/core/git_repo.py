@@ -1,9 +1,62 @@
 # src/reposnap/core/git_repo.py
 
 import logging
+import os
+import posixpath
 from pathlib import Path
-from git import Repo, InvalidGitRepositoryError
-from typing import List
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from reposnap.core.git_index import IndexEntry, find_worktree, read_index
+
+if TYPE_CHECKING:
+    from git import InvalidGitRepositoryError, Repo
+
+# Index entry modes whose worktree file holds exactly the blob's bytes.
+_REGULAR_FILE_MODES = ("100644", "100755")
+_GITPYTHON_NAMES = ("Repo", "InvalidGitRepositoryError")
+
+
+def _is_null_oid(oid: str) -> bool:
+    """
+    True for the all-zero id git reports for a missing side of a diff
+    (added file, worktree contents): 40 zeros for SHA-1, 64 for SHA-256.
+    """
+    return set(oid) == {"0"}
+
+
+class ChangedFile(NamedTuple):
+    """
+    One file of ``GitRepo.get_changed_files``.
+
+    Attributes:
+        path: Path on the new side, relative to the GitRepo's directory
+        status: ``git diff`` status letter (A, M, T, R, C, U)
+        old_path: POSIX path on the old side, relative to the same directory
+            (differs from *path* for renames and copies)
+        old_blob: Blob id on the old side; None for added files
+    """
+
+    path: Path
+    status: str
+    old_path: str
+    old_blob: Optional[str]
+
+
+def __getattr__(name: str) -> Any:
+    # GitPython costs more to import than the rest of reposnap, and the common
+    # paths never need it, so ``Repo`` and friends are loaded on first use.
+    if name in _GITPYTHON_NAMES:
+        _require_gitpython()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _require_gitpython() -> None:
+    """Bind the GitPython names used below (unless already bound or patched)."""
+    import git
+
+    for name in _GITPYTHON_NAMES:
+        globals().setdefault(name, getattr(git, name))
 
 
 class GitRepo:
@@ -12,89 +65,256 @@ class GitRepo:
         self.logger = logging.getLogger(__name__)
 
     def get_git_files(self) -> List[Path]:
+        indexed = self._read_index()
+        if indexed is not None:
+            prefix, entries = indexed
+            git_files_relative: List[Path] = []
+            last = None
+            for entry in entries:
+                # Unmerged paths appear once per stage.
+                if entry.path == last or not entry.path.startswith(prefix):
+                    continue
+                last = entry.path
+                git_files_relative.append(Path(entry.path[len(prefix) :]))
+            self.logger.debug(
+                f"Git files from index: {len(git_files_relative)} under {self.repo_path}"
+            )
+            return git_files_relative
+
+        _require_gitpython()
         try:
             repo: Repo = Repo(self.repo_path, search_parent_directories=True)
             repo_root: Path = Path(repo.working_tree_dir).resolve()
+            prefix = self._prefix_within(repo_root)
+            if prefix is None:
+                return []
             git_files: List[str] = repo.git.ls_files().splitlines()
-            self.logger.debug(f"Git files from {repo_root}: {git_files}")
-            git_files_relative: List[Path] = []
-            for f in git_files:
-                absolute_path: Path = (repo_root / f).resolve()
-                try:
-                    relative_path: Path = absolute_path.relative_to(self.repo_path)
-                    git_files_relative.append(relative_path)
-                except ValueError:
-                    # Skip files not under root_dir
-                    continue
-            return git_files_relative
+            self.logger.debug(f"Git files from {repo_root}: {len(git_files)}")
+            # Plain prefix test instead of resolve(): git reports normalised
+            # paths relative to the worktree root.
+            return [Path(f[len(prefix) :]) for f in git_files if f.startswith(prefix)]
         except InvalidGitRepositoryError:
             self.logger.error(f"Invalid Git repository at: {self.repo_path}")
             return []
 
+    def _prefix_within(self, repo_root: Path) -> Optional[str]:
+        """Return self.repo_path relative to *repo_root* as ``"dir/"`` (or "")."""
+        try:
+            prefix = self.repo_path.relative_to(repo_root).as_posix()
+        except ValueError:
+            return None
+        return "" if prefix == "." else f"{prefix}/"
+
+    def _read_index(self) -> Optional[Tuple[str, List[IndexEntry]]]:
+        """Return ``(prefix, entries)`` straight from .git/index, if possible."""
+        located = find_worktree(self.repo_path)
+        if located is None:
+            return None
+        repo_root, git_dir = located
+        entries = read_index(git_dir)
+        if entries is None:
+            return None
+        return self._prefix_within(repo_root) or "", entries
+
+    def get_blob_ids(self) -> Dict[str, str]:
+        """
+        Map every *clean* tracked regular file to its git blob id.
+
+        Files that differ from the index (``git diff-files``) are left out, so
+        each returned id names the exact bytes currently on disk.  Keys are
+        POSIX paths relative to self.repo_path.
+        """
+        _require_gitpython()
+        try:
+            repo: Repo = Repo(self.repo_path, search_parent_directories=True)
+            repo_root: Path = Path(repo.working_tree_dir).resolve()
+            prefix = self._prefix_within(repo_root)
+            if prefix is None:
+                return {}
+
+            dirty = set(repo.git.diff_files("--name-only", "-z").split("\0"))
+            blob_ids: Dict[str, str] = {}
+            for mode, blob, stage, path in self._staged_entries(repo):
+                if (
+                    mode not in _REGULAR_FILE_MODES
+                    or stage != "0"
+                    or path in dirty
+                    or not path.startswith(prefix)
+                ):
+                    continue
+                blob_ids[path[len(prefix) :]] = blob
+            self.logger.debug(f"Clean blob ids from {repo_root}: {len(blob_ids)}")
+            return blob_ids
+        except InvalidGitRepositoryError:
+            self.logger.error(f"Invalid Git repository at: {self.repo_path}")
+            return {}
+
+    def _staged_entries(self, repo: "Repo") -> Iterator[Tuple[str, str, str, str]]:
+        """Yield ``(mode, blob, stage, path)`` like ``git ls-files -s``."""
+        indexed = self._read_index()
+        if indexed is not None:
+            for entry in indexed[1]:
+                yield (
+                    f"{entry.mode:o}",
+                    entry.object_id.hex(),
+                    str(entry.stage),
+                    entry.path,
+                )
+            return
+        for line in repo.git.ls_files("-s", "-z").split("\0"):
+            if not line:
+                continue
+            info, _, path = line.partition("\t")
+            mode, blob, stage = info.split(" ")
+            yield mode, blob, stage, path
+
     def get_uncommitted_files(self) -> List[Path]:
         """
         Return every *working-copy* file that differs from HEAD - staged,
-        unstaged, untracked, plus everything referenced in `git stash list`.
+        unstaged, untracked, plus every file touched by a `git stash` entry.
         Paths are *relative to* self.repo_path.
+
+        One ``git status --porcelain=v2 -z`` call lists the first three (its
+        status codes tell which paths no longer exist) and one
+        ``git stash list --name-only`` call covers all stash entries.
         """
+        _require_gitpython()
         try:
             repo: Repo = Repo(self.repo_path, search_parent_directories=True)
             repo_root: Path = Path(repo.working_tree_dir).resolve()
-            paths: set = set()
-
-            # Staged changes (diff between index and HEAD)
-            for diff in repo.index.diff("HEAD"):
-                paths.add(diff.a_path or diff.b_path)
-
-            # Unstaged changes (diff between working tree and index)
-            for diff in repo.index.diff(None):
-                paths.add(diff.a_path or diff.b_path)
+            prefix = self._prefix_within(repo_root)
+            if prefix is None:
+                return []
 
-            # Untracked files
-            paths.update(repo.untracked_files)
+            status = repo.git.status("--porcelain=v2", "-z", "--untracked-files=all")
+            paths = set(_porcelain_v2_paths(status))
 
-            # Stash entries - with performance guard
             try:
-                stash_refs = repo.git.stash("list", "--format=%gd").splitlines()
-                # Limit stash processing to prevent performance issues
-                max_stashes = 10
-                if len(stash_refs) > max_stashes:
-                    self.logger.warning(
-                        f"Large stash stack detected ({len(stash_refs)} entries). "
-                        f"Processing only the first {max_stashes} stashes."
-                    )
-                    stash_refs = stash_refs[:max_stashes]
-
-                for ref in stash_refs:
-                    if ref.strip():  # Skip empty lines
-                        stash_files = repo.git.diff(
-                            "--name-only", f"{ref}^1", ref
-                        ).splitlines()
-                        paths.update(stash_files)
+                stashed = repo.git.stash(
+                    "list", "-z", "--name-only", "--format=%x01", "-m", "--first-parent"
+                )
             except Exception as e:
                 self.logger.debug(f"Error processing stash entries: {e}")
+            else:
+                for path in _stash_paths(stashed):
+                    # A stash may name files that are gone from the worktree.
+                    if path not in paths and os.path.isfile(
+                        os.path.join(repo_root, path)
+                    ):
+                        paths.add(path)
 
-            # Convert to relative paths and filter existing files
-            relative_paths = []
-            for path_str in paths:
-                if path_str:  # Skip empty strings
-                    absolute_path = (repo_root / path_str).resolve()
-                    try:
-                        relative_path = absolute_path.relative_to(self.repo_path)
-                        if absolute_path.is_file():
-                            relative_paths.append(relative_path)
-                    except ValueError:
-                        # Log warning for paths outside repo root
-                        self.logger.warning(
-                            f"Path {path_str} is outside repository root {self.repo_path}. Skipping."
-                        )
-                        continue
-
-            # Return sorted, deduplicated list for deterministic output
-            result = sorted(set(relative_paths))
-            self.logger.debug(f"Uncommitted files from {repo_root}: {result}")
+            # Sorted for deterministic output
+            result = sorted(
+                Path(path[len(prefix) :]) for path in paths if path.startswith(prefix)
+            )
+            self.logger.debug(f"Uncommitted files from {repo_root}: {len(result)}")
             return result
 
         except InvalidGitRepositoryError:
             self.logger.error(f"Invalid Git repository at: {self.repo_path}")
             return []
+
+    def get_changed_files(self, revs: str) -> List[ChangedFile]:
+        """
+        Return the files changed in *revs*, relative to self.repo_path.
+
+        *revs* is given to ``git diff`` as on the command line: ``REV``
+        compares that revision with the working tree, ``A..B`` and ``A...B``
+        compare two commits.  One ``git diff --raw -z`` call lists every
+        change with its status and old blob id.  Deleted files, symlinks and
+        submodules are left out; renames and copies are listed under their
+        new path.
+
+        Raises:
+            ValueError: git cannot compare *revs*
+        """
+        _require_gitpython()
+        try:
+            repo: Repo = Repo(self.repo_path, search_parent_directories=True)
+        except InvalidGitRepositoryError:
+            self.logger.error(f"Invalid Git repository at: {self.repo_path}")
+            return []
+        repo_root: Path = Path(repo.working_tree_dir).resolve()
+        prefix = self._prefix_within(repo_root)
+        if prefix is None:
+            return []
+        try:
+            raw = repo.git.diff("--raw", "-z", "--no-abbrev", "--find-renames", revs)
+        except Exception as e:
+            raise ValueError(f"Cannot diff {revs}: {e}") from None
+
+        base = prefix.rstrip("/") or "."
+        changed = []
+        for _old_mode, new_mode, old_blob, status, old, new in _raw_diff_records(raw):
+            if status == "D" or new_mode not in _REGULAR_FILE_MODES:
+                continue
+            if not new.startswith(prefix):
+                continue
+            changed.append(
+                ChangedFile(
+                    Path(new[len(prefix) :]),
+                    status,
+                    posixpath.relpath(old, base),
+                    None if _is_null_oid(old_blob) else old_blob,
+                )
+            )
+        self.logger.debug(f"Changed files in {revs}: {len(changed)}")
+        return changed
+
+
+def _raw_diff_records(output: str) -> Iterator[Tuple[str, str, str, str, str, str]]:
+    """
+    Yield ``(old_mode, new_mode, old_blob, status, old_path, new_path)`` for
+    each record of ``git diff --raw -z``; the status loses its score.
+    """
+    records = iter(output.split("\0"))
+    for record in records:
+        if not record.startswith(":"):
+            continue
+        old_mode, new_mode, old_blob, _, status = record[1:].split(" ")
+        old_path = next(records, "")
+        # Renames and copies name both paths.
+        new_path = next(records, "") if status[:1] in "RC" else old_path
+        yield old_mode, new_mode, old_blob, status[:1], old_path, new_path
+
+
+# Fields before the path in ``git status --porcelain=v2`` records.
+_PORCELAIN_V2_FIELDS = {"1": 8, "2": 9, "u": 10}
+
+
+def _porcelain_v2_paths(output: str) -> Iterator[str]:
+    """
+    Yield the paths of ``git status --porcelain=v2 -z`` that exist on disk.
+
+    Deleted entries (staged or not) and submodules are left out; renames
+    and copies yield their new path only.
+    """
+    records = iter(output.split("\0"))
+    for record in records:
+        kind = record[:1]
+        if kind == "?":
+            yield record[2:]
+            continue
+        fields = _PORCELAIN_V2_FIELDS.get(kind)
+        if fields is None:
+            continue  # headers, ignored files
+        parts = record.split(" ", fields)
+        xy, sub, path = parts[1], parts[2], parts[-1]
+        if kind == "2":
+            next(records, None)  # the original path
+        if sub.startswith("S"):
+            continue
+        # An unmerged path keeps a worktree file unless both sides deleted it.
+        if (xy == "DD") if kind == "u" else ("D" in xy):
+            continue
+        yield path
+
+
+def _stash_paths(output: str) -> Iterator[str]:
+    """Yield the file names of ``git stash list -z --name-only --format=%x01``."""
+    for name in output.split("\0"):
+        # Each entry starts with its \x01 header; the file list after a newline.
+        if name.startswith("\n"):
+            name = name[1:]
+        if name and name != "\x01":
+            yield name
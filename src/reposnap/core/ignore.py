@@ -0,0 +1,200 @@
+# src/reposnap/core/ignore.py
+
+"""
+Git's ignore rules for one worktree.
+
+Sources, from highest to lowest precedence:
+
+* the ``.gitignore`` of the path's directory, then of each parent directory
+  up to the root (patterns are relative to the directory holding the file);
+* ``.git/info/exclude``;
+* the file named by ``core.excludesFile`` (default
+  ``$XDG_CONFIG_HOME/git/ignore``).
+
+Within a source the last matching pattern decides; the first source with a
+matching pattern wins.  A path inside an ignored directory is ignored no
+matter what, exactly like git, which never looks inside such a directory.
+
+Each directory's ``.gitignore`` is read and compiled once
+(:func:`~reposnap.core.path_matcher.compile_matcher` in exact mode) and each
+directory keeps its chain of applicable matchers, so evaluating a path costs
+one cached lookup per parent directory plus one match per source that has
+rules.
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from reposnap.core.git_index import common_dir, find_worktree
+from reposnap.core.path_matcher import PathMatcher, compile_matcher
+
+logger = logging.getLogger(__name__)
+
+# (characters to strip from a path to make it relative to the source, rules)
+Chain = List[Tuple[int, PathMatcher]]
+
+
+def _config_home() -> Path:
+    xdg = os.environ.get("XDG_CONFIG_HOME")
+    return Path(xdg) if xdg else Path.home() / ".config"
+
+
+def _config_value(config: Path, section: str, key: str) -> Optional[str]:
+    """Return the last ``section.key`` in a git config file (no includes)."""
+    try:
+        lines = config.read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return None
+    value = None
+    current = ""
+    for line in lines:
+        line = line.strip()
+        if line.startswith("["):
+            current = line[1:].split("]", 1)[0].split(" ", 1)[0].strip().lower()
+            continue
+        name, sep, raw = line.partition("=")
+        if current != section or not sep or name.strip().lower() != key:
+            continue
+        raw = raw.strip()
+        if raw.startswith('"'):
+            value = raw[1:].split('"', 1)[0]
+        else:
+            value = raw.split("#", 1)[0].split(";", 1)[0].strip()
+    return value
+
+
+def global_excludes_file(git_dir: Optional[Path] = None) -> Path:
+    """Return the file ``core.excludesFile`` points to (or git's default)."""
+    global_config = os.environ.get("GIT_CONFIG_GLOBAL")
+    if global_config:
+        configs = [Path(global_config)]
+    else:
+        configs = [_config_home() / "git" / "config", Path.home() / ".gitconfig"]
+    if git_dir is not None:
+        configs.append(common_dir(git_dir) / "config")
+    excludes = None
+    for config in configs:
+        excludes = _config_value(config, "core", "excludesfile") or excludes
+    if excludes:
+        return Path(os.path.expanduser(excludes))
+    return _config_home() / "git" / "ignore"
+
+
+def read_patterns(path: Path) -> Optional[List[str]]:
+    """Return the patterns of an ignore file, or None if it cannot be read."""
+    try:
+        lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return None
+    # Comments and blank lines never match; skipping them here keeps a file
+    # like git's default info/exclude from compiling (and importing) anything.
+    return [line for line in lines if line.strip() and not line.startswith("#")]
+
+
+def _mtime(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+class IgnoreRules:
+    """
+    Evaluate ``.gitignore`` files, ``info/exclude`` and the global excludes
+    file the way git does.
+
+    Args:
+        root_dir: Worktree root; ``.gitignore`` files are looked up below it
+        exclude_files: Files whose patterns are relative to root_dir, in
+            decreasing precedence, consulted after every ``.gitignore``
+    """
+
+    def __init__(self, root_dir: Path, exclude_files: Sequence[Path] = ()):
+        self.root_dir = root_dir
+        self.exclude_files = list(exclude_files)
+        self._stamps = [_mtime(path) for path in self.exclude_files]
+        self._base: Chain = []
+        for path in self.exclude_files:
+            patterns = read_patterns(path)
+            if patterns:
+                self._base.append((0, compile_matcher(patterns, exact=True)))
+        # directory ("" for the root) -> its compiled .gitignore, if any
+        self._matchers: Dict[str, Optional[PathMatcher]] = {}
+        self._chains: Dict[str, Chain] = {}
+        self._ignored_dirs: Dict[str, bool] = {}
+
+    @classmethod
+    def for_worktree(cls, root_dir: Path) -> "IgnoreRules":
+        """Rules for *root_dir*, with git's exclude files if it is a worktree."""
+        located = find_worktree(root_dir)
+        if located is None or located[0] != root_dir:
+            return cls(root_dir)
+        git_dir = located[1]
+        return cls(
+            root_dir,
+            [common_dir(git_dir) / "info" / "exclude", global_excludes_file(git_dir)],
+        )
+
+    def stale(self) -> bool:
+        """True if an exclude file changed since the rules were loaded."""
+        return self._stamps != [_mtime(path) for path in self.exclude_files]
+
+    @property
+    def gitignore_count(self) -> int:
+        """Number of ``.gitignore`` files read so far."""
+        return sum(1 for matcher in self._matchers.values() if matcher is not None)
+
+    def is_ignored(self, path: str, is_dir: bool = False) -> bool:
+        """
+        Return True if git would ignore *path*.
+
+        Args:
+            path: POSIX path relative to root_dir
+            is_dir: Whether *path* is a directory
+        """
+        head = path.rpartition("/")[0]
+        if head and self._dir_ignored(head):
+            return True
+        return self._decide(head, f"{path}/" if is_dir else path)
+
+    def _dir_ignored(self, rel_dir: str) -> bool:
+        ignored = self._ignored_dirs.get(rel_dir)
+        if ignored is None:
+            parent = rel_dir.rpartition("/")[0]
+            ignored = bool(parent and self._dir_ignored(parent)) or self._decide(
+                parent, f"{rel_dir}/"
+            )
+            self._ignored_dirs[rel_dir] = ignored
+        return ignored
+
+    def _decide(self, rel_dir: str, path: str) -> bool:
+        for offset, matcher in self._chain(rel_dir):
+            decision = matcher.decide(path[offset:])
+            if decision is not None:
+                return decision
+        return False
+
+    def _chain(self, rel_dir: str) -> Chain:
+        chain = self._chains.get(rel_dir)
+        if chain is None:
+            chain = []
+            matcher = self._matcher(rel_dir)
+            if matcher is not None:
+                chain.append((len(rel_dir) + 1 if rel_dir else 0, matcher))
+            if rel_dir:
+                chain.extend(self._chain(rel_dir.rpartition("/")[0]))
+            else:
+                chain.extend(self._base)
+            self._chains[rel_dir] = chain
+        return chain
+
+    def _matcher(self, rel_dir: str) -> Optional[PathMatcher]:
+        if rel_dir not in self._matchers:
+            patterns = read_patterns(self.root_dir / rel_dir / ".gitignore")
+            matcher = compile_matcher(patterns, exact=True) if patterns else None
+            if matcher is not None:
+                logger.debug("Loaded .gitignore in '%s'", rel_dir or ".")
+            self._matchers[rel_dir] = matcher
+        return self._matchers[rel_dir]
@@ -0,0 +1,104 @@
+# src/reposnap/core/manifest.py
+
+"""
+Section manifest used for incremental snapshot regeneration.
+
+The manifest is stored next to the output (``<output>.manifest.json``) and
+records, for every file section, the source file's ``mtime``/``size`` and the
+byte range and SHA-256 of the rendered section inside the output.  A later
+run can then copy unchanged sections straight out of the previous output.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = ".manifest.json"
+
+
+class SnapshotManifest:
+    """
+    Byte ranges of the file sections of one snapshot.
+
+    Args:
+        fingerprint: Identifies the rendering options; a manifest is only
+            reused by a run with the same fingerprint
+        started_ns: ``time.time_ns()`` when rendering started. Files modified
+            at or after this instant are never reused (the same "racy" rule
+            git applies to its index)
+    """
+
+    def __init__(self, fingerprint: str, started_ns: int):
+        self.fingerprint = fingerprint
+        self.started_ns = started_ns
+        self.sections: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def path_for(output_file: Path) -> Path:
+        return output_file.with_name(output_file.name + MANIFEST_SUFFIX)
+
+    @classmethod
+    def load(cls, output_file: Path, fingerprint: str) -> Optional["SnapshotManifest"]:
+        """
+        Load the manifest of *output_file* if it can be trusted.
+
+        Returns None when the manifest is missing or unreadable, was written
+        with other options, or the output was modified after it was written.
+        """
+        path = cls.path_for(output_file)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            out = output_file.stat()
+        except (OSError, ValueError) as e:
+            logger.debug(f"No usable manifest at {path}: {e}")
+            return None
+        if (
+            data.get("version") != MANIFEST_VERSION
+            or data.get("fingerprint") != fingerprint
+            or data.get("output") != [out.st_size, out.st_mtime_ns]
+        ):
+            logger.debug(f"Manifest {path} is stale; regenerating everything.")
+            return None
+        manifest = cls(fingerprint, data["started_ns"])
+        manifest.sections = data["sections"]
+        return manifest
+
+    def lookup(self, rel_path: str, st: os.stat_result) -> Optional[Dict[str, Any]]:
+        """Return the entry for *rel_path* if the file is unchanged since then."""
+        entry = self.sections.get(rel_path)
+        if (
+            entry is None
+            or entry["size"] != st.st_size
+            or entry["mtime_ns"] != st.st_mtime_ns
+            or st.st_mtime_ns >= self.started_ns
+        ):
+            return None
+        return entry
+
+    def record(
+        self, rel_path: str, st: os.stat_result, offset: int, length: int, sha256: str
+    ) -> None:
+        self.sections[rel_path] = {
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "offset": offset,
+            "length": length,
+            "sha256": sha256,
+        }
+
+    def save(self, output_file: Path) -> None:
+        """Write the manifest, pinned to the current state of *output_file*."""
+        out = output_file.stat()
+        data = {
+            "version": MANIFEST_VERSION,
+            "fingerprint": self.fingerprint,
+            "started_ns": self.started_ns,
+            "output": [out.st_size, out.st_mtime_ns],
+            "sections": self.sections,
+        }
+        self.path_for(output_file).write_text(json.dumps(data), encoding="utf-8")
@@ -1,10 +1,113 @@
 # src/reposnap/core/markdown_generator.py           ★ fully-rewritten file
+import hashlib
+import io
+import json
 import logging
+import os
+import stat
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    TextIO,
+    Tuple,
+)
 
+from reposnap.core.manifest import SnapshotManifest
 from reposnap.utils.path_utils import format_tree
 
+if TYPE_CHECKING:
+    from reposnap.core.budget import BudgetPlan, OutputBudget
+    from reposnap.core.cache import SnapshotCache
+    from reposnap.core.diff_scope import DiffScope
+    from reposnap.core.git_objects import GitRevision
+    from reposnap.core.tokens import TokenStats
+
+# Size of the write buffer used for the output handle (bytes).
+DEFAULT_BUFFER_SIZE = 1024 * 1024  # 1 MiB
+# Upper bound on bytes read ahead of the writer when reading in parallel.
+DEFAULT_MAX_INFLIGHT_BYTES = 64 * 1024 * 1024  # 64 MiB
+# Read-ahead depth per worker thread.
+PREFETCH_PER_JOB = 4
+# (content, error) of one file read; exactly one of them is set.
+_ReadResult = Tuple[Optional[str], Optional[Exception]]
+
+
+def _disk_bytes(text: str) -> bytes:
+    """Return *text* as the output handle stores it (UTF-8, native newlines)."""
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode("utf-8")
+
+
+class _OffsetTracker:
+    """Text-handle wrapper that tracks the byte offset of everything written."""
+
+    def __init__(self, fh: TextIO):
+        self.fh = fh
+        self.offset = 0
+
+    def write(self, text: str) -> bytes:
+        data = _disk_bytes(text)
+        self.fh.write(text)
+        self.offset += len(data)
+        return data
+
+
+class OmittedFile(Exception):
+    """A file rendered as a placeholder: binary, or over the size limit."""
+
+    def __init__(self, kind: str, size: int, limit: Optional[int] = None):
+        self.kind = kind
+        self.size = size
+        self.limit = limit
+        if limit is None:
+            message = f"{kind} file, {size} bytes: contents omitted"
+        else:
+            message = f"{kind} file, {size} bytes (limit {limit}): contents omitted"
+        super().__init__(message)
+
+
+class _ReadStats:
+    """Thread-safe tally of how files were classified and what it cost."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+        self.classify_ns = 0
+        self.bytes_read = 0
+
+    def record(self, kind: Optional[str], elapsed_ns: int) -> None:
+        with self._lock:
+            key = kind or "text"
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.classify_ns += elapsed_ns
+
+    def add_bytes(self, size: int) -> None:
+        with self._lock:
+            self.bytes_read += size
+
+    def summary(self) -> str:
+        files = sum(self.counts.values())
+        per_file = self.classify_ns / files / 1000 if files else 0.0
+        kinds = ", ".join(f"{n} {kind}" for kind, n in sorted(self.counts.items()))
+        return (
+            f"classified {files} files in {self.classify_ns / 1e6:.1f} ms "
+            f"({per_file:.1f} us/file): {kinds or 'none'}"
+        )
+
 
 class MarkdownGenerator:
     """Render the collected file-tree into a single Markdown document."""
@@ -15,59 +118,605 @@ class MarkdownGenerator:
         output_file: Path,
         structure_only: bool = False,
         hide_untoggled: bool = False,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        sink: Optional[TextIO] = None,
+        jobs: int = 1,
+        max_inflight_bytes: int = DEFAULT_MAX_INFLIGHT_BYTES,
+        cache: Optional["SnapshotCache"] = None,
+        blob_ids: Optional[Dict[str, str]] = None,
+        incremental: bool = False,
+        budget: Optional["OutputBudget"] = None,
+        token_stats: Optional["TokenStats"] = None,
+        max_file_size: Optional[int] = None,
+        revision: Optional["GitRevision"] = None,
+        hunks: Optional["DiffScope"] = None,
     ):
         self.root_dir = root_dir.resolve()
         self.output_file = output_file.resolve()
         self.structure_only = structure_only
         self.hide_untoggled = hide_untoggled
+        self.buffer_size = buffer_size
+        # An already-open text stream to write into instead of *output_file*.
+        # The caller owns it: we write and flush, but never close it.
+        self.sink = sink
+        # Number of reader threads; 0 means one per CPU.
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        self.max_inflight_bytes = max_inflight_bytes
+        # Contents of files listed in *blob_ids* (clean tracked files, keyed by
+        # POSIX relative path) are served from / stored into *cache*.
+        self.cache = cache
+        self.blob_ids = blob_ids or {}
+        # Read files from this commit instead of the working tree (--rev).
+        self.revision = revision
+        # Render each file as its changed hunks against this diff (--hunks).
+        self.hunks = hunks
+        self._sections: Optional[Dict[Path, _ReadResult]] = None
+        # Reuse unchanged sections of the previous output (plain file output
+        # of whole working-tree files only: sections of a compressed file
+        # cannot be copied by byte range).
+        self.incremental = (
+            incremental
+            and sink is None
+            and self._codec() is None
+            and revision is None
+            and hunks is None
+        )
+        # Size budget (--max-bytes/--max-tokens); its plan is kept for callers.
+        self.budget = budget
+        self.budget_plan: Optional["BudgetPlan"] = None
+        self._limits: Dict[Path, int] = {}
+        self._markers: Optional[Dict[str, str]] = None
+        # Counts every section as it is written (--stats).
+        self.token_stats = token_stats
+        # Files larger than this are not read but shown as a placeholder, like
+        # binary files (detected from their first bytes); None: no limit.
+        self.max_file_size = max_file_size
+        self.read_stats = _ReadStats()
         self.logger = logging.getLogger(__name__)
+        if incremental and not self.incremental:
+            self.logger.info(
+                "Incremental output needs a plain file of whole working-tree "
+                "files; writing it all."
+            )
 
     # --------------------------------------------------------------
     # public API
     # --------------------------------------------------------------
     def generate_markdown(
-        self, tree_structure: Dict[str, Any], files: List[Path]
+        self, tree_structure: Mapping[str, Any], files: List[Path]
     ) -> None:
         """Write header (tree) and, unless *structure_only*, every file body."""
-        self._write_header(tree_structure)
-        if not self.structure_only:
-            self._write_file_contents(files)
+        if self.hunks is not None and not self.structure_only:
+            # Hunk sizes are only known once computed, so compute them first.
+            self._sections = self._diff_sections(files)
+        if self.budget is not None and not self.structure_only:
+            files = self._apply_budget(tree_structure, files)
+        if self.incremental:
+            self._generate_incremental(tree_structure, files)
+        else:
+            with self._open_output() as fh:
+                self._write_header(fh, tree_structure)
+                if not self.structure_only:
+                    self._write_file_contents(fh, files)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("File reads: %s", self.read_stats.summary())
 
     # --------------------------------------------------------------
     # helpers
     # --------------------------------------------------------------
-    def _write_header(self, tree_structure: Dict[str, Any]) -> None:
+    @contextmanager
+    def _open_output(self, target: Optional[Path] = None) -> Iterator[TextIO]:
+        """
+        Yield the single handle used for the whole run.
+
+        The output file (or *target*) is opened and truncated exactly once
+        with a *buffer_size* write buffer; every section goes through that
+        handle.  A ``.gz``/``.bz2``/``.xz``/``.zst`` target is compressed
+        while it is written.
+        """
+        if self.sink is not None:
+            yield self.sink
+            self.sink.flush()
+            return
+        target = target or self.output_file
+        codec = self._codec()
+        wrap = None
+        if codec is not None:
+            from reposnap.core.compression import compressor
+
+            wrap = compressor(codec)
+            self.logger.debug("Compressing %s with %s.", target, codec)
+        try:
+            raw = target.open(mode="wb", buffering=self.buffer_size)
+        except OSError as exc:
+            self.logger.error("Failed to open output %s: %s", target, exc)
+            raise
+        with raw:
+            binary = raw if wrap is None else wrap(raw)
+            with io.TextIOWrapper(binary, encoding="utf-8", write_through=False) as fh:
+                yield fh
+
+    def _codec(self) -> Optional[str]:
+        """Compression implied by the output file name (None for plain text)."""
+        from reposnap.core.compression import codec_for
+
+        return codec_for(self.output_file)
+
+    def _apply_budget(
+        self, tree_structure: Mapping[str, Any], files: List[Path]
+    ) -> List[Path]:
+        """Plan the budget from file sizes; return the files to render."""
+        from reposnap.core.budget import tree_marker
+
+        header_bytes = sum(
+            len(_disk_bytes(line)) for line in self._header_lines(tree_structure)
+        )
+        sizes = None
+        if self._sections is not None:
+            sizes = {
+                path.as_posix(): self._section_size(content, error)
+                for path, (content, error) in self._sections.items()
+            }
+        elif self.revision is not None:
+            sizes = {path: entry.size for path, entry in self.revision.entries.items()}
+        # Hunk section sizes already include any placeholder.
+        placeholder_size = self._placeholder_size if self._sections is None else None
+        plan = self.budget.plan(
+            self.root_dir, files, header_bytes, sizes, placeholder_size
+        )
+        self.budget_plan = plan
+        self._limits = plan.limits
+        self._markers = {
+            path: tree_marker(status) for path, status in plan.markers.items()
+        }
+        self.logger.info("Output budget: %s", plan.summary())
+        return plan.files
+
+    def _placeholder_size(self, size: int) -> int:
+        """Bytes of the placeholder shown for a binary or oversized file."""
+        from reposnap.core.content_search import BINARY, OVERSIZED
+
+        if self.max_file_size is not None and size > self.max_file_size:
+            error = OmittedFile(OVERSIZED, size, self.max_file_size)
+        else:
+            error = OmittedFile(BINARY, size)
+        return self._section_size(None, error)
+
+    def _diff_sections(self, files: List[Path]) -> Dict[Path, _ReadResult]:
+        """Read *files* and turn each into its hunks (see :attr:`hunks`)."""
+        sections: Dict[Path, _ReadResult] = {}
+        for rel_path, _, content, error in self._iter_file_contents(files):
+            if content is not None:
+                try:
+                    content = self.hunks.hunks(rel_path, content)
+                except OSError as exc:
+                    content, error = None, exc
+            sections[rel_path] = (content, error)
+        return sections
+
+    @staticmethod
+    def _section_size(content: Optional[str], error: Optional[Exception]) -> int:
+        if isinstance(error, OmittedFile):
+            return len(f"[{error}]\n".encode("utf-8"))
+        return len(content.encode("utf-8")) if content is not None else 0
+
+    def _header_lines(self, tree_structure: Mapping[str, Any]) -> Iterator[str]:
+        yield "# Project Structure\n\n```\n"
+        yield from format_tree(
+            tree_structure, hide_untoggled=self.hide_untoggled, markers=self._markers
+        )
+        yield "```\n\n"
+
+    def _write_header(self, fh: TextIO, tree_structure: Mapping[str, Any]) -> None:
         """Emit the *Project Structure* section."""
         self.logger.debug("Writing Markdown header and project structure.")
         try:
-            with self.output_file.open(mode="w", encoding="utf-8") as fh:
-                fh.write("# Project Structure\n\n```\n")
-                for line in format_tree(
-                    tree_structure, hide_untoggled=self.hide_untoggled
-                ):
+            if self.token_stats is None:
+                for line in self._header_lines(tree_structure):
                     fh.write(line)
-                fh.write("```\n\n")
+            else:
+                from reposnap.core.tokens import STRUCTURE_ROW
+
+                header = "".join(self._header_lines(tree_structure))
+                fh.write(header)
+                self._count(STRUCTURE_ROW, header)
         except OSError as exc:
             self.logger.error("Failed to write header: %s", exc)
             raise
 
-    def _write_file_contents(self, files: List[Path]) -> None:
+    def _write_file_contents(self, fh: TextIO, files: List[Path]) -> None:
         """Append every file in *files* under its own fenced section."""
         self.logger.debug("Writing file contents to Markdown.")
+        for rel_path, abs_path, content, error in self._iter_file_contents(files):
+            content = self._section_content(rel_path, abs_path, content, error)
+            if content is not None:
+                self._write_single_file(fh, abs_path, rel_path.as_posix(), content)
+
+    def _section_content(
+        self,
+        rel_path: Path,
+        abs_path: Path,
+        content: Optional[str],
+        error: Optional[Exception],
+    ) -> Optional[str]:
+        """Return the body to render for one read result (None: skip the file)."""
+        if isinstance(error, OmittedFile):
+            self.logger.debug("Omitting %s: %s", abs_path, error)
+            return f"[{error}]\n"
+        if self._report_read_error(abs_path, error):
+            return None
+        if rel_path in self._limits:
+            return self._with_truncation_note(rel_path, content)
+        return content
+
+    def _count(
+        self,
+        row: str,
+        text: str,
+        data: Optional[bytes] = None,
+        digest: Optional[str] = None,
+    ) -> None:
+        """Add one written section to token_stats."""
+        if self.token_stats is not None:
+            if data is None:
+                data = _disk_bytes(text)
+            self.token_stats.add(row, text, data, digest)
+
+    def _with_truncation_note(self, rel_path: Path, content: str) -> str:
+        from reposnap.core.budget import truncation_note
+
+        shown = len(content.encode("utf-8"))
+        size = self.budget_plan.sizes[rel_path.as_posix()]
+        body = content if not content or content.endswith("\n") else f"{content}\n"
+        return body + truncation_note(shown, size)
+
+    def _report_read_error(self, abs_path: Path, error: Optional[Exception]) -> bool:
+        """Log a failed read; return True if the file has to be skipped."""
+        if isinstance(error, FileNotFoundError):  # git had stale entry
+            self.logger.debug("File not found: %s -- skipping.", abs_path)
+        elif isinstance(error, UnicodeDecodeError):
+            self.logger.error("Unicode error for %s: %s", abs_path, error)
+        elif error is not None:
+            self.logger.error("Error processing %s: %s", abs_path, error)
+        return error is not None
+
+    # --------------------------------------------------------------
+    # incremental regeneration
+    # --------------------------------------------------------------
+    def _fingerprint(self) -> str:
+        """Identify the options that shape a section's bytes."""
+        return json.dumps(
+            {
+                "structure_only": self.structure_only,
+                "hide": self.hide_untoggled,
+                "max_file_size": self.max_file_size,
+            }
+        )
+
+    def _generate_incremental(
+        self, tree_structure: Mapping[str, Any], files: List[Path]
+    ) -> None:
+        """
+        Regenerate the output, copying unchanged sections from the last run.
+
+        The header is always re-rendered.  A file section is copied by byte
+        range from the previous output when the file's ``mtime``/``size``
+        match the manifest and the copied bytes still hash to the recorded
+        SHA-256; everything else is rendered normally.  The new output is
+        written next to the old one and swapped in atomically.
+        """
+        fingerprint = self._fingerprint()
+        previous = SnapshotManifest.load(self.output_file, fingerprint)
+        manifest = SnapshotManifest(fingerprint, time.time_ns())
+        tmp_file = self.output_file.with_name(self.output_file.name + ".tmp")
+        old = self.output_file.open("rb") if previous else None
+        try:
+            with self._open_output(tmp_file) as fh:
+                tracker = _OffsetTracker(fh)
+                self._write_header(tracker, tree_structure)
+                if not self.structure_only:
+                    self._write_sections_incremental(
+                        tracker, files, previous, old, manifest
+                    )
+        finally:
+            if old is not None:
+                old.close()
+        os.replace(tmp_file, self.output_file)
+        manifest.save(self.output_file)
+
+    def _write_sections_incremental(
+        self,
+        tracker: _OffsetTracker,
+        files: List[Path],
+        previous: Optional[SnapshotManifest],
+        old: Optional[IO[bytes]],
+        manifest: SnapshotManifest,
+    ) -> None:
+        stats: Dict[Path, os.stat_result] = {}
+        reusable: Dict[Path, Dict[str, Any]] = {}
         for rel_path in files:
-            abs_path = self.root_dir / rel_path
-            if not abs_path.exists():  # git had stale entry
-                self.logger.debug("File not found: %s -- skipping.", abs_path)
-                continue
+            if rel_path in self._limits:
+                continue  # truncated sections depend on the budget, not the file
             try:
-                self._write_single_file(abs_path, rel_path.as_posix())
-            except UnicodeDecodeError as exc:
-                self.logger.error("Unicode error for %s: %s", abs_path, exc)
+                st = (self.root_dir / rel_path).stat()
+            except OSError:
+                continue  # reported by the regular reader below
+            stats[rel_path] = st
+            entry = previous.lookup(rel_path.as_posix(), st) if previous else None
+            if entry is not None:
+                reusable[rel_path] = entry
+
+        fresh = self._iter_file_contents([f for f in files if f not in reusable])
+        spliced = 0
+        for rel_path in files:
+            rel_str = rel_path.as_posix()
+            abs_path = self.root_dir / rel_path
+            entry = reusable.get(rel_path)
+            section = self._splice(old, entry) if entry is not None else None
+            if section is not None:
+                spliced += 1
+            else:
+                if entry is None:
+                    _, _, content, error = next(fresh)
+                else:  # damaged range in the old output: re-read now
+                    content, error = self._read(rel_path, abs_path, None)
+                content = self._section_content(rel_path, abs_path, content, error)
+                if content is None:
+                    continue
+                section = self._render_section(abs_path, rel_str, content)
+            offset = tracker.offset
+            data = tracker.write(section)
+            digest = hashlib.sha256(data).hexdigest()
+            if rel_path in stats:
+                manifest.record(rel_str, stats[rel_path], offset, len(data), digest)
+            self._count(rel_str, section, data, digest)
+        self.logger.debug(
+            "Incremental run: reused %d of %d sections.", spliced, len(files)
+        )
+
+    @staticmethod
+    def _splice(old: IO[bytes], entry: Dict[str, Any]) -> Optional[str]:
+        """Return the section recorded in *entry* from the old output, if intact."""
+        old.seek(entry["offset"])
+        data = old.read(entry["length"])
+        if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            return None
+        text = data.decode("utf-8")
+        return text.replace(os.linesep, "\n") if os.linesep != "\n" else text
+
+    # --------------------------------------------------------------
+    # readers
+    # --------------------------------------------------------------
+    def _iter_file_contents(
+        self, files: List[Path]
+    ) -> Iterator[Tuple[Path, Path, Optional[str], Optional[Exception]]]:
+        """
+        Yield ``(rel_path, abs_path, content, error)`` for *files*, in order.
+
+        With ``jobs > 1`` files are read and decoded by a thread pool ahead of
+        the writer.  Read-ahead is bounded both by count and by the summed
+        on-disk size of the files in flight (*max_inflight_bytes*); a single
+        file larger than the cap is still read, just on its own.
+
+        Files whose blob id is cached are neither stat'ed nor read.  Files
+        with a budget limit are read only up to it and never cached.  Once
+        computed, hunk sections are served (and truncated) from memory.
+        """
+        limits = self._limits
+        if self._sections is not None:
+            for rel_path in files:
+                content, error = self._sections[rel_path]
+                limit = limits.get(rel_path)
+                if content is not None and limit is not None:
+                    content = content.encode("utf-8")[:limit].decode("utf-8", "ignore")
+                yield rel_path, self.root_dir / rel_path, content, error
+            return
+        if self.jobs <= 1:
+            for rel_path in files:
+                abs_path = self.root_dir / rel_path
+                limit = limits.get(rel_path)
+                blob = self._blob_for(rel_path) if limit is None else None
+                cached = self._cached_content(blob)
+                if cached is not None:
+                    yield rel_path, abs_path, cached, None
+                    continue
+                content, error = self._read(rel_path, abs_path, limit)
+                self._remember(blob, content)
+                yield rel_path, abs_path, content, error
+            return
+
+        pending: Deque[Tuple[Path, Path, Future, int, Optional[str]]] = deque()
+        inflight = 0
+        max_pending = self.jobs * PREFETCH_PER_JOB
+        remaining = iter(files)
+        with ThreadPoolExecutor(
+            max_workers=self.jobs, thread_name_prefix="reposnap-read"
+        ) as pool:
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < max_pending:
+                    if pending and inflight >= self.max_inflight_bytes:
+                        break
+                    rel_path = next(remaining, None)
+                    if rel_path is None:
+                        exhausted = True
+                        break
+                    abs_path = self.root_dir / rel_path
+                    limit = limits.get(rel_path)
+                    blob = self._blob_for(rel_path) if limit is None else None
+                    cached = self._cached_content(blob)
+                    size = 0
+                    if cached is not None:
+                        # Already remembered; keep it in line to preserve order.
+                        blob = None
+                        future = self._done((cached, None))
+                    else:
+                        try:
+                            size = self._source_size(rel_path, abs_path)
+                        except OSError as exc:
+                            future = self._done((None, exc))
+                        else:
+                            if limit is not None:
+                                size = min(size, limit)
+                            elif self.max_file_size is not None:
+                                # Oversized files are never read.
+                                size = size if size <= self.max_file_size else 0
+                            future = pool.submit(self._read, rel_path, abs_path, limit)
+                    pending.append((rel_path, abs_path, future, size, blob))
+                    inflight += size
+                if not pending:
+                    return
+                rel_path, abs_path, future, size, blob = pending.popleft()
+                content, error = future.result()
+                inflight -= size
+                self._remember(blob, content)
+                yield rel_path, abs_path, content, error
+
+    @staticmethod
+    def _done(result: Tuple[Optional[str], Optional[Exception]]) -> Future:
+        """Wrap an already-known read result in a completed future."""
+        future: Future = Future()
+        future.set_result(result)
+        return future
+
+    def _blob_for(self, rel_path: Path) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.blob_ids.get(rel_path.as_posix())
+
+    def _cached_content(self, blob: Optional[str]) -> Optional[str]:
+        if blob is None:
+            return None
+        content = self.cache.get_section(blob)
+        limit = self.max_file_size
+        # A character takes 1-4 bytes; only encode when that is undecided.
+        if (
+            content is not None
+            and limit is not None
+            and len(content) * 4 > limit
+            and (len(content) > limit or len(content.encode("utf-8")) > limit)
+        ):
+            return None  # cached under a larger limit: classify it again
+        return content
+
+    def _remember(self, blob: Optional[str], content: Optional[str]) -> None:
+        if blob is not None and content is not None:
+            self.cache.put_section(blob, content)
+
+    def _read(
+        self, rel_path: Path, abs_path: Path, limit: Optional[int]
+    ) -> Tuple[Optional[str], Optional[Exception]]:
+        """Read one file from the revision or the working tree."""
+        if self.revision is not None:
+            return self._read_blob(rel_path, limit)
+        return self._read_file(abs_path, limit, self.max_file_size, self.read_stats)
+
+    def _source_size(self, rel_path: Path, abs_path: Path) -> int:
+        if self.revision is None:
+            return abs_path.stat().st_size
+        entry = self.revision.entry(rel_path)
+        if entry is None:
+            raise FileNotFoundError(f"Not in revision {self.revision.rev}: {rel_path}")
+        return entry.size
+
+    @staticmethod
+    def _read_file(
+        file_path: Path,
+        limit: Optional[int] = None,
+        max_size: Optional[int] = None,
+        stats: Optional[_ReadStats] = None,
+    ) -> Tuple[Optional[str], Optional[Exception]]:
+        """
+        Read and decode one file, returning the error instead of raising.
+
+        The file is opened once; its size and first bytes decide whether it
+        is read at all (see :func:`~reposnap.core.content_search.classify`).
+        Binary files and files over *max_size* come back as an
+        :class:`OmittedFile` error, after reading at most the sniffed head.
+        With *limit* only the first *limit* bytes are read (no size limit
+        applies); a character cut in half at the end is dropped.  The cost
+        of the classification is added to *stats*.
+        """
+        from reposnap.core.content_search import OVERSIZED, classify
+
+        try:
+            with file_path.open("rb") as raw:
+                started = time.perf_counter_ns()
+                st = os.fstat(raw.fileno())
+                if not stat.S_ISREG(st.st_mode):
+                    raise IsADirectoryError(f"Not a regular file: {file_path}")
+                kind, head = classify(
+                    raw, st.st_size, max_size if limit is None else None
+                )
+                if stats is not None:
+                    stats.record(kind, time.perf_counter_ns() - started)
+                if kind is not None:
+                    limit_hit = max_size if kind == OVERSIZED else None
+                    return None, OmittedFile(kind, st.st_size, limit_hit)
+                if limit is None:
+                    data = head + raw.read()
+                else:
+                    data = (head + raw.read(max(limit - len(head), 0)))[:limit]
+                if stats is not None:
+                    stats.add_bytes(len(data))
+            return MarkdownGenerator._decode(data, truncated=limit is not None), None
+        except (OSError, UnicodeDecodeError) as exc:
+            return None, exc
+
+    def _read_blob(
+        self, rel_path: Path, limit: Optional[int]
+    ) -> Tuple[Optional[str], Optional[Exception]]:
+        """Like :meth:`_read_file`, for a file of self.revision."""
+        from reposnap.core.content_search import BINARY, OVERSIZED, looks_binary
+
+        entry = self.revision.entry(rel_path)
+        if entry is None:
+            return None, FileNotFoundError(rel_path)
+        max_size = self.max_file_size if limit is None else None
+        try:
+            started = time.perf_counter_ns()
+            # The size comes from the tree listing: no need to fetch the blob.
+            if max_size is not None and entry.size > max_size:
+                self.read_stats.record(OVERSIZED, time.perf_counter_ns() - started)
+                return None, OmittedFile(OVERSIZED, entry.size, max_size)
+            data = self.revision.read(entry.blob)
+            self.read_stats.add_bytes(len(data))
+            kind = BINARY if looks_binary(data) else None
+            self.read_stats.record(kind, time.perf_counter_ns() - started)
+            if kind is not None:
+                return None, OmittedFile(kind, entry.size)
+            if limit is not None:
+                data = data[:limit]
+            return self._decode(data, truncated=limit is not None), None
+        except (OSError, UnicodeDecodeError) as exc:
+            return None, exc
+
+    @staticmethod
+    def _decode(data: bytes, truncated: bool = False) -> str:
+        """
+        Decode UTF-8 with the newline translation of a text-mode read.
+
+        For *truncated* data a character cut in half at the end is dropped.
+
+        Raises:
+            UnicodeDecodeError: *data* is not UTF-8
+        """
+        try:
+            text = data.decode("utf-8")
+        except UnicodeDecodeError as exc:
+            if not truncated or exc.start < len(data) - 3:
+                raise
+            text = data[: exc.start].decode("utf-8")
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
 
     # --------------------------------------------------------------
     # single-file writer
     # --------------------------------------------------------------
-    def _write_single_file(self, file_path: Path, rel_str: str) -> None:
+    def _write_single_file(
+        self, fh: TextIO, file_path: Path, rel_str: str, content: str
+    ) -> None:
         """
         Append one file.
 
@@ -75,17 +724,14 @@ class MarkdownGenerator:
         of *content* and the closing code-fence so the output is stable and
         deterministic (important for tests and downstream diff-tools).
         """
-        try:
-            with file_path.open(encoding="utf-8") as src:
-                content = src.read()
-
-            with self.output_file.open(mode="a", encoding="utf-8") as dst:
-                dst.write(f"## {rel_str}\n\n")
-                dst.write("```python\n" if file_path.suffix == ".py" else "```\n")
+        section = self._render_section(file_path, rel_str, content)
+        fh.write(section)
+        self._count(rel_str, section)
 
-                # normalise trailing EOL → exactly one '\n'
-                dst.write(content if content.endswith("\n") else f"{content}\n")
-
-                dst.write("```\n\n")
-        except OSError as exc:
-            self.logger.error("Error processing %s: %s", file_path, exc)
+    @staticmethod
+    def _render_section(file_path: Path, rel_str: str, content: str) -> str:
+        """Return the complete Markdown section for one file."""
+        fence = "```python\n" if file_path.suffix == ".py" else "```\n"
+        # normalise trailing EOL → exactly one '\n'
+        body = content if content.endswith("\n") else f"{content}\n"
+        return f"## {rel_str}\n\n{fence}{body}```\n\n"
@@ -0,0 +1,102 @@
+# src/reposnap/core/metrics.py
+
+"""
+Per-stage timings and counters of a snapshot run (``--profile``).
+
+Each stage of :meth:`ProjectController.run` records its wall time, the
+number of files going in and coming out, the bytes read and written and
+the cache hits.  A counter a stage does not measure stays ``None`` and is
+shown as ``-``.  The result is printed as a table or as JSON.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+FORMATS = ("table", "json")
+_COUNTERS = ("files_in", "files_out", "bytes_read", "bytes_written", "cache_hits")
+
+
+class StageMetrics:
+    """Measurements of one stage; see the module docstring."""
+
+    __slots__ = ("name", "seconds") + _COUNTERS
+
+    def __init__(self, name: str):
+        self.name = name
+        self.seconds: Optional[float] = None
+        self.files_in: Optional[int] = None
+        self.files_out: Optional[int] = None
+        self.bytes_read: Optional[int] = None
+        self.bytes_written: Optional[int] = None
+        self.cache_hits: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class Metrics:
+    """Stages of one run, in the order they were first recorded."""
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, StageMetrics] = {}
+
+    def get(self, name: str) -> StageMetrics:
+        """Return stage *name*, creating it on first use."""
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = StageMetrics(name)
+        return stage
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageMetrics]:
+        """Time the block; repeated blocks of one stage add up."""
+        stage = self.get(name)
+        start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            elapsed = time.perf_counter() - start
+            stage.seconds = (stage.seconds or 0.0) + elapsed
+
+    def record(self, name: str, **counters: Optional[int]) -> StageMetrics:
+        """Set counters of stage *name* without timing it."""
+        stage = self.get(name)
+        for field, value in counters.items():
+            setattr(stage, field, value)
+        return stage
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(stage.seconds or 0.0 for stage in self.stages.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stages": [stage.to_dict() for stage in self.stages.values()],
+            "total_seconds": self.total_seconds,
+        }
+
+    def format(self, fmt: str = "table") -> str:
+        """Return the report in one of :data:`FORMATS`."""
+        if fmt == "json":
+            import json
+
+            return json.dumps(self.to_dict(), indent=2) + "\n"
+        return self.format_table()
+
+    def format_table(self) -> str:
+        header = ["stage", "ms", "files in", "files out", "read", "written", "hits"]
+        rows: List[List[str]] = [header]
+        for stage in self.stages.values():
+            ms = "-" if stage.seconds is None else f"{stage.seconds * 1000:.1f}"
+            counters = [getattr(stage, field) for field in _COUNTERS]
+            rows.append(
+                [stage.name, ms] + ["-" if c is None else str(c) for c in counters]
+            )
+        rows.append(["total", f"{self.total_seconds * 1000:.1f}"] + [""] * 5)
+        width = max(len(row[0]) for row in rows)
+        lines = [
+            f"{row[0]:<{width}}" + "".join(f" {cell:>10}" for cell in row[1:])
+            for row in rows
+        ]
+        return "\n".join(line.rstrip() for line in lines) + "\n"
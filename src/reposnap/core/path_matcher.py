@@ -0,0 +1,303 @@
+# src/reposnap/core/path_matcher.py
+
+"""
+Compiled gitwildmatch matchers for include/exclude and ``.gitignore``.
+
+``pathspec.PathSpec.match_file`` tries every pattern in turn for every path.
+:class:`PathMatcher` answers the same question with at most a few set lookups
+and one regular expression:
+
+* plain names (``node_modules``, ``build/``) and extension patterns
+  (``*.pyc``, ``*.tar.gz``) go into hash sets that are probed once per path
+  component;
+* every other pattern is folded into a single alternation regex.
+
+Patterns are translated here rather than through pathspec, whose generated
+regexes differ between releases; the translation follows pathspec's
+gitwildmatch semantics (and git's, in exact mode).
+
+Negated patterns (``!keep.log``) make the last matching pattern decide, so a
+pattern set containing one skips the hash sets and compiles the alternation
+in reverse order instead: the first alternative that matches is then the
+last pattern in file order, and its group number says whether it negates.
+
+In ``exact`` mode a pattern has to match the path itself, as in git, rather
+than the path or one of its parent directories as in pathspec; directories
+are then passed with a trailing slash.  :mod:`reposnap.core.ignore` uses it
+to evaluate nested ``.gitignore`` files one directory at a time.
+
+Matchers are immutable and cached by pattern tuple (:func:`compile_matcher`),
+so the daemon and the GUI compile a pattern set once per process.
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional, Pattern, Set, Tuple
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+class _Rule(NamedTuple):
+    """One parsed gitwildmatch pattern."""
+
+    include: bool
+    # Anchored patterns match from the root; the rest at any depth.
+    anchored: bool
+    dir_only: bool
+    # Path segments with consecutive "**" collapsed.
+    segments: Tuple[str, ...]
+
+
+def _parse(pattern: str) -> Optional[_Rule]:
+    """
+    Parse *pattern* as git does; return None for blank lines and comments.
+
+    Raises:
+        ValueError: The pattern is invalid (a dangling escape or an
+            unterminated bracket expression), so git would skip it
+    """
+    if not pattern.endswith("\\ "):
+        pattern = pattern.rstrip(" ")
+    if not pattern or pattern.startswith("#"):
+        return None
+    include = not pattern.startswith("!")
+    if not include:
+        pattern = pattern[1:]
+    dir_only = pattern.endswith("/")
+    if dir_only:
+        pattern = pattern[:-1]
+    if not pattern:
+        # "/" matches nothing in git.
+        return None
+    anchored = "/" in pattern
+    segments: List[str] = []
+    for segment in pattern.lstrip("/").split("/"):
+        if not (segment == "**" and segments and segments[-1] == "**"):
+            segments.append(segment)
+    for segment in segments:
+        _translate_segment(segment)  # validate
+    return _Rule(include, anchored, dir_only, tuple(segments))
+
+
+def _translate_segment(segment: str) -> str:
+    """Translate one path segment glob into a regex (derived from fnmatch)."""
+    out: List[str] = []
+    i, end = 0, len(segment)
+    while i < end:
+        char = segment[i]
+        i += 1
+        if char == "\\":
+            if i == end:
+                raise ValueError(f"Dangling escape in {segment!r}")
+            out.append(re.escape(segment[i]))
+            i += 1
+        elif char == "*":
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "[":
+            j = i
+            if j < end and segment[j] in "!^":
+                j += 1
+            # A "]" right after the opening bracket is a literal.
+            if j < end and segment[j] == "]":
+                j += 1
+            while j < end and segment[j] != "]":
+                j += 1
+            if j == end:
+                raise ValueError(f"Unterminated bracket in {segment!r}")
+            body = segment[i:j]
+            if body[0] in "!^":
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+            i = j + 1
+        else:
+            out.append(re.escape(char))
+    return "".join(out)
+
+
+def _literal(segment: str) -> Optional[str]:
+    """Return *segment* unescaped if it has no wildcards, else None."""
+    out: List[str] = []
+    escaped = False
+    for char in segment:
+        if escaped:
+            out.append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char in _GLOB_CHARS:
+            return None
+        else:
+            out.append(char)
+    return "".join(out)
+
+
+def _regex(rule: _Rule, exact: bool) -> str:
+    """
+    Build the regex of *rule*, for ``re.match`` against a relative path.
+
+    pathspec semantics (not *exact*) let a pattern match a path or any of
+    its parent directories, so the regex only has to match a prefix that
+    ends at a path separator.  In *exact* mode it has to match the whole
+    path, and directories end with a slash.
+    """
+    segments = rule.segments
+    if segments == ("**",):
+        # Everything (every directory with a trailing slash).
+        if rule.dir_only:
+            return "^.+/$" if exact else "^.*/"
+        return "^.+$" if exact else "^."
+    parts = ["^" if rule.anchored else "^(?:.+/)?"]
+    last = len(segments) - 1
+    for position, segment in enumerate(segments):
+        if segment != "**":
+            # A name is never empty, even if "*" may match nothing.
+            glob = "[^/]+" if segment == "*" else _translate_segment(segment)
+            parts.append(glob + ("/" if position < last else ""))
+        elif position < last:
+            parts.append("(?:.+/)?")
+    if segments[-1] == "**":
+        # "dir/**" matches everything below dir/; "dir/**/" (exact mode
+        # only) the directories below it.
+        if not exact:
+            return "".join(parts)
+        return "".join(parts) + (".+/$" if rule.dir_only else ".+$")
+    if rule.dir_only:
+        parts.append("/$" if exact else "/")
+    else:
+        parts.append("/?$" if exact else "(?:/|$)")
+    return "".join(parts)
+
+
+class PathMatcher:
+    """
+    A set of gitwildmatch patterns compiled for fast matching.
+
+    ``match_file`` gives the same answer as ``PathSpec.match_file`` for
+    normalised POSIX paths relative to the root, so a matcher can be passed
+    wherever a ``PathSpec`` was (e.g. :meth:`FileTree.filter_files`).
+
+    Args:
+        patterns: Patterns in file order, as accepted by pathspec
+        exact: Match like git instead of pathspec (see the module
+            docstring); invalid patterns are skipped, as git does
+    """
+
+    __slots__ = (
+        "patterns",
+        "exact",
+        "names",
+        "dir_names",
+        "suffixes",
+        "dir_suffixes",
+        "_regex",
+        "_negates",
+    )
+
+    def __init__(self, patterns: Iterable[str], exact: bool = False):
+        self.patterns: Tuple[str, ...] = tuple(patterns)
+        self.exact = exact
+        rules: List[_Rule] = []
+        for pattern in self.patterns:
+            try:
+                rule = _parse(pattern)
+            except ValueError:
+                if not exact:
+                    raise
+                continue
+            if rule is not None:
+                rules.append(rule)
+
+        self.names: Set[str] = set()
+        self.dir_names: Set[str] = set()
+        self.suffixes: Set[str] = set()
+        self.dir_suffixes: Set[str] = set()
+        self._negates: Optional[List[bool]] = None
+        if all(rule.include for rule in rules):
+            rest = [rule for rule in rules if not self._index(rule)]
+            self._regex: Optional[Pattern[str]] = (
+                _alternation("(?:", rest, exact) if rest else None
+            )
+        else:
+            rest = rules[::-1]
+            self._negates = [not rule.include for rule in rest]
+            self._regex = _alternation("(", rest, exact)
+
+    def _index(self, rule: _Rule) -> bool:
+        """Put a plain-name or extension pattern into the hash sets."""
+        if rule.anchored or rule.segments == ("**",):
+            return False
+        segment = rule.segments[0]
+        names, suffixes = self.names, self.suffixes
+        if rule.dir_only:
+            names, suffixes = self.dir_names, self.dir_suffixes
+        name = _literal(segment)
+        if name is not None:
+            names.add(name)
+            return True
+        suffix = _literal(segment[1:]) if segment.startswith("*") else None
+        if suffix is None or not suffix.startswith("."):
+            return False
+        suffixes.add(suffix)
+        return True
+
+    def _indexed(self, path: str) -> bool:
+        is_dir_path = path.endswith("/")
+        parts = (path[:-1] if is_dir_path else path).split("/")
+        if self.exact:
+            parts = parts[-1:]
+        last = len(parts) - 1
+        for position, part in enumerate(parts):
+            is_dir = is_dir_path or position < last
+            if part in self.names or (is_dir and part in self.dir_names):
+                return True
+            dot = part.find(".")
+            while dot != -1:
+                suffix = part[dot:]
+                if suffix in self.suffixes or (is_dir and suffix in self.dir_suffixes):
+                    return True
+                dot = part.find(".", dot + 1)
+        return False
+
+    def decide(self, path: str) -> Optional[bool]:
+        """
+        Return what the last pattern matching *path* says.
+
+        Returns:
+            True if it selects the path, False if it is a negated pattern,
+            None if no pattern matches.
+        """
+        if self._negates is not None:
+            match = self._regex.match(path)
+            return None if match is None else not self._negates[match.lastindex - 1]
+        if (
+            self.names or self.dir_names or self.suffixes or self.dir_suffixes
+        ) and self._indexed(path):
+            return True
+        if self._regex is not None and self._regex.match(path) is not None:
+            return True
+        return None
+
+    def match_file(self, path: str) -> bool:
+        """Return True if the patterns select *path* (POSIX, relative)."""
+        return bool(self.decide(path))
+
+    def __repr__(self) -> str:
+        return f"PathMatcher({len(self.patterns)} patterns)"
+
+
+def _alternation(group: str, rules: List[_Rule], exact: bool) -> Pattern[str]:
+    return re.compile(
+        "|".join(f"{group}{_regex(rule, exact)})" for rule in rules), re.DOTALL
+    )
+
+
+@lru_cache(maxsize=256)
+def _compile(patterns: Tuple[str, ...], exact: bool) -> PathMatcher:
+    return PathMatcher(patterns, exact)
+
+
+def compile_matcher(patterns: Iterable[str], exact: bool = False) -> PathMatcher:
+    """Return the (cached) :class:`PathMatcher` for *patterns*."""
+    return _compile(tuple(patterns), exact)
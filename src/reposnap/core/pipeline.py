@@ -0,0 +1,153 @@
+# src/reposnap/core/pipeline.py
+
+"""
+Single-pass path collection pipeline.
+
+Candidate paths flow through every cheap stage (input-path routing, include,
+exclude, ``.gitignore``) exactly once; a path stops at the first stage that
+rejects it.  Expensive stages such as the content search run afterwards as
+batch stages on the survivors only.  Every stage counts the paths it saw and
+kept, so it is easy to see where paths were dropped.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+# Returns the bucket (input path index) a path belongs to, or None to drop it.
+Router = Callable[[str], Optional[int]]
+Predicate = Callable[[str], bool]
+T = TypeVar("T")
+
+
+class PrefixRouter:
+    """
+    Route POSIX paths to the first of several input paths containing them.
+
+    The input paths are compiled into a trie of path components, so routing
+    costs one dict lookup per component of the routed path no matter how
+    many input paths there are.
+
+    Args:
+        prefixes: Input paths (POSIX, relative); the bucket of a path is the
+            smallest index among the prefixes that equal or contain it
+    """
+
+    # Marks "an input path ends here"; real components are never empty.
+    _BUCKET = ""
+
+    def __init__(self, prefixes: Iterable[str]):
+        self._root: Dict[str, Any] = {}
+        for index, prefix in enumerate(prefixes):
+            node = self._root
+            for part in prefix.split("/"):
+                node = node.setdefault(part, {})
+            node.setdefault(self._BUCKET, index)
+
+    def __call__(self, path: str) -> Optional[int]:
+        node = self._root
+        best = None
+        for part in path.split("/"):
+            node = node.get(part)
+            if node is None:
+                break
+            bucket = node.get(self._BUCKET)
+            if bucket is not None and (best is None or bucket < best):
+                best = bucket
+        return best
+
+
+class StageCounter:
+    __slots__ = ("name", "seen", "kept")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.seen = 0
+        self.kept = 0
+
+    @property
+    def dropped(self) -> int:
+        return self.seen - self.kept
+
+
+class CollectionPipeline:
+    """
+    Chain of per-path stages applied in one pass.
+
+    Args:
+        router: Optional first stage assigning each path to an input-path
+            bucket. Survivors are returned grouped by bucket (in bucket
+            order, stable within a bucket), which keeps the order in which
+            positional paths were given.
+    """
+
+    def __init__(self, router: Optional[Router] = None):
+        self.router = router
+        self.route_counter = StageCounter("input paths")
+        self.filters: List[Tuple[StageCounter, Predicate]] = []
+        self.batch_counters: List[StageCounter] = []
+        self.listed = 0
+
+    def add_filter(self, name: str, keep: Predicate) -> None:
+        """Append a cheap stage; *keep* receives the POSIX relative path."""
+        self.filters.append((StageCounter(name), keep))
+
+    def run(self, items: Iterable[T], key: Callable[[T], str] = str) -> List[T]:
+        """
+        Push *items* through the routing and filter stages.
+
+        Args:
+            items: Candidates, e.g. relative ``Path`` objects
+            key: Maps an item to the POSIX relative path the stages look at
+
+        Returns:
+            The surviving items.
+        """
+        router, route_counter = self.router, self.route_counter
+        filters = self.filters
+        buckets: List[List[T]] = []
+        single: List[T] = []
+        listed = 0
+        for item in items:
+            listed += 1
+            path = key(item)
+            bucket = 0
+            if router is not None:
+                route_counter.seen += 1
+                bucket = router(path)
+                if bucket is None:
+                    continue
+                route_counter.kept += 1
+            for counter, keep in filters:
+                counter.seen += 1
+                if not keep(path):
+                    break
+                counter.kept += 1
+            else:
+                if router is None:
+                    single.append(item)
+                    continue
+                while len(buckets) <= bucket:
+                    buckets.append([])
+                buckets[bucket].append(item)
+        self.listed += listed
+        if router is None:
+            return single
+        return [item for bucket_items in buckets for item in bucket_items]
+
+    def record(self, name: str, seen: int, kept: int) -> None:
+        """Record the counts of a batch stage run outside :meth:`run`."""
+        counter = StageCounter(name)
+        counter.seen, counter.kept = seen, kept
+        self.batch_counters.append(counter)
+
+    def counters(self) -> List[StageCounter]:
+        stages = [counter for counter, _ in self.filters] + self.batch_counters
+        if self.router is not None:
+            stages.insert(0, self.route_counter)
+        return stages
+
+    def summary(self) -> str:
+        """One line such as ``listed 120 -> include 40 (-80) -> ...``."""
+        parts = [f"listed {self.listed}"]
+        for counter in self.counters():
+            parts.append(f"{counter.name} {counter.kept} (-{counter.dropped})")
+        return " -> ".join(parts)
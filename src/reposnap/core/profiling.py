@@ -0,0 +1,122 @@
+# src/reposnap/core/profiling.py
+
+"""
+Profile a run for ``--profile-out FILE``, with the standard library only.
+
+The profiler is chosen by the file suffix, like the compressed outputs:
+
+* ``.folded`` / ``.collapsed``: a sampling profiler records the stack of
+  every thread each millisecond and writes collapsed stacks (one
+  ``thread;frame;...;frame count`` line per distinct stack), the input of
+  ``flamegraph.pl`` and speedscope.  Reader and search worker threads show
+  up under their own thread names.
+* anything else: ``cProfile``, saved in ``pstats`` format (read it with
+  ``python -m pstats FILE`` or snakeviz).  cProfile only sees the calling
+  thread, so the CLI runs such profiles with ``--jobs 1`` to keep the file
+  reads and the content search on it.
+"""
+
+import logging
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SAMPLED_SUFFIXES = (".folded", ".collapsed")
+# Seconds between two samples.
+DEFAULT_INTERVAL = 0.001
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)  # Python 3.11+
+    return f"{Path(code.co_filename).stem}.{name}".replace(";", ":")
+
+
+class StackSampler:
+    """
+    Counts the stacks of all other threads, sampled from a daemon thread.
+
+    Args:
+        interval: Seconds between two samples
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="reposnap-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(own)
+
+    def sample(self, skip: Optional[int] = None) -> None:
+        """Record the current stack of every thread except *skip*."""
+        names: Dict[int, str] = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == skip:
+                continue
+            stack: List[str] = []
+            current: Optional[FrameType] = frame
+            while current is not None:
+                stack.append(_frame_name(current))
+                current = current.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def write(self, path: Path) -> None:
+        """Write the collapsed stacks, most frequent first."""
+        with path.open("w", encoding="utf-8") as fh:
+            for stack, count in self.stacks.most_common():
+                fh.write(f"{stack} {count}\n")
+
+
+def sees_all_threads(out: Path) -> bool:
+    """True if the profile written to *out* covers worker threads too."""
+    return out.suffix.lower() in SAMPLED_SUFFIXES
+
+
+def profile_call(func: Callable[[], None], out: Path) -> None:
+    """
+    Call *func* under the profiler selected by *out*'s suffix and write the
+    profile to *out*, also when *func* raises.
+    """
+    if sees_all_threads(out):
+        sampler = StackSampler()
+        sampler.start()
+        try:
+            func()
+        finally:
+            sampler.stop()
+            sampler.write(out)
+        logger.info(f"Sampled {sampler.samples} stacks into {out}.")
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(func)
+    finally:
+        profiler.dump_stats(str(out))
+    logger.info(f"cProfile statistics written to {out}.")
@@ -0,0 +1,187 @@
+# src/reposnap/core/tokens.py
+
+"""
+Token counts for ``--stats``.
+
+A tokenizer is chosen with a spec string:
+
+* ``bytes`` (default): one token per :data:`~reposnap.core.budget.BYTES_PER_TOKEN`
+  bytes of UTF-8, the same estimate ``--max-tokens`` uses;
+* ``tiktoken`` or ``tiktoken:<encoding>``: an OpenAI BPE encoding (default
+  ``cl100k_base``), needs the optional ``tiktoken`` package;
+* ``<module>:<function>``: any importable callable taking the text and
+  returning either a token count or a sequence of tokens.
+
+Counts of real tokenizers are cached by the SHA-256 of the counted text in
+the :class:`~reposnap.core.cache.SnapshotCache`, so a repeated run only
+tokenizes sections that changed.
+"""
+
+import hashlib
+import importlib
+import math
+from pathlib import PurePosixPath
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from reposnap.core.budget import BYTES_PER_TOKEN
+
+if TYPE_CHECKING:
+    from reposnap.core.cache import SnapshotCache
+
+DEFAULT_TOKENIZER = "bytes"
+DEFAULT_TIKTOKEN_ENCODING = "cl100k_base"
+# Report row for the "Project Structure" section.
+STRUCTURE_ROW = "(project structure)"
+
+
+class Tokenizer:
+    """
+    A named token counter.
+
+    Args:
+        name: Spec the tokenizer was created from; also its cache namespace
+        count: Returns the number of tokens in a text
+        cacheable: Whether counts are worth caching (False for estimates
+            that are cheaper than hashing the text)
+    """
+
+    def __init__(self, name: str, count: Callable[[str], int], cacheable: bool = True):
+        self.name = name
+        self.count = count
+        self.cacheable = cacheable
+
+
+def _count_bytes(text: str) -> int:
+    return math.ceil(len(text.encode("utf-8")) / BYTES_PER_TOKEN)
+
+
+def _tiktoken(encoding: str) -> Tokenizer:
+    try:
+        import tiktoken
+    except ImportError:
+        raise ValueError(
+            "The tiktoken tokenizer needs the 'tiktoken' package "
+            "(pip install reposnap[tiktoken])."
+        ) from None
+    enc = tiktoken.get_encoding(encoding)
+    return Tokenizer(
+        f"tiktoken:{encoding}",
+        lambda text: len(enc.encode(text, disallowed_special=())),
+    )
+
+
+def _imported(spec: str) -> Tokenizer:
+    module_name, _, attr = spec.partition(":")
+    try:
+        func = getattr(importlib.import_module(module_name), attr)
+    except (ImportError, AttributeError) as e:
+        raise ValueError(f"Cannot load tokenizer '{spec}': {e}") from None
+
+    def count(text: str) -> int:
+        result: Any = func(text)
+        return result if isinstance(result, int) else len(result)
+
+    return Tokenizer(spec, count)
+
+
+def get_tokenizer(spec: str = DEFAULT_TOKENIZER) -> Tokenizer:
+    """
+    Return the tokenizer described by *spec* (see the module docstring).
+
+    Raises:
+        ValueError: The spec is malformed or the tokenizer cannot be loaded
+    """
+    if spec == "bytes":
+        return Tokenizer(spec, _count_bytes, cacheable=False)
+    name, sep, arg = spec.partition(":")
+    if name == "tiktoken":
+        return _tiktoken(arg or DEFAULT_TIKTOKEN_ENCODING)
+    if sep and name and arg:
+        return _imported(spec)
+    raise ValueError(
+        f"Unknown tokenizer '{spec}': use 'bytes', 'tiktoken[:ENCODING]' "
+        "or 'MODULE:FUNCTION'."
+    )
+
+
+class TokenStats:
+    """
+    Token and byte counts of every section written to the output.
+
+    Args:
+        tokenizer: Counts the tokens of a section
+        cache: Where counts are looked up and stored by content hash
+    """
+
+    def __init__(self, tokenizer: Tokenizer, cache: Optional["SnapshotCache"] = None):
+        self.tokenizer = tokenizer
+        self.cache = cache if tokenizer.cacheable else None
+        # row (POSIX relative path or STRUCTURE_ROW) -> (tokens, bytes)
+        self.rows: Dict[str, Tuple[int, int]] = {}
+
+    def add(
+        self, row: str, text: str, data: bytes, digest: Optional[str] = None
+    ) -> None:
+        """
+        Count one section.
+
+        Args:
+            row: Relative path of the file (or :data:`STRUCTURE_ROW`)
+            text: The section as written
+            data: The section as stored on disk (for the byte count)
+            digest: SHA-256 of *data*, if the caller already has it
+        """
+        self.rows[row] = (self._count(text, data, digest), len(data))
+
+    def _count(self, text: str, data: bytes, digest: Optional[str]) -> int:
+        if self.cache is None:
+            return self.tokenizer.count(text)
+        digest = digest or hashlib.sha256(data).hexdigest()
+        tokens = self.cache.get_tokens(self.tokenizer.name, digest)
+        if tokens is None:
+            tokens = self.tokenizer.count(text)
+            self.cache.put_tokens(self.tokenizer.name, digest, tokens)
+        return tokens
+
+    @property
+    def total(self) -> Tuple[int, int]:
+        """``(tokens, bytes)`` of everything counted."""
+        return (
+            sum(tokens for tokens, _ in self.rows.values()),
+            sum(size for _, size in self.rows.values()),
+        )
+
+    def directory_totals(self) -> Dict[str, Tuple[int, int]]:
+        """``(tokens, bytes)`` per directory (POSIX path), summed recursively."""
+        totals: Dict[str, List[int]] = {}
+        for row, (tokens, size) in self.rows.items():
+            if row == STRUCTURE_ROW:
+                continue
+            for parent in PurePosixPath(row).parents:
+                if parent.name:
+                    total = totals.setdefault(parent.as_posix(), [0, 0])
+                    total[0] += tokens
+                    total[1] += size
+        return {path: (tokens, size) for path, (tokens, size) in totals.items()}
+
+    def format_report(self) -> str:
+        """Return the per-file and per-directory table printed by ``--stats``."""
+        entries = [
+            (tuple(PurePosixPath(path).parts), f"{path}/", counts)
+            for path, counts in self.directory_totals().items()
+        ]
+        entries.extend(
+            (tuple(PurePosixPath(row).parts), row, counts)
+            for row, counts in self.rows.items()
+            if row != STRUCTURE_ROW
+        )
+        entries.sort(key=lambda entry: entry[0])
+        lines = [f"{'tokens':>10} {'bytes':>12}  path"]
+        if STRUCTURE_ROW in self.rows:
+            tokens, size = self.rows[STRUCTURE_ROW]
+            lines.append(f"{tokens:>10} {size:>12}  {STRUCTURE_ROW}")
+        for _, label, (tokens, size) in entries:
+            lines.append(f"{tokens:>10} {size:>12}  {label}")
+        tokens, size = self.total
+        lines.append(f"{tokens:>10} {size:>12}  total ({self.tokenizer.name})")
+        return "\n".join(lines) + "\n"
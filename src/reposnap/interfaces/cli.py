@@ -2,10 +2,38 @@
 
 import argparse
 import logging
+import sys
+from pathlib import Path
+from typing import Tuple
+
 from reposnap.controllers.project_controller import ProjectController
 
 
-def main():
+def _tokenizer_spec(text: str) -> str:
+    """Check a --tokenizer spec (loading the tokenizer) and return it."""
+    from reposnap.core.tokens import get_tokenizer
+
+    try:
+        get_tokenizer(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return text
+
+
+def _pattern_weight(text: str) -> Tuple[str, float]:
+    """Parse ``PATTERN=WEIGHT`` for --budget-weight."""
+    pattern, sep, weight = text.rpartition("=")
+    try:
+        if not sep or not pattern:
+            raise ValueError
+        return pattern, float(weight)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"expected PATTERN=WEIGHT, got '{text}'"
+        ) from None
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Generate a Markdown representation of a Git repository."
     )
@@ -16,7 +44,11 @@ def main():
         help="One or more paths (files or directories) to include in the Markdown output.",
     )
     parser.add_argument(
-        "-o", "--output", help="Output Markdown file", default="output.md"
+        "-o",
+        "--output",
+        help="Output Markdown file; .gz, .bz2, .xz or .zst compresses it, "
+        "'-' writes to stdout",
+        default="output.md",
     )
     parser.add_argument(
         "--structure-only",
@@ -46,6 +78,29 @@ def main():
         action="store_true",
         help="Use only files that are added/modified/untracked/stashed but not yet committed.",
     )
+    parser.add_argument(
+        "--rev",
+        metavar="REV",
+        help="Snapshot the files of this commit, tag or branch, read from git "
+        "without a checkout (the working tree is ignored).",
+    )
+    parser.add_argument(
+        "--since",
+        metavar="REV",
+        help="Use only tracked files changed between REV and the working tree.",
+    )
+    parser.add_argument(
+        "--range",
+        metavar="A..B",
+        help="Use only files changed between two revisions (A...B: since their "
+        "merge base), read from B.",
+    )
+    parser.add_argument(
+        "--hunks",
+        action="store_true",
+        help="With --since/--range, show each file's changed hunks instead of "
+        "its whole contents.",
+    )
     parser.add_argument(
         "-S",
         "--contains",
@@ -59,15 +114,160 @@ def main():
         help="Make --contains case-sensitive",
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        "--contains-max-size",
+        type=int,
+        metavar="BYTES",
+        help="Skip files larger than this in --contains searches "
+        "(default: 5 MiB, 0 = no limit).",
+    )
+    parser.add_argument(
+        "--max-file-size",
+        type=int,
+        metavar="BYTES",
+        help="Show a placeholder instead of the contents of files larger than "
+        "this (default: 5 MiB, 0 = no limit). Binary files always get one.",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse file contents and --contains results of unchanged tracked "
+        "files across runs (keyed by git blob id).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-render files changed since the previous run into the same "
+        "output (tracked in OUTPUT.manifest.json).",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=0,
+        help="Number of parallel workers for reading and searching files "
+        "(default: one per CPU).",
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        metavar="BYTES",
+        help="Keep the output under this size: files are picked by "
+        "--budget-policy, the rest are truncated or skipped.",
+    )
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        metavar="TOKENS",
+        help="Like --max-bytes, counting one token per 4 bytes.",
+    )
+    parser.add_argument(
+        "--budget-policy",
+        choices=["smallest", "recent", "listed"],
+        default="smallest",
+        help="Which files get the budget first: smallest files, most recently "
+        "modified, or in listed order (default: smallest).",
+    )
+    parser.add_argument(
+        "--budget-weight",
+        type=_pattern_weight,
+        action="append",
+        metavar="PATTERN=WEIGHT",
+        help="Give files matching PATTERN priority WEIGHT in the budget "
+        "(higher first, default 0). Can be repeated.",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print the token and byte count of every file and directory in "
+        "the output to stderr.",
+    )
+    parser.add_argument(
+        "--tokenizer",
+        type=_tokenizer_spec,
+        metavar="SPEC",
+        help="Tokenizer for --stats: 'bytes' (estimate, default), "
+        "'tiktoken[:ENCODING]' or 'MODULE:FUNCTION'.",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["table", "json"],
+        help="Print the wall time, file counts, bytes read/written and cache "
+        "hits of every stage to stderr, as a table or as JSON.",
+    )
+    parser.add_argument(
+        "--profile-out",
+        metavar="FILE",
+        help="Profile the run into FILE: collapsed stacks from a sampling "
+        "profiler for .folded/.collapsed, cProfile (pstats) otherwise. "
+        "cProfile only sees one thread, so it implies --jobs 1.",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Do not hand the request to a running 'reposnap serve' daemon.",
+    )
+    return parser
+
+
+def main():
+    argv = sys.argv[1:]
+    if argv[:1] == ["serve"]:
+        from reposnap.interfaces.daemon import serve_main
+
+        serve_main(argv[1:])
+        return
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    scopes = [
+        flag
+        for flag, value in (
+            ("-c/--changes", args.changes),
+            ("--rev", args.rev),
+            ("--since", args.since),
+            ("--range", args.range),
+        )
+        if value
+    ]
+    if len(scopes) > 1:
+        parser.error(f"{' and '.join(scopes)} cannot be combined")
+    if args.range and ".." not in args.range:
+        parser.error("--range expects A..B or A...B")
+    if args.hunks and not (args.since or args.range):
+        parser.error("--hunks needs --since or --range")
 
     log_level = logging.DEBUG if args.debug else logging.INFO
     logging.basicConfig(
         level=log_level, format="%(asctime)s - %(levelname)s - %(message)s"
     )
 
+    # The daemon cannot write to our stdout, nor profile our process.
+    if not args.no_daemon and args.output != "-" and not args.profile_out:
+        from reposnap.interfaces.daemon_client import run_via_daemon
+
+        if run_via_daemon(argv):
+            return
+
+    if args.profile_out:
+        from reposnap.core.profiling import sees_all_threads
+
+        if not sees_all_threads(Path(args.profile_out)) and args.jobs != 1:
+            # Keep reads and searches on the one thread cProfile records.
+            logging.info("Profiling with cProfile: running with --jobs 1.")
+            args.jobs = 1
+
     controller = ProjectController(args)
-    controller.run()
+    if args.profile_out:
+        from reposnap.core.profiling import profile_call
+
+        profile_call(controller.run, Path(args.profile_out))
+    else:
+        controller.run()
+    if args.stats:
+        sys.stderr.write(controller.token_stats.format_report())
+    if args.profile:
+        sys.stderr.write(controller.metrics.format(args.profile))
 
 
 if __name__ == "__main__":
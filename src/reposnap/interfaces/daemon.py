@@ -0,0 +1,343 @@
+# src/reposnap/interfaces/daemon.py
+
+"""
+``reposnap serve``: a long-running snapshot daemon and its thin client.
+
+The daemon keeps one repository warm in memory (imports, repository root,
+ignore rules and the candidate file listing) and answers snapshot
+requests over a local Unix socket.  An inotify watcher keeps the warm state
+current: index changes invalidate the tracked listing, edits drop the file's
+blob id, and in non-git trees created/deleted files are applied to the
+listing in place.  Ignored directories (``node_modules``, virtualenvs) are
+not watched.  The client half lives in
+:mod:`reposnap.interfaces.daemon_client`.
+"""
+
+import argparse
+import json
+import logging
+import os
+import socketserver
+import sys
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
+
+from reposnap.controllers.project_controller import ProjectController
+from reposnap.core.fs_watch import InotifyWatcher
+from reposnap.core.git_index import find_worktree
+from reposnap.interfaces.daemon_client import (
+    PROTOCOL_VERSION,
+    private_dir_ok,
+    socket_path_for,
+)
+
+if TYPE_CHECKING:
+    from reposnap.core.ignore import IgnoreRules
+
+logger = logging.getLogger(__name__)
+
+
+def _rules_changed(kind: str, rel_path: str) -> bool:
+    """
+    True if the event leaves a changed ``.gitignore`` behind.
+
+    ``modified`` events are not enough: editors that truncate and then
+    write fire one while the file is still empty.
+    """
+    return kind in ("written", "deleted") and (
+        rel_path.rsplit("/", 1)[-1] == ".gitignore"
+    )
+
+
+class DaemonState:
+    """Warm, watcher-maintained view of one repository."""
+
+    def __init__(self, root_dir: Path):
+        self.root_dir = root_dir.resolve()
+        self.lock = threading.Lock()
+        self.is_git = (self.root_dir / ".git").exists()
+        # (changes_only, with blob ids) -> (candidate files, blob ids); blob
+        # ids are only collected for --cache requests.
+        self._listings: Dict[Tuple[bool, bool], Tuple[List[Path], Dict[str, str]]] = {}
+        # Members of each full listing, so re-created files are not added
+        # twice.
+        self._listed: Dict[Tuple[bool, bool], Set[Path]] = {}
+        # Compiled .gitignore files are kept across requests.
+        self._ignore_rules: Optional["IgnoreRules"] = None
+        # Without a watcher nothing can be trusted between requests.
+        self.watching = False
+
+    def ignore_rules(self, load: Callable[[], "IgnoreRules"]) -> "IgnoreRules":
+        with self.lock:
+            rules = self._ignore_rules
+            # info/exclude and the global excludes file are not watched.
+            if rules is None or not self.watching or rules.stale():
+                rules = self._ignore_rules = load()
+            return rules
+
+    def listing(
+        self,
+        changes_only: bool,
+        load: Callable[[], Tuple[List[Path], Dict[str, str]]],
+        with_blob_ids: bool = False,
+    ) -> Tuple[List[Path], Dict[str, str]]:
+        key = (changes_only, with_blob_ids)
+        with self.lock:
+            cached = self._listings.get(key) if self.watching else None
+            if cached is None:
+                cached = load()
+                self._listings[key] = cached
+                if not changes_only:
+                    self._listed[key] = set(cached[0])
+            files, blob_ids = cached
+            return list(files), dict(blob_ids)
+
+    def on_change(self, kind: str, rel_path: str, is_dir: bool) -> None:
+        """Apply one watcher event to the warm state."""
+        with self.lock:
+            if kind == "overflow":
+                self._listings.clear()
+                self._ignore_rules = None
+                return
+            if rel_path == ".git" or rel_path.startswith(".git/"):
+                # Index, HEAD or ref updates change what git reports.
+                self._listings.clear()
+                return
+            if _rules_changed(kind, rel_path):
+                self._ignore_rules = None
+            for key in list(self._listings):
+                if key[0]:
+                    # Any worktree change can alter the uncommitted set.
+                    del self._listings[key]
+                else:
+                    self._apply(key, kind, rel_path, is_dir)
+
+    def _apply(
+        self, key: Tuple[bool, bool], kind: str, rel_path: str, is_dir: bool
+    ) -> None:
+        """Apply one worktree event to the full listing under *key*."""
+        files, blob_ids = self._listings[key]
+        listed = self._listed[key]
+        if self.is_git:
+            # The tracked listing only changes with the index; an edited
+            # file is no longer clean, so its blob id is stale.
+            blob_ids.pop(rel_path, None)
+            if is_dir:
+                prefix = f"{rel_path}/"
+                for path in [p for p in blob_ids if p.startswith(prefix)]:
+                    del blob_ids[path]
+        elif kind == "created" and not is_dir:
+            # Atomic saves (write, then rename over) create existing files.
+            created = Path(rel_path)
+            if created not in listed:
+                listed.add(created)
+                files.append(created)
+        elif kind == "created":
+            del self._listings[key]  # rescan the new subtree lazily
+        elif kind == "deleted":
+            gone = Path(rel_path)
+            files[:] = [f for f in files if f != gone and gone not in f.parents]
+            self._listed[key] = set(files)
+
+
+class _WarmController(ProjectController):
+    """ProjectController that takes root, ignores and listing from the daemon."""
+
+    def __init__(self, args: object, state: DaemonState):
+        self._state = state
+        super().__init__(args)
+
+    def _get_repo_root(self) -> Path:
+        return self._state.root_dir
+
+    def _load_ignore_rules(self) -> "IgnoreRules":
+        return self._state.ignore_rules(super()._load_ignore_rules)
+
+    def _list_candidate_files(self) -> List[Path]:
+        if self.rev or self.since:
+            # The daemon keeps the listing of the working tree only.
+            return super()._list_candidate_files()
+
+        def load() -> Tuple[List[Path], Dict[str, str]]:
+            files = super(_WarmController, self)._list_candidate_files()
+            return files, self.blob_ids
+
+        files, self.blob_ids = self._state.listing(
+            self.changes_only, load, with_blob_ids=self.use_cache
+        )
+        if self.use_cache and self.cache is None:
+            self._open_cache()
+        return files
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+            response = self.server.snapshot_daemon.handle(request)
+        except Exception as e:  # never let one request kill the daemon
+            response = {"ok": False, "error": str(e)}
+        self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+
+class SnapshotDaemon:
+    """
+    Serve snapshot requests for one repository over a Unix socket.
+
+    Args:
+        root_dir: Repository root the daemon is bound to
+        socket_path: Where to listen (default: :func:`socket_path_for`)
+    """
+
+    def __init__(self, root_dir: Path, socket_path: Optional[Path] = None):
+        self.state = DaemonState(root_dir)
+        self.socket_path = socket_path or socket_path_for(self.state.root_dir)
+        self.watcher: Optional[InotifyWatcher] = None
+        self._server: Optional[socketserver.UnixStreamServer] = None
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one snapshot request and return the reply."""
+        from reposnap.interfaces.cli import build_parser
+
+        if request.get("version") != PROTOCOL_VERSION:
+            return {"ok": False, "error": "unsupported protocol version"}
+        try:
+            args = build_parser().parse_args(request["argv"])
+        except SystemExit:
+            return {"ok": False, "error": f"invalid arguments: {request['argv']}"}
+        # Outputs are relative to the client's working directory.
+        args.output = str(Path(request["cwd"], args.output))
+        controller = _WarmController(args, self.state)
+        controller.run()
+        reply: Dict[str, Any] = {"ok": True, "output": str(controller.output_file)}
+        if controller.token_stats is not None:
+            reply["stats"] = controller.token_stats.format_report()
+        if args.profile:
+            reply["profile"] = controller.metrics.format(args.profile)
+        return reply
+
+    def _ignored_dir(self, rel_dir: str) -> bool:
+        """Ignored directories (``node_modules``, ``.venv``...) are not watched."""
+        from reposnap.core.ignore import IgnoreRules
+
+        rules = self.state.ignore_rules(
+            lambda: IgnoreRules.for_worktree(self.state.root_dir)
+        )
+        return rules.is_ignored(rel_dir, is_dir=True)
+
+    def _on_change(self, kind: str, rel_path: str, is_dir: bool) -> None:
+        self.state.on_change(kind, rel_path, is_dir)
+        if self.watcher is None:
+            return
+        if kind == "overflow":
+            # Missed events may include .gitignore changes.
+            self.watcher.rescan()
+        elif _rules_changed(kind, rel_path):
+            # The change may (un-)ignore watched or unwatched directories.
+            self.watcher.rescan(rel_path.rpartition("/")[0])
+
+    def start(self) -> None:
+        """
+        Start watching and bind the socket (does not block).
+
+        Raises:
+            PermissionError: The socket directory is not private to the
+                current user (see :func:`private_dir_ok`)
+        """
+        socket_dir = self.socket_path.parent
+        socket_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if not private_dir_ok(socket_dir):
+            raise PermissionError(
+                f"{socket_dir} must be a directory owned by this user with mode 0700"
+            )
+
+        if InotifyWatcher.available():
+            # Set first so the initial walk compiles the ignore rules once.
+            self.state.watching = True
+            try:
+                self.watcher = InotifyWatcher(
+                    self.state.root_dir, self._on_change, prune=self._ignored_dir
+                )
+                self.watcher.start()
+            except OSError as e:
+                self.state.watching = False
+                logger.warning(
+                    f"Filesystem watch unavailable ({e}); state is "
+                    "reloaded for every request."
+                )
+        else:
+            logger.warning("inotify unavailable; state is reloaded for every request.")
+
+        if self.socket_path.exists():
+            self.socket_path.unlink()  # stale socket of a dead daemon
+        # No window in which the socket is reachable by others.
+        old_umask = os.umask(0o077)
+        try:
+            self._server = socketserver.UnixStreamServer(
+                str(self.socket_path), _RequestHandler
+            )
+        finally:
+            os.umask(old_umask)
+        self._server.snapshot_daemon = self
+        logger.info(f"Serving {self.state.root_dir} on {self.socket_path}.")
+
+    def serve_forever(self) -> None:
+        """Start (if needed) and serve until shutdown() or Ctrl-C."""
+        if self._server is None:
+            self.start()
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+
+    def close(self) -> None:
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def serve_main(argv: List[str]) -> None:
+    """Entry point of ``reposnap serve``."""
+    parser = argparse.ArgumentParser(
+        prog="reposnap serve",
+        description="Keep a repository warm and serve snapshot requests.",
+    )
+    parser.add_argument(
+        "root",
+        nargs="?",
+        default=".",
+        help="Directory inside the repository to serve (default: current).",
+    )
+    parser.add_argument("--socket", help="Unix socket path to listen on.")
+    parser.add_argument(
+        "--debug", action="store_true", help="Enable debug-level logging."
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+    start = Path(args.root).resolve()
+    located = find_worktree(start)
+    root = located[0] if located else start
+    daemon = SnapshotDaemon(root, Path(args.socket) if args.socket else None)
+    try:
+        daemon.start()
+    except PermissionError as e:
+        logger.error(f"Refusing to serve: {e}")
+        sys.exit(1)
+    daemon.serve_forever()
@@ -0,0 +1,130 @@
+# src/reposnap/interfaces/daemon_client.py
+
+"""
+Client half of ``reposnap serve``.
+
+Kept apart from :mod:`reposnap.interfaces.daemon` so that every ``reposnap``
+invocation can look for a daemon without importing the server, the watcher
+or the controller machinery.
+
+Protocol: one JSON line per connection in each direction.  The request is
+``{"version": 1, "argv": [...], "cwd": "..."}``; the reply is
+``{"ok": true, "output": "..."}`` (plus ``"stats"`` with the ``--stats``
+report and ``"profile"`` with the ``--profile`` report) or
+``{"ok": false, "error": "..."}``.
+
+The socket lives in a directory private to the user (mode 0700).  Both
+halves check that before trusting it, so another local user cannot plant a
+socket of their own and receive (or answer) snapshot requests.
+"""
+
+import json
+import logging
+import os
+import socket
+import stat
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from reposnap.core.git_index import find_worktree
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 1
+CONNECT_TIMEOUT = 1.0  # seconds
+
+
+def socket_path_for(root_dir: Path) -> Path:
+    """Return the socket path of the daemon serving *root_dir*."""
+    import hashlib
+
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    if base:
+        directory = Path(base) / "reposnap"
+    else:
+        uid = os.getuid() if hasattr(os, "getuid") else "user"
+        directory = Path(tempfile.gettempdir()) / f"reposnap-{uid}"
+    digest = hashlib.sha1(str(root_dir.resolve()).encode("utf-8")).hexdigest()
+    return directory / f"{digest[:16]}.sock"
+
+
+def private_dir_ok(directory: Path) -> bool:
+    """
+    Return True if *directory* is a real directory (not a symlink) owned by
+    the current user and closed to everybody else (mode 0700).
+    """
+    if not hasattr(os, "getuid"):
+        return False
+    try:
+        st = os.lstat(directory)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(st.st_mode)
+        and st.st_uid == os.getuid()
+        and stat.S_IMODE(st.st_mode) == 0o700
+    )
+
+
+def request_snapshot(
+    socket_path: Path, argv: List[str], cwd: Path
+) -> Optional[Dict[str, Any]]:
+    """Send one request; return the reply, or None if no daemon answered."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(str(socket_path))
+        sock.settimeout(None)  # snapshots may take as long as they take
+        request = {"version": PROTOCOL_VERSION, "argv": argv, "cwd": str(cwd)}
+        sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        with sock.makefile("rb") as reply:
+            line = reply.readline()
+        return json.loads(line) if line else None
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+
+
+def run_via_daemon(argv: List[str]) -> bool:
+    """
+    Hand *argv* to the daemon serving the current repository, if any.
+
+    Returns True if the daemon produced the snapshot; False means the caller
+    should run locally.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return False
+    cwd = Path.cwd()
+    located = find_worktree(cwd)
+    if located is None:
+        return False
+    socket_path = socket_path_for(located[0])
+    try:
+        st = os.lstat(socket_path)
+    except OSError:
+        return False  # no daemon
+    if not (
+        private_dir_ok(socket_path.parent)
+        and stat.S_ISSOCK(st.st_mode)
+        and st.st_uid == os.getuid()
+    ):
+        logger.warning(
+            f"Not using {socket_path}: it or its directory is not private "
+            "to this user; running locally."
+        )
+        return False
+    response = request_snapshot(socket_path, argv, cwd)
+    if response is None:
+        return False
+    if not response.get("ok"):
+        logger.warning(f"Daemon failed ({response.get('error')}); running locally.")
+        return False
+    logger.info(f"Markdown generated at {response['output']} (via daemon).")
+    if response.get("stats"):
+        sys.stderr.write(response["stats"])
+    if response.get("profile"):
+        sys.stderr.write(response["profile"])
+    return True
@@ -0,0 +1,264 @@
+# src/reposnap/models/compact_tree.py
+
+"""
+Array-backed file tree for large repositories.
+
+Nodes are integers.  Every node has an entry in an interned name table
+(``__init__.py`` is stored once however often it occurs) and in flat
+parent / first-child / next-sibling arrays, so children keep insertion order
+and there is no per-node object at all.  Directories also remember their
+full POSIX path, which makes reconstructing any path a single concatenation
+instead of a walk up the tree, and a cached pre-order array turns whole-tree
+traversals into linear scans.  Removing nodes only clears a flag in a copy
+of the ``alive`` array; the structure itself is immutable once built and is
+shared between filtered copies.
+"""
+
+from array import array
+from collections.abc import ItemsView, Mapping
+from pathlib import PurePath, PurePosixPath
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+ROOT = 0
+_NONE = -1
+
+
+class CompactTree:
+    """Immutable tree of file paths with per-node flat arrays."""
+
+    __slots__ = (
+        "names",
+        "dir_prefix",
+        "order",
+        "parent",
+        "first_child",
+        "last_child",
+        "next_sibling",
+        "is_dir",
+        "alive",
+    )
+
+    def __init__(self) -> None:
+        self.names: List[str] = [""]
+        # directory node -> "its/path/" ("" for the root)
+        self.dir_prefix: Dict[int, str] = {ROOT: ""}
+        self.order: Optional[array] = None
+        self.parent = array("i", [_NONE])
+        self.first_child = array("i", [_NONE])
+        self.last_child = array("i", [_NONE])
+        self.next_sibling = array("i", [_NONE])
+        self.is_dir = bytearray(b"\x01")
+        self.alive = bytearray(b"\x01")
+
+    @classmethod
+    def from_paths(cls, paths: Iterable[Union[str, PurePath]]) -> "CompactTree":
+        """
+        Build a tree from file paths relative to the root.
+
+        Duplicate paths are ignored, and so is a path that is also the
+        directory of an earlier one (or whose directory is an earlier file).
+        """
+        tree = cls()
+        interned: Dict[str, str] = {}
+        dirs: Dict[str, int] = {"": ROOT}
+        files: Set[str] = set()
+        for path in paths:
+            if isinstance(path, PurePosixPath):
+                text = str(path)
+            elif isinstance(path, PurePath):
+                text = path.as_posix()
+            else:
+                text = path
+            if text in files or text in dirs:
+                continue
+            head, _, name = text.rpartition("/")
+            parent = dirs.get(head)
+            if parent is None:
+                parent = tree._add_dirs(head, dirs, files, interned)
+                if parent is None:
+                    continue
+            tree._append(parent, interned.setdefault(name, name), False)
+            files.add(text)
+        return tree
+
+    def _add_dirs(
+        self,
+        path: str,
+        dirs: Dict[str, int],
+        files: Set[str],
+        interned: Dict[str, str],
+    ) -> Optional[int]:
+        head, _, name = path.rpartition("/")
+        parent = dirs.get(head)
+        if parent is None:
+            parent = self._add_dirs(head, dirs, files, interned)
+        if parent is None or path in files:
+            return None
+        node = dirs[path] = self._append(parent, interned.setdefault(name, name), True)
+        self.dir_prefix[node] = f"{path}/"
+        return node
+
+    def _append(self, parent: int, name: str, is_dir: bool) -> int:
+        node = len(self.names)
+        self.names.append(name)
+        self.parent.append(parent)
+        self.first_child.append(_NONE)
+        self.last_child.append(_NONE)
+        self.next_sibling.append(_NONE)
+        self.is_dir.append(is_dir)
+        self.alive.append(1)
+        if self.first_child[parent] == _NONE:
+            self.first_child[parent] = node
+        else:
+            self.next_sibling[self.last_child[parent]] = node
+        self.last_child[parent] = node
+        return node
+
+    # --------------------------------------------------------------
+    # traversal
+    # --------------------------------------------------------------
+    def name(self, node: int) -> str:
+        return self.names[node]
+
+    def path(self, node: int) -> str:
+        """Return the POSIX path of *node* relative to the root."""
+        if self.is_dir[node]:
+            return self.dir_prefix[node][:-1]
+        return self.dir_prefix[self.parent[node]] + self.names[node]
+
+    def children(self, node: int = ROOT) -> Iterator[int]:
+        """Yield the live children of *node* in insertion order."""
+        alive, next_sibling = self.alive, self.next_sibling
+        child = self.first_child[node]
+        while child != _NONE:
+            if alive[child]:
+                yield child
+            child = next_sibling[child]
+
+    def _preorder(self) -> array:
+        """All nodes but the root, depth-first in insertion order (cached)."""
+        if self.order is None:
+            order = array("i")
+            first_child, next_sibling = self.first_child, self.next_sibling
+            stack = [first_child[ROOT]]
+            while stack:
+                node = stack.pop()
+                if node == _NONE:
+                    continue
+                order.append(node)
+                stack.append(next_sibling[node])
+                stack.append(first_child[node])
+            self.order = order
+        return self.order
+
+    def file_nodes(self) -> List[int]:
+        """Return live file nodes depth-first, in insertion order."""
+        alive, is_dir = self.alive, self.is_dir
+        return [n for n in self._preorder() if alive[n] and not is_dir[n]]
+
+    def file_paths(self) -> List[str]:
+        prefix, parent, names = self.dir_prefix, self.parent, self.names
+        return [prefix[parent[n]] + names[n] for n in self.file_nodes()]
+
+    # --------------------------------------------------------------
+    # filtering
+    # --------------------------------------------------------------
+    def filtered(self, keep: Callable[[str, str], bool]) -> "CompactTree":
+        """
+        Return a copy without the files for which ``keep(path, name)`` is
+        False, and without directories left empty.
+        """
+        self._preorder()  # computed once, shared with the copy
+        copy = CompactTree.__new__(CompactTree)
+        for slot in CompactTree.__slots__:
+            setattr(copy, slot, getattr(self, slot))
+        copy.alive = alive = bytearray(self.alive)
+        prefix, parent, names = self.dir_prefix, self.parent, self.names
+        for node in self.file_nodes():
+            name = names[node]
+            if not keep(prefix[parent[node]] + name, name):
+                alive[node] = 0
+        copy._drop_empty_dirs()
+        return copy
+
+    def _drop_empty_dirs(self) -> None:
+        # Children always have larger ids than their parent, so one reverse
+        # sweep settles every directory before its parent is looked at.
+        alive, is_dir, parent = self.alive, self.is_dir, self.parent
+        live_children = array("i", bytes(4 * len(alive)))
+        for node in range(len(alive) - 1, ROOT, -1):
+            if not alive[node]:
+                continue
+            if is_dir[node] and not live_children[node]:
+                alive[node] = 0
+            else:
+                live_children[parent[node]] += 1
+
+    def view(self, node: int = ROOT) -> "TreeView":
+        return TreeView(self, node)
+
+
+class _TreeItems(ItemsView):
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        return self._mapping._iter_items()
+
+
+class TreeView(Mapping):
+    """
+    Read-only ``Mapping`` over one directory of a :class:`CompactTree`.
+
+    Behaves like the nested-dict structure: directories map to another view,
+    files map to None.
+    """
+
+    __slots__ = ("_tree", "_node")
+
+    def __init__(self, tree: CompactTree, node: int = ROOT):
+        self._tree = tree
+        self._node = node
+
+    def _value(self, node: int) -> Optional["TreeView"]:
+        return TreeView(self._tree, node) if self._tree.is_dir[node] else None
+
+    def _iter_items(self) -> Iterator[Tuple[str, Optional["TreeView"]]]:
+        tree = self._tree
+        for child in tree.children(self._node):
+            yield tree.name(child), self._value(child)
+
+    def __getitem__(self, name: str) -> Optional["TreeView"]:
+        tree = self._tree
+        for child in tree.children(self._node):
+            if tree.name(child) == name:
+                return self._value(child)
+        raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        tree = self._tree
+        return (tree.name(child) for child in tree.children(self._node))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._tree.children(self._node))
+
+    def items(self) -> ItemsView:
+        return _TreeItems(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialise the nested-dict structure (files map to None)."""
+        return {
+            name: value.to_dict() if value is not None else None
+            for name, value in self._iter_items()
+        }
+
+    def __repr__(self) -> str:
+        return f"TreeView({self._tree.path(self._node)!r}, {len(self)} entries)"
@@ -2,14 +2,61 @@
 
 import logging
 from pathlib import Path
-from typing import Dict, List, Any
-import pathspec
+from typing import TYPE_CHECKING, Dict, Iterable, List, Any, Mapping, Optional, Union
+
+from reposnap.models.compact_tree import CompactTree
+
+if TYPE_CHECKING:
+    import pathspec
+
+    from reposnap.core.path_matcher import PathMatcher
+
+    Matcher = Union[pathspec.PathSpec, PathMatcher]
 
 
 class FileTree:
-    def __init__(self, structure: Dict[str, Any]):
-        self.structure: Dict[str, Any] = structure
+    """
+    The collected file tree.
+
+    Backed either by the nested-dict ``structure`` (directories are dicts,
+    files are leaves) or, when built with :meth:`from_paths`, by a
+    :class:`CompactTree`.  Reading ``structure`` on a compact tree
+    materialises the dict once and switches to the dict backend, so existing
+    callers keep working; :meth:`view` gives a dict-like view without that
+    cost.
+    """
+
+    def __init__(self, structure: Union[Dict[str, Any], CompactTree]):
         self.logger = logging.getLogger(__name__)
+        self._compact: Optional[CompactTree] = None
+        self._structure: Optional[Dict[str, Any]] = None
+        if isinstance(structure, CompactTree):
+            self._compact = structure
+        else:
+            self._structure = structure
+
+    @classmethod
+    def from_paths(cls, files: Iterable[Path]) -> "FileTree":
+        """Build a compact tree from file paths relative to root_dir."""
+        return cls(CompactTree.from_paths(files))
+
+    @property
+    def structure(self) -> Dict[str, Any]:
+        if self._structure is None:
+            self._structure = self._compact.view().to_dict()
+            self._compact = None
+        return self._structure
+
+    @structure.setter
+    def structure(self, structure: Dict[str, Any]) -> None:
+        self._structure = structure
+        self._compact = None
+
+    def view(self) -> Mapping[str, Any]:
+        """Return the tree as a read-only mapping (nested like ``structure``)."""
+        if self._compact is not None:
+            return self._compact.view()
+        return self._structure
 
     def get_all_files(self) -> List[Path]:
         """
@@ -17,6 +64,8 @@ class FileTree:
         Returns:
             List[Path]: List of file paths relative to root_dir.
         """
+        if self._compact is not None:
+            return [Path(p) for p in self._compact.file_paths()]
         return self._extract_files(self.structure)
 
     def _extract_files(
@@ -31,18 +80,27 @@ class FileTree:
                 files.append(Path(current_path))
         return files
 
-    def filter_files(self, spec: pathspec.PathSpec) -> None:
+    def filter_files(self, spec: "Matcher") -> None:
         """
         Filters files in the tree structure based on the provided pathspec.
 
         Args:
-            spec (pathspec.PathSpec): The pathspec for filtering files.
+            spec (pathspec.PathSpec | PathMatcher): The patterns for filtering
+                files; anything with a ``match_file(path)`` method works.
         """
         self.logger.debug("Filtering files in the file tree.")
+        if self._compact is not None:
+            # Exclude a file if either its full path or its basename matches.
+            self._compact = self._compact.filtered(
+                lambda path, name: (
+                    not spec.match_file(path) and not spec.match_file(name)
+                )
+            )
+            return
         self.structure = self._filter_tree(self.structure, spec)
 
     def _filter_tree(
-        self, subtree: Dict[str, Any], spec: pathspec.PathSpec, path_prefix: str = ""
+        self, subtree: Dict[str, Any], spec: "Matcher", path_prefix: str = ""
     ) -> Dict[str, Any]:
         filtered_subtree: Dict[str, Any] = {}
         for key, value in subtree.items():
@@ -61,7 +119,7 @@ class FileTree:
                     filtered_subtree[key] = value
         return filtered_subtree
 
-    def prune_tree(self, selected_files: set) -> Dict[str, Any]:
+    def prune_tree(self, selected_files: set) -> Mapping[str, Any]:
         """
         Prunes the tree to include only the selected files and their directories.
 
@@ -69,8 +127,12 @@ class FileTree:
             selected_files (set): Set of selected file paths.
 
         Returns:
-            Dict[str, Any]: Pruned tree structure.
+            Mapping[str, Any]: Pruned tree structure.
         """
+        if self._compact is not None:
+            return self._compact.filtered(
+                lambda path, name: path in selected_files
+            ).view()
         return self._prune_tree(self.structure, selected_files)
 
     def _prune_tree(
@@ -1,15 +1,31 @@
 # src/reposnap/utils/path_utils.py
-from typing import Dict, Generator, Any
+from typing import Generator, Any, Mapping, Optional
 
 
 def format_tree(
-    tree: Dict[str, Any], indent: str = "", hide_untoggled: bool = False
+    tree: Mapping[str, Any],
+    indent: str = "",
+    hide_untoggled: bool = False,
+    markers: Optional[Mapping[str, str]] = None,
+    prefix: str = "",
 ) -> Generator[str, None, None]:
+    """
+    Yield the lines of the project structure.
+
+    Args:
+        markers: Optional suffixes appended to file lines, keyed by the
+            file's POSIX path relative to the root of *tree*
+        prefix: POSIX path of *tree* (with trailing slash) for the lookup
+    """
     for key, value in tree.items():
         if value == "<hidden>":
             yield f"{indent}<...>\n"
-        elif isinstance(value, dict):
+        elif isinstance(value, Mapping):
             yield f"{indent}{key}/\n"
-            yield from format_tree(value, indent + "    ", hide_untoggled)
+            yield from format_tree(
+                value, indent + "    ", hide_untoggled, markers, f"{prefix}{key}/"
+            )
+        elif markers:
+            yield f"{indent}{key}{markers.get(prefix + key, '')}\n"
         else:
             yield f"{indent}{key}\n"
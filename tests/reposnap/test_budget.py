@@ -0,0 +1,129 @@
+# tests/reposnap/test_budget.py
+
+from pathlib import Path
+
+import pytest
+
+from reposnap.controllers.project_controller import ProjectController
+from reposnap.core.budget import SKIPPED, TRUNCATED, OutputBudget
+from reposnap.core.markdown_generator import MarkdownGenerator
+from reposnap.interfaces.cli import build_parser
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / "small.py").write_text("x = 1\n")
+    (root / "medium.txt").write_text("m" * 1000 + "\n")
+    (root / "large.txt").write_text("l" * 20000 + "\n")
+    return root
+
+
+FILES = [Path("large.txt"), Path("medium.txt"), Path("small.py")]
+
+
+def test_from_limits():
+    assert OutputBudget.from_limits() is None
+    assert OutputBudget.from_limits(max_tokens=100).max_bytes == 400
+    assert OutputBudget.from_limits(300, 100).max_bytes == 300
+    with pytest.raises(ValueError):
+        OutputBudget(100, policy="largest")
+
+
+def test_plan_smallest_first_truncates_then_skips(root):
+    plan = OutputBudget(1300).plan(root, FILES, header_bytes=100)
+
+    assert plan.files == [Path("medium.txt"), Path("small.py")]
+    assert plan.markers == {"large.txt": SKIPPED}
+    assert plan.limits == {}
+
+    plan = OutputBudget(2000).plan(root, FILES, header_bytes=100)
+
+    assert plan.files == FILES
+    assert plan.markers == {"large.txt": TRUNCATED}
+    assert 256 <= plan.limits[Path("large.txt")] < 1000
+    assert plan.estimated_bytes <= 2000
+
+
+def test_plan_weights_and_listed_policy(root):
+    plan = OutputBudget(1200, "listed").plan(root, FILES, header_bytes=0)
+    assert plan.markers == {
+        "large.txt": TRUNCATED,
+        "medium.txt": SKIPPED,
+        "small.py": SKIPPED,
+    }
+
+    weighted = OutputBudget(2000, "smallest", [("*.py", 9), ("large*", 5)])
+    plan = weighted.plan(root, FILES, header_bytes=0)
+    assert plan.files == [Path("large.txt"), Path("small.py")]
+    assert plan.markers == {"large.txt": TRUNCATED, "medium.txt": SKIPPED}
+
+
+def test_plan_takes_later_files_that_fit_after_a_skip(root):
+    files = [Path("medium.txt"), Path("large.txt"), Path("small.py")]
+    # large.txt would show less than MIN_TRUNCATED_BYTES: skipped, not cut.
+    plan = OutputBudget(1200, "listed").plan(root, files, header_bytes=0)
+
+    assert plan.files == [Path("medium.txt"), Path("small.py")]
+    assert plan.markers == {"large.txt": SKIPPED}
+    assert plan.estimated_bytes <= 1200
+
+
+def test_budgeted_output_fits_and_skips_without_reading(root, tmp_path, monkeypatch):
+    read = []
+    original = MarkdownGenerator._read_file
+
+    def tracking_read(file_path, limit=None, *args):
+        read.append((file_path.name, limit))
+        return original(file_path, limit, *args)
+
+    monkeypatch.setattr(MarkdownGenerator, "_read_file", staticmethod(tracking_read))
+    tree = {"large.txt": None, "medium.txt": None, "small.py": None}
+    generator = MarkdownGenerator(
+        root_dir=root,
+        output_file=tmp_path / "out.md",
+        budget=OutputBudget(1600, "listed"),
+    )
+    generator.generate_markdown(tree, FILES)
+    output = generator.output_file.read_text()
+
+    assert len(output.encode("utf-8")) <= 1600
+    assert [name for name, _ in read] == ["large.txt"]
+    assert read[0][1] is not None
+    assert "large.txt  [truncated]\n" in output
+    assert "medium.txt  [skipped]\n" in output
+    assert "small.py  [skipped]\n" in output
+    assert "## medium.txt" not in output
+    assert f"of {20001} bytes shown]\n```\n" in output
+
+
+def test_truncated_read_drops_cut_character(tmp_path):
+    path = tmp_path / "u.txt"
+    path.write_text("abé", encoding="utf-8")
+
+    content, error = MarkdownGenerator._read_file(path, 3)
+
+    assert error is None
+    assert content == "ab"
+
+
+@pytest.mark.parametrize("extra", [[], ["--max-file-size", "10"]])
+def test_output_fits_with_binary_and_oversized_files(tmp_path, monkeypatch, extra):
+    root = tmp_path / "repo"
+    root.mkdir()
+    for i in range(30):
+        (root / f"b{i:02}.bin").write_bytes(b"\0")
+    for i in range(5):
+        (root / f"t{i}.txt").write_text("text " * 10 + "\n")
+    monkeypatch.chdir(root)
+    output = tmp_path / "out.md"
+    args = build_parser().parse_args(
+        ["--max-bytes", "1500", *extra, "-o", str(output), "."]
+    )
+    ProjectController(args).run()
+
+    text = output.read_text()
+    assert len(text.encode("utf-8")) <= 1500
+    assert "contents omitted]" in text
+    assert "[skipped]" in text
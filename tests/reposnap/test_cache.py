@@ -0,0 +1,120 @@
+# tests/reposnap/test_cache.py
+
+from pathlib import Path
+
+from reposnap.core import cache as cache_module
+from reposnap.core.cache import SnapshotCache, default_cache_path, matcher_key
+from reposnap.core.markdown_generator import MarkdownGenerator
+
+
+def test_sections_persist_across_instances(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = SnapshotCache(path)
+    assert cache.get_section("abc") is None
+    cache.put_section("abc", "print('hi')\n")
+    cache.close()
+
+    cache = SnapshotCache(path)
+    assert cache.get_section("abc") == "print('hi')\n"
+    assert cache.hits == 1
+    cache.close()
+
+
+def test_matches_are_keyed_by_matcher(tmp_path):
+    cache = SnapshotCache(tmp_path / "cache.sqlite3")
+    key = matcher_key(["TODO"], True, None)
+    other = matcher_key(["TODO"], False, None)
+    cache.put_matches(key, [("a", True), ("b", False)])
+
+    assert cache.get_matches(key, ["a", "b", "c"]) == {"a": True, "b": False}
+    assert cache.get_matches(other, ["a", "b"]) == {}
+    cache.close()
+
+
+def test_default_cache_path(tmp_path, monkeypatch):
+    (tmp_path / "repo" / ".git").mkdir(parents=True)
+    assert default_cache_path(tmp_path / "repo") == (
+        tmp_path / "repo" / ".git" / "reposnap" / "cache.sqlite3"
+    )
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    plain = default_cache_path(tmp_path / "plain")
+    assert tmp_path / "xdg" / "reposnap" in plain.parents
+
+
+def test_generator_serves_cached_sections(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "a.py").write_text("print('a')\n")
+    (root / "b.py").write_text("print('b')\n")
+    cache = SnapshotCache(tmp_path / "cache.sqlite3")
+    cache.put_section("blob-a", "print('from cache')\n")
+
+    generator = MarkdownGenerator(
+        root_dir=root,
+        output_file=tmp_path / "output.md",
+        cache=cache,
+        blob_ids={"a.py": "blob-a", "b.py": "blob-b"},
+    )
+    generator.generate_markdown({}, [Path("a.py"), Path("b.py")])
+    output = generator.output_file.read_text()
+
+    assert "print('from cache')" in output
+    assert "print('a')" not in output
+    assert "print('b')" in output
+    assert cache.get_section("blob-b") == "print('b')\n"
+    cache.close()
+
+
+def test_writes_are_committed_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, "COMMIT_EVERY", 2)
+    path = tmp_path / "cache.sqlite3"
+    writer = SnapshotCache(path)
+    reader = SnapshotCache(path)
+
+    writer.put_section("a", "1")
+    assert reader.get_section("a") is None
+    writer.put_section("b", "2")
+    assert reader.get_section("a") == "1"
+    writer.close()
+    reader.close()
+
+
+def test_locked_cache_drops_writes_instead_of_failing(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_module, "BUSY_TIMEOUT", 0.05)
+    path = tmp_path / "cache.sqlite3"
+    first = SnapshotCache(path)
+    first.put_section("a", "1")  # holds the write lock until committed
+    second = SnapshotCache(path)
+
+    second.put_section("b", "2")
+    second.put_matches("m", [("b", True)])
+    second.put_tokens("t", "d", 3)
+    assert second.get_section("a") is None
+    second.close()
+    first.close()
+
+    cache = SnapshotCache(path)
+    assert cache.get_section("a") == "1"
+    assert cache.get_section("b") is None
+    cache.close()
+
+
+def test_cached_section_limit_counts_bytes(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "a.txt").write_text("é" * 6)
+    cache = SnapshotCache(tmp_path / "cache.sqlite3")
+    cache.put_section("blob-a", "é" * 6)  # 6 characters, 12 bytes
+
+    generator = MarkdownGenerator(
+        root_dir=root,
+        output_file=tmp_path / "output.md",
+        cache=cache,
+        blob_ids={"a.txt": "blob-a"},
+        max_file_size=10,
+    )
+    generator.generate_markdown({}, [Path("a.txt")])
+    cache.close()
+
+    assert "oversized file, 12 bytes (limit 10)" in generator.output_file.read_text()
@@ -221,3 +221,46 @@ def test_cli_contains_with_binary_files(mock_controller, temp_dir):
     args = mock_controller.call_args[0][0]
     assert args.contains == ["import"]
     mock_controller_instance.run.assert_called_once()
+
+
+@patch("reposnap.interfaces.cli.ProjectController")
+def test_cli_jobs_option(mock_controller, temp_dir):
+    """Test that --jobs is parsed and defaults to one worker per CPU (0)."""
+    with patch("sys.argv", ["cli.py", str(temp_dir)]):
+        main()
+    assert mock_controller.call_args[0][0].jobs == 0
+
+    with patch("sys.argv", ["cli.py", str(temp_dir), "-j", "8"]):
+        main()
+    assert mock_controller.call_args[0][0].jobs == 8
+
+
+def test_cli_startup_avoids_heavy_imports(tmp_path):
+    """--help and --structure-only on a plain tree must not load GitPython,
+    pathspec or urwid."""
+    import subprocess
+    import sys
+
+    (tmp_path / "a.py").write_text("x = 1\n")
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    subprocess.run(["git", "add", "."], cwd=tmp_path, check=True)
+    script = (
+        "import sys\n"
+        "from reposnap.interfaces.cli import main\n"
+        "for argv in (['--help'], ['.', '--structure-only', '--no-daemon']):\n"
+        "    sys.argv = ['reposnap'] + argv\n"
+        "    try:\n"
+        "        main()\n"
+        "    except SystemExit:\n"
+        "        pass\n"
+        "print(sorted(m for m in ('git', 'pathspec', 'urwid') if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.splitlines()[-1] == "[]"
+    assert (tmp_path / "output.md").exists()
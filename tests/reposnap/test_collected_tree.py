@@ -147,3 +147,38 @@ def test_collect_tree_multiple_paths():
         collected = traverse_tree(controller.file_tree.structure)
         expected = ["README.md", os.path.join("tests", "test_a.py")]
         assert sorted(collected) == sorted(expected)
+
+
+def test_collect_tree_scan_skips_ignored_directories():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        structure = {
+            ".gitignore": "node_modules\nbuild/\n",
+            "node_modules": {"lib": {"index.js": "x"}},
+            "src": {"build": {"out.o": "x"}, "a.py": 'print("a")'},
+        }
+        create_directory_structure(temp_dir, structure)
+        args = type(
+            "Args",
+            (object,),
+            {
+                "output": os.path.join(temp_dir, "output.md"),
+                "structure_only": True,
+                "include": [],
+                "exclude": [],
+            },
+        )
+        with patch(
+            "reposnap.controllers.project_controller.ProjectController._get_repo_root",
+            return_value=Path(temp_dir),
+        ), patch(
+            "reposnap.core.git_repo.GitRepo.get_git_files", return_value=[]
+        ), patch("os.scandir", wraps=os.scandir) as scandir:
+            controller = ProjectController(args)
+            controller.collect_file_tree()
+        collected = traverse_tree(controller.file_tree.structure)
+        assert sorted(collected) == [".gitignore", os.path.join("src", "a.py")]
+        scanned = {
+            Path(call.args[0]).relative_to(temp_dir).as_posix()
+            for call in scandir.call_args_list
+        }
+        assert scanned == {".", "src"}
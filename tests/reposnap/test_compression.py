@@ -0,0 +1,84 @@
+# tests/reposnap/test_compression.py
+
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+
+import pytest
+
+from reposnap.controllers.project_controller import ProjectController
+from reposnap.core.compression import compressor
+from reposnap.core.markdown_generator import MarkdownGenerator
+from reposnap.interfaces.cli import build_parser
+
+TREE = {"a.py": None, "b.txt": None}
+FILES = [Path("a.py"), Path("b.txt")]
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / "a.py").write_text("print('é')\n")
+    (root / "b.txt").write_text("b" * 10000)
+    return root
+
+
+def generate(root, output, **kwargs):
+    MarkdownGenerator(root_dir=root, output_file=output, **kwargs).generate_markdown(
+        TREE, FILES
+    )
+    return output
+
+
+@pytest.mark.parametrize(
+    "suffix,opener", [(".gz", gzip.open), (".bz2", bz2.open), (".xz", lzma.open)]
+)
+def test_compressed_output_matches_plain(root, tmp_path, suffix, opener):
+    plain = generate(root, tmp_path / "out.md").read_bytes()
+    packed = generate(root, tmp_path / f"out.md{suffix}")
+
+    assert packed.stat().st_size < len(plain)
+    with opener(packed, "rb") as fh:
+        assert fh.read() == plain
+
+
+def test_gzip_output_is_reproducible(root, tmp_path):
+    first = generate(root, tmp_path / "1.md.gz").read_bytes()
+    second = generate(root, tmp_path / "2.md.gz").read_bytes()
+
+    assert first == second
+
+
+def test_zstd_without_implementation_creates_nothing(root, tmp_path):
+    try:
+        compressor("zstd")
+    except ValueError:
+        with pytest.raises(ValueError):
+            generate(root, tmp_path / "out.md.zst")
+        assert not (tmp_path / "out.md.zst").exists()
+    else:
+        assert generate(root, tmp_path / "out.md.zst").read_bytes()[:4] == (
+            b"\x28\xb5\x2f\xfd"
+        )
+
+
+def test_incremental_needs_plain_output(root, tmp_path):
+    output = generate(root, tmp_path / "out.md.gz", incremental=True)
+
+    assert not Path(f"{output}.manifest.json").exists()
+    with gzip.open(output, "rt", encoding="utf-8") as fh:
+        assert "## b.txt" in fh.read()
+
+
+def test_output_to_stdout(root, monkeypatch, capfd):
+    monkeypatch.chdir(root)
+    args = build_parser().parse_args(["-o", "-", str(root)])
+
+    ProjectController(args).run()
+
+    out = capfd.readouterr().out
+    assert out.startswith("# Project Structure")
+    assert "print('é')" in out
+    assert not (root / "-").exists()
@@ -1,7 +1,14 @@
 # tests/reposnap/test_contains_filter.py
 
+import pytest
 from pathlib import Path
-from reposnap.core.content_search import file_matches, filter_files_by_content
+from unittest.mock import Mock
+from reposnap.core import content_search
+from reposnap.core.content_search import (
+    ContentMatcher,
+    file_matches,
+    filter_files_by_content,
+)
 
 
 class TestContentSearch:
@@ -78,6 +85,23 @@ class TestContentSearch:
         # Should skip large files and return False
         assert not file_matches(large_file, ["x"], ignore_case=True)
 
+    def test_file_matches_configurable_size_limit(self, tmp_path):
+        """Test that the size limit can be raised or disabled."""
+        big_file = tmp_path / "big.txt"
+        big_file.write_text("x" * 2048 + "needle\n")
+
+        assert not file_matches(big_file, ["needle"], max_file_size=1024)
+        assert file_matches(big_file, ["needle"], max_file_size=4096)
+        assert file_matches(big_file, ["needle"], max_file_size=None)
+        assert filter_files_by_content([big_file], ["needle"], max_file_size=1024) == []
+
+    def test_file_matches_empty_file(self, tmp_path):
+        """Test that empty files never match (they cannot be mapped)."""
+        empty = tmp_path / "empty.txt"
+        empty.write_bytes(b"")
+
+        assert not file_matches(empty, ["x"])
+
     def test_file_matches_binary_detection_in_middle(self, tmp_path):
         """Test binary detection with null bytes after text content."""
         mixed_file = tmp_path / "mixed.txt"
@@ -140,6 +164,93 @@ class TestContentSearch:
         filtered = filter_files_by_content(files, ["TODO"], ignore_case=False)
         assert filtered == [test_file]
 
+    @pytest.mark.parametrize("pool", ["serial", "thread", "process", "auto"])
+    def test_filter_files_by_content_pools_preserve_order(self, tmp_path, pool):
+        """Test that every execution pool returns the same ordered matches."""
+        files = []
+        for i in range(100):
+            path = tmp_path / f"file{i:03d}.py"
+            path.write_text("needle\n" if i % 3 == 0 else "hay\n")
+            files.append(path)
+
+        filtered = filter_files_by_content(files, ["needle"], jobs=4, pool=pool)
+
+        assert filtered == [f for i, f in enumerate(files) if i % 3 == 0]
+
+    def test_worker_processes_are_never_forked(self, tmp_path, monkeypatch):
+        """Test that "auto" stays on threads and processes avoid fork."""
+        files = []
+        for i in range(100):
+            path = tmp_path / f"file{i:03d}.py"
+            path.write_text("needle\n")
+            files.append(path)
+        contexts = []
+
+        class RecordingPool(content_search.ThreadPoolExecutor):
+            def __init__(self, max_workers, mp_context=None):
+                contexts.append(mp_context)
+                super().__init__(max_workers)
+
+        monkeypatch.setattr(content_search, "ProcessPoolExecutor", RecordingPool)
+
+        filter_files_by_content(files, ["needle"], jobs=4, pool="auto")
+        assert contexts == []
+        filter_files_by_content(files, ["needle"], jobs=4, pool="process")
+        assert contexts[0].get_start_method() in ("forkserver", "spawn")
+
+    def test_file_matches_opens_file_once(self, tmp_path, monkeypatch):
+        """Test that the binary probe and the scan share a single open."""
+        test_file = tmp_path / "test.py"
+        test_file.write_text("some text\nneedle\n")
+        opened = []
+        original_open = Path.open
+
+        def tracking_open(self, *args, **kwargs):
+            opened.append(self)
+            return original_open(self, *args, **kwargs)
+
+        monkeypatch.setattr(Path, "open", tracking_open)
+
+        assert file_matches(test_file, ["needle"])
+        assert opened == [test_file]
+
+
+class TestContentMatcher:
+    """Test the compiled multi-pattern matcher."""
+
+    def test_matches_any_of_many_patterns(self):
+        matcher = ContentMatcher([f"symbol_{i}" for i in range(50)], ignore_case=False)
+
+        assert matcher.search(b"call symbol_42()")
+        assert not matcher.search(b"call symbol_x()")
+
+    def test_ascii_ignore_case_stays_on_bytes(self):
+        matcher = ContentMatcher(["todo"], ignore_case=True)
+
+        assert not matcher.needs_decode
+        assert matcher.search(b"# TODO: later")
+
+    def test_non_ascii_ignore_case_decodes(self, tmp_path):
+        test_file = tmp_path / "test.txt"
+        test_file.write_text("ÜBER allES\n", encoding="utf-8")
+        matcher = ContentMatcher(["über"], ignore_case=True)
+
+        assert matcher.needs_decode
+        assert file_matches(test_file, ["über"], matcher=matcher)
+        assert not file_matches(test_file, ["über"], ignore_case=False)
+
+    def test_match_across_chunk_boundary(self, tmp_path, monkeypatch):
+        import reposnap.core.content_search as content_search
+
+        monkeypatch.setattr(content_search, "SCAN_CHUNK_SIZE", 4096)
+        monkeypatch.setattr(content_search.mmap, "mmap", Mock(side_effect=OSError))
+        test_file = tmp_path / "test.txt"
+        test_file.write_bytes(b"x" * 4093 + b"needle" + b"x" * 100)
+
+        assert file_matches(test_file, ["needle"])
+        assert file_matches(test_file, ["NEEDLE"], ignore_case=True)
+        assert not file_matches(test_file, ["NEEDLE"], ignore_case=False)
+
 
 class TestProjectControllerIntegration:
     """Test integration of contains filter with ProjectController."""
@@ -167,8 +278,13 @@ class TestProjectControllerIntegration:
         args.include = []
         args.exclude = []
         args.changes = False
+        args.rev = None
+        args.since = None
+        args.range = None
         args.contains = ["import"]
         args.contains_case = False
+        args.jobs = 1
+        args.contains_max_size = None
 
         # Create controller and test content filtering
         controller = ProjectController(args)
@@ -198,8 +314,13 @@ class TestProjectControllerIntegration:
         args.include = []
         args.exclude = []
         args.changes = False
+        args.rev = None
+        args.since = None
+        args.range = None
         args.contains = ["todo"]
         args.contains_case = False
+        args.jobs = 1
+        args.contains_max_size = None
 
         controller = ProjectController(args)
         controller.set_root_dir(tmp_path)
@@ -236,8 +357,13 @@ class TestProjectControllerIntegration:
         args.include = []
         args.exclude = []
         args.changes = False
+        args.rev = None
+        args.since = None
+        args.range = None
         args.contains = []
         args.contains_case = False
+        args.jobs = 1
+        args.contains_max_size = None
 
         controller = ProjectController(args)
         controller.set_root_dir(tmp_path)
@@ -265,8 +391,13 @@ class TestProjectControllerIntegration:
         args.include = []
         args.exclude = []
         args.changes = False
+        args.rev = None
+        args.since = None
+        args.range = None
         args.contains = ["import"]
         args.contains_case = False
+        args.jobs = 1
+        args.contains_max_size = None
 
         # Create controller with the temp directory as root from the start
         # This simulates how the controller would actually work
@@ -0,0 +1,277 @@
+# tests/reposnap/test_daemon.py
+
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from reposnap.core.fs_watch import InotifyWatcher
+from reposnap.interfaces.daemon import DaemonState, SnapshotDaemon
+from reposnap.interfaces.daemon_client import (
+    request_snapshot,
+    run_via_daemon,
+    socket_path_for,
+)
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="Unix sockets are not available"
+)
+
+
+def _listing(files, blob_ids=None):
+    return lambda: ([Path(f) for f in files], dict(blob_ids or {}))
+
+
+def test_state_reuses_listing_while_watching(tmp_path):
+    state = DaemonState(tmp_path)
+    state.watching = True
+    calls = []
+
+    def load():
+        calls.append(1)
+        return [Path("a.py")], {}
+
+    assert state.listing(False, load)[0] == [Path("a.py")]
+    assert state.listing(False, load)[0] == [Path("a.py")]
+    assert len(calls) == 1
+
+    state.on_change("modified", ".git/index", False)
+    state.listing(False, load)
+    assert len(calls) == 2
+
+
+def test_state_applies_events_to_scanned_listing(tmp_path):
+    state = DaemonState(tmp_path)  # no .git: listing comes from a scan
+    state.watching = True
+    state.listing(False, _listing(["a.py", "pkg/b.py", "pkg/c.py"]))
+
+    state.on_change("created", "d.py", False)
+    state.on_change("deleted", "pkg", True)
+
+    files, _ = state.listing(False, _listing([]))
+    assert files == [Path("a.py"), Path("d.py")]
+
+
+def test_state_does_not_duplicate_atomically_saved_files(tmp_path):
+    state = DaemonState(tmp_path)
+    state.watching = True
+    state.listing(False, _listing(["a.py"]))
+
+    # Each save writes a temporary file and renames it over a.py.
+    for _ in range(2):
+        state.on_change("created", ".a.py.swp", False)
+        state.on_change("deleted", ".a.py.swp", False)
+        state.on_change("created", "a.py", False)
+
+    files, _ = state.listing(False, _listing([]))
+    assert files == [Path("a.py")]
+
+
+def test_state_drops_blob_id_of_edited_file(tmp_path):
+    (tmp_path / ".git").mkdir()
+    state = DaemonState(tmp_path)
+    state.watching = True
+    state.listing(False, _listing(["a.py", "b.py"], {"a.py": "1", "b.py": "2"}))
+
+    state.on_change("modified", "a.py", False)
+
+    files, blob_ids = state.listing(False, _listing([]))
+    assert files == [Path("a.py"), Path("b.py")]
+    assert blob_ids == {"b.py": "2"}
+
+
+def test_state_keeps_blob_ids_apart_from_plain_listing(tmp_path):
+    (tmp_path / ".git").mkdir()
+    state = DaemonState(tmp_path)
+    state.watching = True
+    state.listing(False, _listing(["a.py"]))
+    state.listing(False, _listing(["a.py"], {"a.py": "1"}), with_blob_ids=True)
+
+    state.on_change("deleted", "b.py", False)
+
+    assert state.listing(False, _listing([]))[1] == {}
+    assert state.listing(False, _listing([]), with_blob_ids=True)[1] == {"a.py": "1"}
+
+
+def test_daemon_collects_blob_ids_for_cache_request(tmp_path):
+    import subprocess
+
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / "a.py").write_text("print('a')\n")
+    for args in (["init", "-q"], ["add", "."]):
+        subprocess.run(["git", *args], cwd=root, check=True)
+    daemon = SnapshotDaemon(root)
+    daemon.state.watching = True  # keep listings as a running daemon would
+    request = {"version": 1, "argv": [".", "-o", "out.md"], "cwd": str(tmp_path)}
+
+    assert daemon.handle(request)["ok"]
+    request["argv"] = [*request["argv"], "--cache"]
+    assert daemon.handle(request)["ok"]
+
+    _, blob_ids = daemon.state.listing(False, _listing([]), with_blob_ids=True)
+    assert set(blob_ids) == {"a.py"}
+
+
+def test_state_keeps_ignore_rules_until_a_gitignore_changes(tmp_path):
+    from reposnap.core.ignore import IgnoreRules
+
+    state = DaemonState(tmp_path)
+    state.watching = True
+    load = lambda: IgnoreRules(tmp_path)  # noqa: E731
+
+    rules = state.ignore_rules(load)
+    state.on_change("modified", "src/a.py", False)
+    assert state.ignore_rules(load) is rules
+
+    # Truncate-then-write editors fire this while the file is empty.
+    state.on_change("modified", "src/.gitignore", False)
+    assert state.ignore_rules(load) is rules
+
+    state.on_change("written", "src/.gitignore", False)
+    assert state.ignore_rules(load) is not rules
+
+
+def test_daemon_serves_snapshot(tmp_path, monkeypatch):
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / "a.py").write_text("print('a')\n")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+    daemon = SnapshotDaemon(root)
+    daemon.start()
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert daemon.socket_path == socket_path_for(root)
+        assert daemon.socket_path.stat().st_mode & 0o077 == 0
+        reply = request_snapshot(daemon.socket_path, [".", "-o", "out.md"], tmp_path)
+        assert reply == {"ok": True, "output": str(tmp_path / "out.md")}
+        assert "print('a')" in (tmp_path / "out.md").read_text()
+
+        bad = request_snapshot(daemon.socket_path, ["--no-such-flag"], tmp_path)
+        assert bad["ok"] is False
+    finally:
+        daemon.shutdown()
+        thread.join()
+    assert not daemon.socket_path.exists()
+
+
+def test_run_via_daemon_without_daemon(tmp_path, monkeypatch):
+    (tmp_path / ".git").mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+
+    assert run_via_daemon(["."]) is False
+
+
+def test_run_via_daemon_only_trusts_private_socket_dir(tmp_path, monkeypatch):
+    from reposnap.interfaces import daemon_client
+
+    (tmp_path / ".git").mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+    socket_path = socket_path_for(tmp_path)
+    socket_path.parent.mkdir(parents=True)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(socket_path))
+    requests = []
+    monkeypatch.setattr(
+        daemon_client,
+        "request_snapshot",
+        lambda *request: requests.append(request) or {"ok": False},
+    )
+    try:
+        socket_path.parent.chmod(0o777)
+        assert run_via_daemon(["."]) is False
+        assert requests == []
+
+        socket_path.parent.chmod(0o700)
+        assert run_via_daemon(["."]) is False  # {"ok": False} reply
+        assert len(requests) == 1
+    finally:
+        listener.close()
+
+
+def test_daemon_refuses_shared_socket_dir(tmp_path, monkeypatch):
+    root = tmp_path / "repo"
+    root.mkdir()
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+    (tmp_path / "run" / "reposnap").mkdir(parents=True)
+    (tmp_path / "run" / "reposnap").chmod(0o777)
+    daemon = SnapshotDaemon(root)
+
+    with pytest.raises(PermissionError):
+        daemon.start()
+    assert daemon.watcher is None
+    assert not daemon.socket_path.exists()
+
+
+@pytest.mark.skipif(not InotifyWatcher.available(), reason="inotify unavailable")
+def test_inotify_watcher_reports_changes(tmp_path):
+    (tmp_path / "sub").mkdir()
+    events = []
+    watcher = InotifyWatcher(tmp_path, lambda *event: events.append(event))
+    watcher.start()
+    try:
+        (tmp_path / "sub" / "new.py").write_text("x")
+        (tmp_path / "newdir").mkdir()
+        time.sleep(0.1)
+        (tmp_path / "newdir" / "inner.py").write_text("y")
+        deadline = time.time() + 5
+        while (
+            time.time() < deadline
+            and ("created", "newdir/inner.py", False) not in events
+        ):
+            time.sleep(0.05)
+    finally:
+        watcher.stop()
+    assert ("created", "sub/new.py", False) in events
+    assert ("written", "sub/new.py", False) in events
+    assert ("created", "newdir", True) in events
+    assert ("created", "newdir/inner.py", False) in events
+
+
+@pytest.mark.skipif(not InotifyWatcher.available(), reason="inotify unavailable")
+def test_daemon_does_not_watch_ignored_directories(tmp_path, monkeypatch):
+    root = tmp_path / "repo"
+    for rel in ("src/pkg", "node_modules/lib", ".venv/lib", "build"):
+        (root / rel).mkdir(parents=True)
+    (root / ".gitignore").write_text("node_modules/\n.venv/\n")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+    daemon = SnapshotDaemon(root)
+    daemon.start()
+    try:
+        assert sorted(daemon.watcher._wd_paths.values()) == [
+            "",
+            "build",
+            "src",
+            "src/pkg",
+        ]
+        # Un-ignoring a directory starts watching it...
+        (root / ".gitignore").write_text(".venv/\n")
+        deadline = time.time() + 5
+        while time.time() < deadline and (
+            "node_modules/lib" not in daemon.watcher._wd_paths.values()
+        ):
+            time.sleep(0.05)
+        assert "node_modules/lib" in daemon.watcher._wd_paths.values()
+        assert ".venv" not in daemon.watcher._wd_paths.values()
+
+        # ...and ignoring it again stops.
+        (root / ".gitignore").write_text("node_modules/\n.venv/\n")
+        deadline = time.time() + 5
+        while time.time() < deadline and (
+            "node_modules" in daemon.watcher._wd_paths.values()
+        ):
+            time.sleep(0.05)
+        assert sorted(daemon.watcher._wd_paths.values()) == [
+            "",
+            "build",
+            "src",
+            "src/pkg",
+        ]
+    finally:
+        daemon.close()
@@ -0,0 +1,183 @@
+# tests/reposnap/test_diff_scope.py
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from reposnap.controllers.project_controller import ProjectController, range_target
+from reposnap.core import git_objects
+from reposnap.core.diff_scope import DiffScope
+from reposnap.core.git_objects import BlobReader
+from reposnap.core.git_repo import ChangedFile, GitRepo
+from reposnap.interfaces.cli import build_parser, main
+
+BODY = "".join(f"line {i}\n" for i in range(1, 41))
+
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+@pytest.fixture
+def pr_repo(tmp_path):
+    """Tag base, then one commit touching several files, then a dirty tree."""
+    root = tmp_path / "repo"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "app.py").write_text(BODY)
+    (root / "src" / "old_name.py").write_text("moved = True\n" * 10)
+    (root / "gone.txt").write_text("bye\n")
+    (root / "same.txt").write_text("same\n")
+    _git(root, "init", "-q")
+    _git(root, "add", ".")
+    _git(root, "commit", "-q", "-m", "base")
+    _git(root, "tag", "base")
+    (root / "src" / "app.py").write_text(BODY.replace("line 20\n", "line twenty\n"))
+    _git(root, "mv", "src/old_name.py", "src/new_name.py")
+    _git(root, "rm", "-q", "gone.txt")
+    (root / "added.md").write_text("# new\n")
+    _git(root, "add", ".")
+    _git(root, "commit", "-q", "-m", "change")
+    (root / "same.txt").write_text("edited, not committed\n")
+    return root
+
+
+def test_get_changed_files_between_revisions(pr_repo):
+    changes = {c.path: c for c in GitRepo(pr_repo).get_changed_files("base..HEAD")}
+    assert sorted(changes) == [
+        Path("added.md"),
+        Path("src/app.py"),
+        Path("src/new_name.py"),
+    ]
+    assert changes[Path("added.md")].status == "A"
+    assert changes[Path("added.md")].old_blob is None
+    assert changes[Path("src/app.py")].status == "M"
+    renamed = changes[Path("src/new_name.py")]
+    assert (renamed.status, renamed.old_path) == ("R", "src/old_name.py")
+
+    # Relative to a subdirectory; the worktree side includes uncommitted edits.
+    changes = GitRepo(pr_repo / "src").get_changed_files("base")
+    assert [(c.path, c.old_path) for c in changes] == [
+        (Path("app.py"), "app.py"),
+        (Path("new_name.py"), "old_name.py"),
+    ]
+    assert [c.path for c in GitRepo(pr_repo).get_changed_files("HEAD")] == [
+        Path("same.txt")
+    ]
+    with pytest.raises(ValueError, match="Cannot diff"):
+        GitRepo(pr_repo).get_changed_files("no-such-rev")
+
+
+def test_hunks_mark_additions_and_missing_newline(pr_repo):
+    blob = _git(pr_repo, "rev-parse", "base:same.txt").strip()
+    reader = BlobReader(pr_repo)
+    scope = DiffScope(
+        [
+            ChangedFile(Path("same.txt"), "M", "same.txt", blob),
+            ChangedFile(Path("new.txt"), "A", "new.txt", None),
+        ],
+        reader,
+    )
+    try:
+        assert scope.hunks(Path("same.txt"), "same\nmore") == (
+            "--- a/same.txt\n"
+            "+++ b/same.txt\n"
+            "@@ -1 +1,2 @@\n"
+            " same\n"
+            "+more\n"
+            "\\ No newline at end of file\n"
+        )
+        assert scope.hunks(Path("new.txt"), "x\n").startswith(
+            "--- /dev/null\n+++ b/new.txt\n@@ -0,0 +1 @@\n+x\n"
+        )
+        assert scope.hunks(Path("same.txt"), "same\n") == ""
+    finally:
+        scope.close()
+
+
+def test_range_snapshot_with_hunks(pr_repo, monkeypatch):
+    started = []
+    popen = subprocess.Popen
+
+    def tracking_popen(cmd, *args, **kwargs):
+        started.append(cmd)
+        return popen(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(git_objects.subprocess, "Popen", tracking_popen)
+    monkeypatch.chdir(pr_repo)
+    output = pr_repo / "out.md"
+    args = build_parser().parse_args(
+        ["--range", "base..HEAD", "--hunks", "-o", str(output), "."]
+    )
+    ProjectController(args).run()
+
+    text = output.read_text()
+    assert "## src/app.py\n\n```python\n--- a/src/app.py\n+++ b/src/app.py\n" in text
+    assert "@@ -17,7 +17,7 @@\n line 17\n" in text
+    assert "-line 20\n+line twenty\n" in text
+    assert "line 1\n" not in text and "line 40" not in text
+    assert "--- a/src/old_name.py\n+++ b/src/new_name.py\n" in text
+    assert "+# new\n" in text
+    # Deleted and uncommitted files are not part of the range.
+    assert "gone.txt" not in text and "same.txt" not in text
+    assert [cmd for cmd in started if "cat-file" in cmd] == [
+        ["git", "cat-file", "--batch"]
+    ]
+
+
+def test_since_snapshot_reads_whole_files_from_worktree(pr_repo, monkeypatch):
+    monkeypatch.chdir(pr_repo)
+    output = pr_repo / "out.md"
+    args = build_parser().parse_args(["--since", "HEAD~1", "-o", str(output), "."])
+    ProjectController(args).run()
+
+    text = output.read_text()
+    assert "line twenty" in text and "line 40" in text
+    assert "## same.txt\n\n```\nedited, not committed\n```" in text
+    assert "gone.txt" not in text
+
+
+def test_range_target():
+    assert range_target("main..feature") == "feature"
+    assert range_target("main...feature") == "feature"
+    assert range_target("v1..") == "HEAD"
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["--since", "HEAD", "--rev", "v1", "."],
+        ["--range", "v1", "."],
+        ["--hunks", "."],
+    ],
+)
+def test_cli_rejects_inconsistent_diff_options(argv, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["reposnap", *argv])
+    with pytest.raises(SystemExit):
+        main()
+    assert "error:" in capsys.readouterr().err
+
+
+def test_added_file_in_sha256_repository(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    try:
+        _git(root, "init", "-q", "--object-format=sha256")
+    except subprocess.CalledProcessError:
+        pytest.skip("git without SHA-256 support")
+    (root / "a.txt").write_text("a\n")
+    _git(root, "add", ".")
+    _git(root, "commit", "-q", "-m", "one")
+    (root / "b.txt").write_text("b\n")
+    _git(root, "add", ".")
+    _git(root, "commit", "-q", "-m", "two")
+
+    [added] = GitRepo(root).get_changed_files("HEAD~1..HEAD")
+    assert (added.path, added.status, added.old_blob) == (Path("b.txt"), "A", None)
@@ -49,3 +49,32 @@ def test_relative_path_resolution(file_system, tmp_path):
     assert (
         expected_path in tree_structure
     ), f"{expected_path} not found in tree_structure"
+
+
+def test_list_files_prunes_directories(file_system, tmp_path):
+    for rel in ["b.py", "a/x.py", "node_modules/lib/index.js", ".git/HEAD"]:
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text("content")
+    (tmp_path / "empty").mkdir()
+    asked = []
+
+    def prune_dir(rel_dir):
+        asked.append(rel_dir)
+        return rel_dir == "node_modules"
+
+    files = file_system.list_files(prune_dir)
+
+    assert [f.as_posix() for f in files] == ["b.py", "a/x.py"]
+    # Pruned and skipped directories are never entered.
+    assert sorted(asked) == ["a", "empty", "node_modules"]
+
+
+def test_list_files_does_not_follow_directory_symlinks(file_system, tmp_path):
+    (tmp_path / "real").mkdir()
+    (tmp_path / "real" / "f.txt").write_text("content")
+    (tmp_path / "link").symlink_to(tmp_path / "real", target_is_directory=True)
+    (tmp_path / "f_link.txt").symlink_to(tmp_path / "real" / "f.txt")
+
+    files = file_system.list_files()
+
+    assert [f.as_posix() for f in files] == ["f_link.txt", "real/f.txt"]
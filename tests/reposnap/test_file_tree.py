@@ -1,6 +1,9 @@
 # tests/reposnap/test_file_tree.py
 
+from pathlib import Path
+
 from reposnap.models.file_tree import FileTree
+from reposnap.utils.path_utils import format_tree
 import pathspec
 
 
@@ -16,3 +19,63 @@ def test_file_tree_filter_files():
     file_tree.filter_files(spec)
     expected_structure = {"dir1": {"file1.py": "dir1/file1.py"}, "file3.py": "file3.py"}
     assert file_tree.structure == expected_structure
+
+
+PATHS = [
+    "src/pkg/__init__.py",
+    "src/pkg/core.log",
+    "README.md",
+    "src/main.py",
+    "docs/__init__.py",
+    "src/pkg/__init__.py",  # duplicate
+]
+
+
+def _dict_tree(paths):
+    tree = {}
+    for path in paths:
+        *dirs, name = path.split("/")
+        node = tree
+        for part in dirs:
+            node = node.setdefault(part, {})
+        node[name] = None
+    return tree
+
+
+def test_compact_file_tree_matches_dict_backend():
+    compact = FileTree.from_paths([Path(p) for p in PATHS])
+    legacy = FileTree(_dict_tree(PATHS))
+
+    assert compact.get_all_files() == legacy.get_all_files()
+    assert compact.view() == legacy.structure
+    assert list(format_tree(compact.view())) == list(format_tree(legacy.structure))
+    assert compact.view()["src"]["pkg"]["__init__.py"] is None
+    assert "docs" in compact.view() and "missing" not in compact.view()
+
+
+def test_compact_file_tree_filter_and_prune():
+    spec = pathspec.PathSpec.from_lines(
+        pathspec.patterns.GitWildMatchPattern, ["*.log", "docs/"]
+    )
+    compact = FileTree.from_paths([Path(p) for p in PATHS])
+    legacy = FileTree(_dict_tree(PATHS))
+    compact.filter_files(spec)
+    legacy.filter_files(spec)
+
+    assert compact.get_all_files() == legacy.get_all_files()
+    selected = {"src/main.py"}
+    pruned = compact.prune_tree(selected)
+    assert pruned == legacy.prune_tree(selected) == {"src": {"main.py": None}}
+    # Pruning returns a new tree and leaves the filtered one untouched.
+    assert len(compact.get_all_files()) == 3
+
+
+def test_compact_file_tree_structure_is_a_plain_dict():
+    file_tree = FileTree.from_paths([Path(p) for p in PATHS])
+
+    structure = file_tree.structure
+
+    assert type(structure) is dict and type(structure["src"]) is dict
+    assert structure == _dict_tree(PATHS)
+    structure.pop("docs")
+    assert Path("docs/__init__.py") not in file_tree.get_all_files()
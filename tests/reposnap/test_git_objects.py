@@ -0,0 +1,122 @@
+# tests/reposnap/test_git_objects.py
+
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from reposnap.controllers.project_controller import ProjectController
+from reposnap.core import git_objects
+from reposnap.core.git_objects import GitRevision
+from reposnap.interfaces.cli import build_parser
+
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+@pytest.fixture
+def tagged_repo(tmp_path):
+    """Repo with tag v1; the worktree has moved on since."""
+    root = tmp_path / "repo"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "app.py").write_text("print('v1')\n")
+    (root / "src" / "data.bin").write_bytes(b"\0\1\2")
+    (root / "big.txt").write_text("x" * 5000)
+    (root / "README.md").write_text("# v1\n")
+    (root / ".gitignore").write_text("*.txt\n")
+    os.symlink("README.md", root / "link.md")
+    _git(root, "init", "-q")
+    _git(root, "add", "-f", ".")
+    _git(root, "commit", "-q", "-m", "v1")
+    _git(root, "tag", "v1")
+    (root / "src" / "app.py").write_text("print('v2')\n")
+    (root / "README.md").unlink()
+    (root / "src" / "new.py").write_text("untracked\n")
+    return root
+
+
+def test_revision_lists_and_reads_committed_files(tagged_repo):
+    revision = GitRevision(tagged_repo, "v1")
+    try:
+        assert revision.files() == [
+            Path(".gitignore"),
+            Path("README.md"),
+            Path("big.txt"),
+            Path("src/app.py"),
+            Path("src/data.bin"),
+        ]
+        entry = revision.entry(Path("src/app.py"))
+        assert entry.size == len("print('v1')\n")
+        assert revision.read(entry.blob) == b"print('v1')\n"
+        with pytest.raises(FileNotFoundError):
+            revision.read("0" * 40)
+        # Paths are relative to the directory the revision was opened in.
+        assert GitRevision(tagged_repo / "src", "v1").files() == [
+            Path("app.py"),
+            Path("data.bin"),
+        ]
+    finally:
+        revision.close()
+
+
+def test_unknown_revision_raises(tagged_repo):
+    with pytest.raises(ValueError, match="Unknown revision"):
+        GitRevision(tagged_repo, "no-such-tag")
+
+
+def test_snapshot_at_tag_uses_one_cat_file_process(tagged_repo, monkeypatch):
+    started = []
+    popen = subprocess.Popen
+
+    def tracking_popen(cmd, *args, **kwargs):
+        started.append(cmd)
+        return popen(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(git_objects.subprocess, "Popen", tracking_popen)
+    read = GitRevision.read
+    read_blobs = []
+
+    def tracking_read(self, blob):
+        read_blobs.append(blob)
+        return read(self, blob)
+
+    monkeypatch.setattr(GitRevision, "read", tracking_read)
+    monkeypatch.chdir(tagged_repo)
+    output = tagged_repo / "out.md"
+    args = build_parser().parse_args(
+        ["--rev", "v1", "--max-file-size", "1000", "-o", str(output), "."]
+    )
+    ProjectController(args).run()
+
+    text = output.read_text()
+    assert "print('v1')" in text and "print('v2')" not in text
+    assert "## README.md\n\n```\n# v1\n```" in text
+    assert "new.py" not in text and "link.md" not in text
+    # Committed files are listed even if .gitignore matches them.
+    assert "## big.txt\n\n```\n[oversized file, 5000 bytes (limit 1000): " in text
+    assert "[binary file, 3 bytes: contents omitted]" in text
+    assert [cmd for cmd in started if "cat-file" in cmd] == [
+        ["git", "cat-file", "--batch"]
+    ]
+    big = GitRevision(tagged_repo, "v1").entry(Path("big.txt")).blob
+    assert len(read_blobs) == 4 and big not in read_blobs
+
+
+def test_rev_content_filter_searches_blobs(tagged_repo, monkeypatch):
+    monkeypatch.chdir(tagged_repo)
+    args = build_parser().parse_args(["--rev", "v1", "-S", "v1", "-o", "x.md", "."])
+    controller = ProjectController(args)
+    controller.collect_file_tree()
+    controller._close_blob_readers()
+    assert controller.file_tree.get_all_files() == [
+        Path("README.md"),
+        Path("src/app.py"),
+    ]
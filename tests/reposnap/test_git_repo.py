@@ -1,10 +1,39 @@
 # tests/reposnap/test_git_repo.py
 
+import subprocess
 from unittest.mock import patch, MagicMock
+
+import pytest
+
+from reposnap.core.git_index import read_index
 from reposnap.core.git_repo import GitRepo
 from pathlib import Path
 
 
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+@pytest.fixture
+def indexed_repo(tmp_path):
+    for rel in ["a.py", "pkg/b.py", "pkg/sub/c.py", "ü/ñ.py", "x" * 120 + "/y.py"]:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel)
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-qm", "init")
+    (tmp_path / "new.py").write_text("new")
+    _git(tmp_path, "add", "-N", "new.py")  # sets the extended flags (v3+)
+    return tmp_path
+
+
 @patch("reposnap.core.git_repo.Repo")
 def test_get_git_files(mock_repo):
     mock_repo_instance = MagicMock()
@@ -20,90 +49,113 @@ def test_get_git_files(mock_repo):
     assert files == expected_files
 
 
+@pytest.mark.parametrize("version", ["2", "3", "4"])
+def test_read_index_matches_ls_files(indexed_repo, version):
+    _git(indexed_repo, "update-index", "--index-version", version)
+
+    entries = read_index(indexed_repo / ".git")
+
+    expected = _git(indexed_repo, "ls-files", "-s", "-z").split("\0")[:-1]
+    assert [
+        f"{e.mode:o} {e.object_id.hex()} {e.stage}\t{e.path}" for e in entries
+    ] == expected
+
+
+def test_get_git_files_reads_index_without_git(indexed_repo):
+    with patch("reposnap.core.git_repo.Repo") as mock_repo:
+        files = GitRepo(indexed_repo / "pkg").get_git_files()
+
+    mock_repo.assert_not_called()
+    assert files == [Path("b.py"), Path("sub/c.py")]
+
+
+def test_get_git_files_falls_back_for_split_index(indexed_repo):
+    _git(indexed_repo, "update-index", "--split-index")
+
+    assert read_index(indexed_repo / ".git") is None
+    files = GitRepo(indexed_repo / "pkg").get_git_files()
+    assert files == [Path("b.py"), Path("sub/c.py")]
+
+
 @patch("reposnap.core.git_repo.Repo")
-@patch("pathlib.Path.is_file")
-def test_get_uncommitted_files_staged_and_unstaged(mock_is_file, mock_repo):
-    """Test get_uncommitted_files with staged and unstaged changes."""
+def test_get_blob_ids_skips_dirty_and_special_entries(mock_repo):
     mock_repo_instance = MagicMock()
     mock_repo_instance.working_tree_dir = "/path/to/repo"
+    mock_repo_instance.git.ls_files.return_value = "\0".join(
+        [
+            "100644 aaa 0\tsubdir/clean.py",
+            "100755 bbb 0\tsubdir/dirty.sh",
+            "120000 ccc 0\tsubdir/link",
+            "160000 ddd 0\tsubdir/submodule",
+            "100644 eee 1\tsubdir/conflict.py",
+            "100644 fff 0\toutside.py",
+        ]
+    )
+    mock_repo_instance.git.diff_files.return_value = "subdir/dirty.sh\0"
+    mock_repo.return_value = mock_repo_instance
 
-    # Mock staged changes
-    staged_diff = MagicMock()
-    staged_diff.a_path = "staged_file.py"
-    staged_diff.b_path = None
+    git_repo = GitRepo(Path("/path/to/repo/subdir"))
 
-    # Mock unstaged changes
-    unstaged_diff = MagicMock()
-    unstaged_diff.a_path = "unstaged_file.py"
-    unstaged_diff.b_path = None
+    assert git_repo.get_blob_ids() == {"clean.py": "aaa"}
 
-    mock_repo_instance.index.diff.side_effect = lambda ref: {
-        "HEAD": [staged_diff],
-        None: [unstaged_diff],
-    }[ref]
 
-    # Mock untracked files
-    mock_repo_instance.untracked_files = ["untracked_file.py"]
+def _status(*records: str) -> str:
+    """Join ``git status --porcelain=v2 -z`` records."""
+    return "".join(f"{record}\0" for record in records)
 
-    # Mock stash (empty)
-    mock_repo_instance.git.stash.return_value = ""
 
-    # Mock file existence
-    mock_is_file.return_value = True
+SHA = "0" * 40
 
+
+@patch("reposnap.core.git_repo.Repo")
+def test_get_uncommitted_files_staged_and_unstaged(mock_repo):
+    """Test get_uncommitted_files with staged and unstaged changes."""
+    mock_repo_instance = MagicMock()
+    mock_repo_instance.working_tree_dir = "/path/to/repo"
+    mock_repo_instance.git.status.return_value = _status(
+        f"1 M. N... 100644 100644 100644 {SHA} {SHA} staged_file.py",
+        f"1 .M N... 100644 100644 100644 {SHA} {SHA} unstaged file.py",
+        f"2 R. N... 100644 100644 100644 {SHA} {SHA} R100 renamed.py",
+        "old_name.py",
+        f"1 D. N... 100644 000000 000000 {SHA} {SHA} staged_delete.py",
+        f"1 .D N... 100644 100644 000000 {SHA} {SHA} deleted.py",
+        f"1 .M S.M. 160000 160000 160000 {SHA} {SHA} submodule",
+        f"u UU N... 100644 100644 100644 100644 {SHA} {SHA} {SHA} conflict.py",
+        "? untracked_file.py",
+    )
+    mock_repo_instance.git.stash.return_value = ""
     mock_repo.return_value = mock_repo_instance
 
     git_repo = GitRepo(Path("/path/to/repo"))
     files = git_repo.get_uncommitted_files()
 
-    expected_files = [
+    assert files == [
+        Path("conflict.py"),
+        Path("renamed.py"),
         Path("staged_file.py"),
-        Path("unstaged_file.py"),
+        Path("unstaged file.py"),
         Path("untracked_file.py"),
     ]
-
-    # Compare sorted lists since the method now returns sorted output
-    assert files == sorted(expected_files)
+    mock_repo_instance.git.status.assert_called_once()
 
 
 @patch("reposnap.core.git_repo.Repo")
-@patch("pathlib.Path.is_file")
-def test_get_uncommitted_files_with_stash(mock_is_file, mock_repo):
-    """Test get_uncommitted_files with stash entries."""
+@patch("os.path.isfile")
+def test_get_uncommitted_files_with_stash(mock_isfile, mock_repo):
+    """Test get_uncommitted_files with stash entries (all, in one call)."""
     mock_repo_instance = MagicMock()
     mock_repo_instance.working_tree_dir = "/path/to/repo"
-
-    # Mock no staged/unstaged changes
-    mock_repo_instance.index.diff.return_value = []
-
-    # Mock untracked files
-    mock_repo_instance.untracked_files = []
-
-    # 1) Mock stash list
-    mock_repo_instance.git.stash.return_value = "stash@{0}\nstash@{1}"
-
-    # 2) Mock diff calls to get stash file names
-    mock_repo_instance.git.diff.side_effect = lambda *args: {
-        ("--name-only", "stash@{0}^1", "stash@{0}"): "stash_file1.py\nstash_file2.py",
-        ("--name-only", "stash@{1}^1", "stash@{1}"): "stash_file3.py",
-    }[args]
-
-    # Mock file existence
-    mock_is_file.return_value = True
-
+    mock_repo_instance.git.status.return_value = ""
+    stashes = [f"\x01\0\nstash_file_{i}.py\0" for i in range(15)]
+    mock_repo_instance.git.stash.return_value = "".join(stashes) + "\x01\0\ngone.py\0"
+    mock_isfile.side_effect = lambda path: not path.endswith("gone.py")
     mock_repo.return_value = mock_repo_instance
 
     git_repo = GitRepo(Path("/path/to/repo"))
     files = git_repo.get_uncommitted_files()
 
-    expected_files = [
-        Path("stash_file1.py"),
-        Path("stash_file2.py"),
-        Path("stash_file3.py"),
-    ]
-
-    # Compare sorted lists since the method now returns sorted output
-    assert files == sorted(expected_files)
+    assert files == sorted(Path(f"stash_file_{i}.py") for i in range(15))
+    mock_repo_instance.git.stash.assert_called_once()
 
 
 @patch("reposnap.core.git_repo.Repo")
@@ -111,12 +163,8 @@ def test_get_uncommitted_files_empty_working_tree(mock_repo):
     """Test get_uncommitted_files with no changes."""
     mock_repo_instance = MagicMock()
     mock_repo_instance.working_tree_dir = "/path/to/repo"
-
-    # Mock no changes
-    mock_repo_instance.index.diff.return_value = []
-    mock_repo_instance.untracked_files = []
+    mock_repo_instance.git.status.return_value = ""
     mock_repo_instance.git.stash.return_value = ""
-
     mock_repo.return_value = mock_repo_instance
 
     git_repo = GitRepo(Path("/path/to/repo"))
@@ -139,73 +187,42 @@ def test_get_uncommitted_files_invalid_repo(mock_repo):
 
 
 @patch("reposnap.core.git_repo.Repo")
-@patch("pathlib.Path.is_file")
-def test_get_uncommitted_files_stash_error_handling(mock_is_file, mock_repo):
+def test_get_uncommitted_files_stash_error_handling(mock_repo):
     """Test get_uncommitted_files handles stash errors gracefully."""
     mock_repo_instance = MagicMock()
     mock_repo_instance.working_tree_dir = "/path/to/repo"
-
-    # Mock staged changes
-    staged_diff = MagicMock()
-    staged_diff.a_path = "staged_file.py"
-    staged_diff.b_path = None
-    mock_repo_instance.index.diff.return_value = [staged_diff]
-
-    # Mock untracked files
-    mock_repo_instance.untracked_files = []
-
-    # Mock stash error
+    mock_repo_instance.git.status.return_value = _status(
+        f"1 M. N... 100644 100644 100644 {SHA} {SHA} staged_file.py"
+    )
     mock_repo_instance.git.stash.side_effect = Exception("Stash error")
-
-    # Mock file existence
-    mock_is_file.return_value = True
-
     mock_repo.return_value = mock_repo_instance
 
     git_repo = GitRepo(Path("/path/to/repo"))
     files = git_repo.get_uncommitted_files()
 
     # Should still return staged changes even if stash fails
-    expected_files = [Path("staged_file.py")]
-    assert files == expected_files
-
-
-@patch("reposnap.core.git_repo.Repo")
-@patch("pathlib.Path.is_file")
-def test_get_uncommitted_files_stash_limit(mock_is_file, mock_repo):
-    """Test get_uncommitted_files respects the stash limit."""
-    mock_repo_instance = MagicMock()
-    mock_repo_instance.working_tree_dir = "/path/to/repo"
-
-    # Mock no staged/unstaged changes
-    mock_repo_instance.index.diff.return_value = []
-
-    # Mock untracked files
-    mock_repo_instance.untracked_files = []
-
-    # Mock many stash entries (more than the limit of 10)
-    many_stashes = "\n".join([f"stash@{{{i}}}" for i in range(15)])
-    mock_repo_instance.git.stash.return_value = many_stashes
-
-    # Mock diff calls for the first 10 stashes (the limit)
-    def mock_diff(*args):
-        if args[0] == "--name-only" and len(args) == 3:
-            stash_ref = args[2]  # e.g., 'stash@{0}'
-            stash_num = int(stash_ref.split("{")[1].split("}")[0])
-            if stash_num < 10:  # Only the first 10 should be processed
-                return f"stash_file_{stash_num}.py"
-        return ""
-
-    mock_repo_instance.git.diff.side_effect = mock_diff
-
-    # Mock file existence
-    mock_is_file.return_value = True
-
-    mock_repo.return_value = mock_repo_instance
-
-    git_repo = GitRepo(Path("/path/to/repo"))
-    files = git_repo.get_uncommitted_files()
-
-    # Should only process the first 10 stashes
-    # The exact number depends on how many unique files are in those stashes
-    assert len(files) >= 0  # At minimum, should not crash
+    assert files == [Path("staged_file.py")]
+
+
+def test_get_uncommitted_files_in_real_repo(tmp_path):
+    for rel in ["a.py", "b.py", "sub/c.py", "sub/d.py", "e.py"]:
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text(rel)
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+    (tmp_path / "e.py").write_text("stashed")
+    _git(tmp_path, "stash", "-q")
+    (tmp_path / "a.py").write_text("changed")
+    _git(tmp_path, "mv", "b.py", "b2.py")
+    (tmp_path / "sub" / "new.py").write_text("new")
+    (tmp_path / "sub" / "c.py").unlink()
+    _git(tmp_path, "rm", "-q", "sub/d.py")
+
+    assert GitRepo(tmp_path).get_uncommitted_files() == [
+        Path("a.py"),
+        Path("b2.py"),
+        Path("e.py"),
+        Path("sub/new.py"),
+    ]
+    assert GitRepo(tmp_path / "sub").get_uncommitted_files() == [Path("new.py")]
@@ -0,0 +1,149 @@
+# tests/reposnap/test_ignore.py
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from reposnap.core.ignore import IgnoreRules, global_excludes_file
+
+TREE = {
+    ".gitignore": "*.log\nbuild/\n/dist\n",
+    "a.py": "",
+    "notes.txt": "",
+    "debug.log": "",
+    "build/out.py": "",
+    "dist/pkg.py": "",
+    "src/dist/pkg.py": "",
+    "src/.gitignore": "!debug.log\n/tmp/\n*.txt\n",
+    "src/debug.log": "",
+    "src/other.log": "",
+    "src/tmp/x.py": "",
+    "src/lib/tmp/y.py": "",
+    "src/lib/readme.txt": "",
+    "src/lib/.gitignore": "!readme.txt\n",
+    "vendor/pkg/mod.py": "",
+    "vendor/pkg/keep.py": "",
+    "logs/app.py": "",
+    "web/.gitignore": "*\n!*/\n!*.js\n",
+    "web/app.js": "",
+    "web/app.css": "",
+    "web/lib/util.js": "",
+    "web/lib/style.css": "",
+}
+
+
+def _git(repo: Path, *args: str, stdin: str = "") -> str:
+    return subprocess.run(
+        ["git", *args], cwd=repo, input=stdin, capture_output=True, text=True
+    ).stdout
+
+
+@pytest.fixture
+def worktree(tmp_path, monkeypatch):
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(tmp_path / "gitconfig"))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    root = tmp_path / "repo"
+    for rel, content in TREE.items():
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_text(content)
+    _git(root, "init", "-q")
+    (root / ".git" / "info" / "exclude").write_text("vendor/pkg/mod.py\n")
+    excludes = tmp_path / "global-ignore"
+    excludes.write_text("logs/\n")
+    (tmp_path / "gitconfig").write_text(f"[core]\n\texcludesFile = {excludes}\n")
+    return root
+
+
+def _all_paths(root: Path):
+    paths = []
+    for path in sorted(root.rglob("*")):
+        rel = path.relative_to(root).as_posix()
+        if rel != ".git" and not rel.startswith(".git/"):
+            paths.append((rel, path.is_dir()))
+    return paths
+
+
+def test_rules_agree_with_git_check_ignore(worktree):
+    paths = _all_paths(worktree)
+    output = _git(
+        worktree,
+        "check-ignore",
+        "--no-index",
+        "--stdin",
+        stdin="".join(f"{p}\n" for p, _ in paths),
+    )
+    expected = set(output.splitlines())
+
+    rules = IgnoreRules.for_worktree(worktree)
+
+    assert {p for p, is_dir in paths if rules.is_ignored(p, is_dir)} == expected
+    # Sanity: the tree exercises every source.
+    assert {"debug.log", "build", "dist", "src/other.log", "src/tmp"} <= expected
+    assert {"web/app.css", "web/lib/style.css"} <= expected
+    assert {"vendor/pkg/mod.py", "logs"} <= expected
+    assert expected.isdisjoint(
+        {"src/debug.log", "src/dist", "src/lib/readme.txt", "web/lib/util.js"}
+    )
+
+
+@pytest.mark.parametrize(
+    "patterns, ignored, kept",
+    [
+        ("*\n!*/\n!*.js\n", ["style.css", "lib/style.css"], ["lib", "lib/a.js"]),
+        ("a/*\n", ["a/b", "a/b/c"], ["a", "b/a/c"]),
+        ("src/**/\n", ["src/x/y.py"], ["src", "src/y.py"]),
+        ("**/cache\n/*.tmp\n", ["cache", "x/cache/f", "a.tmp"], ["x/a.tmp"]),
+        ("[ab\n*.py\n", ["c.py"], ["[ab"]),
+    ],
+)
+def test_rules_without_git(tmp_path, patterns, ignored, kept):
+    # Cases git check-ignore settles; pinned here independently of pathspec.
+    (tmp_path / ".gitignore").write_text(patterns)
+    rules = IgnoreRules(tmp_path)
+
+    for path in ignored:
+        assert rules.is_ignored(path), path
+    for path in kept:
+        assert not rules.is_ignored(path, is_dir="." not in path), path
+
+
+def test_ignored_directory_cannot_be_reincluded(tmp_path):
+    (tmp_path / ".gitignore").write_text("build/\n!build/keep.py\n")
+
+    rules = IgnoreRules(tmp_path)
+
+    assert rules.is_ignored("build/keep.py")
+    assert rules.is_ignored("build", is_dir=True)
+    assert not rules.is_ignored("src/keep.py")
+
+
+def test_nested_gitignore_is_read_once(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / ".gitignore").write_text("*.tmp\n")
+    rules = IgnoreRules(tmp_path)
+
+    assert rules.is_ignored("pkg/a.tmp")
+    (tmp_path / "pkg" / ".gitignore").write_text("")
+    assert rules.is_ignored("pkg/b.tmp")
+    assert not rules.is_ignored("a.tmp")
+    assert rules.gitignore_count == 1
+
+
+def test_stale_when_exclude_file_changes(tmp_path):
+    exclude = tmp_path / "exclude"
+    exclude.write_text("*.tmp\n")
+    rules = IgnoreRules(tmp_path, [exclude])
+    assert rules.is_ignored("a.tmp")
+    assert not rules.stale()
+
+    exclude.unlink()
+
+    assert rules.stale()
+
+
+def test_global_excludes_file_defaults_to_xdg(tmp_path, monkeypatch):
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(tmp_path / "missing"))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path))
+
+    assert global_excludes_file() == tmp_path / "git" / "ignore"
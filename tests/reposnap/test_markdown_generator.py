@@ -81,3 +81,184 @@ def test_generate_markdown_structure_only(markdown_generator_factory):
     expected_content = "".join(expected_calls)
 
     assert output_content == expected_content
+
+
+def test_generate_markdown_to_sink_matches_file(resources_dir, tmp_path):
+    import io
+
+    files = [Path("existing_file.py"), Path("another_existing_file.py")]
+    tree = {"existing_file.py": None, "another_existing_file.py": None}
+
+    to_file = MarkdownGenerator(
+        root_dir=resources_dir, output_file=tmp_path / "out.md", buffer_size=16
+    )
+    to_file.generate_markdown(tree, files)
+
+    sink = io.StringIO()
+    to_sink = MarkdownGenerator(
+        root_dir=resources_dir, output_file=tmp_path / "unused.md", sink=sink
+    )
+    to_sink.generate_markdown(tree, files)
+
+    assert sink.getvalue() == to_file.output_file.read_text()
+    assert not (tmp_path / "unused.md").exists()
+    assert not sink.closed
+
+
+def test_output_opened_once_per_run(resources_dir, tmp_path, monkeypatch):
+    output_file = tmp_path / "output.md"
+    opened = []
+    original_open = Path.open
+
+    def tracking_open(self, *args, **kwargs):
+        if self == output_file:
+            opened.append(args)
+        return original_open(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "open", tracking_open)
+    generator = MarkdownGenerator(root_dir=resources_dir, output_file=output_file)
+    generator.generate_markdown(
+        {}, [Path("existing_file.py"), Path("another_existing_file.py")]
+    )
+
+    assert len(opened) == 1
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_parallel_read_keeps_order(tmp_path, jobs):
+    root = tmp_path / "root"
+    root.mkdir()
+    files = []
+    for i in range(50):
+        (root / f"f{i:02d}.txt").write_text(f"content {i}\n" * (i + 1))
+        files.append(Path(f"f{i:02d}.txt"))
+    files.insert(10, Path("missing.txt"))
+    (root / "bad.txt").write_bytes(b"\xff\xfe\xfa")
+    files.insert(20, Path("bad.txt"))
+
+    serial = MarkdownGenerator(root_dir=root, output_file=tmp_path / "serial.md")
+    serial.generate_markdown({}, files)
+    parallel = MarkdownGenerator(
+        root_dir=root,
+        output_file=tmp_path / f"parallel_{jobs}.md",
+        jobs=jobs,
+        max_inflight_bytes=64,
+    )
+    parallel.generate_markdown({}, files)
+
+    assert parallel.output_file.read_text() == serial.output_file.read_text()
+    assert "missing.txt" not in serial.output_file.read_text()
+    assert "bad.txt" not in serial.output_file.read_text()
+
+
+def test_incremental_rewrites_only_changed_sections(tmp_path):
+    import os
+
+    root = tmp_path / "root"
+    root.mkdir()
+    for name in ("a.py", "b.txt", "c.txt"):
+        (root / name).write_text(f"{name} v1\n")
+        os.utime(root / name, ns=(10**18, 10**18))
+    files = [Path("a.py"), Path("b.txt"), Path("c.txt")]
+    output_file = tmp_path / "output.md"
+
+    def generate(**kwargs):
+        generator = MarkdownGenerator(
+            root_dir=root, output_file=output_file, incremental=True, **kwargs
+        )
+        generator.generate_markdown({"a.py": None}, files)
+        return output_file.read_text()
+
+    generate()
+    assert (tmp_path / "output.md.manifest.json").exists()
+
+    (root / "b.txt").write_text("b.txt v2, longer\n")
+    read = []
+    original = MarkdownGenerator._read_file
+
+    def tracking_read(file_path, *args):
+        read.append(file_path.name)
+        return original(file_path, *args)
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(MarkdownGenerator, "_read_file", staticmethod(tracking_read))
+        incremental = generate()
+
+    assert read == ["b.txt"]
+    full = MarkdownGenerator(root_dir=root, output_file=tmp_path / "full.md")
+    full.generate_markdown({"a.py": None}, files)
+    assert incremental == full.output_file.read_text()
+
+
+def test_incremental_ignores_edited_output(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "a.txt").write_text("hello\n")
+    output_file = tmp_path / "output.md"
+    generator = MarkdownGenerator(
+        root_dir=root, output_file=output_file, incremental=True
+    )
+    generator.generate_markdown({}, [Path("a.txt")])
+    output_file.write_text("garbage")
+
+    generator.generate_markdown({}, [Path("a.txt")])
+
+    assert "hello" in output_file.read_text()
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_binary_and_oversized_files_get_placeholders(tmp_path, jobs, caplog):
+    import io
+    import logging
+
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "text.py").write_text("print('ok')\r\n")
+    (root / "image.png").write_bytes(b"\x89PNG\r\n\x1a\n\0\0" + bytes(range(256)) * 10)
+    (root / "big.txt").write_text("x" * 5000)
+    files = [Path("big.txt"), Path("image.png"), Path("text.py")]
+    reads = []
+    original_open = Path.open
+
+    class TrackingFile:
+        def __init__(self, path, fh):
+            self.path, self.fh = path, fh
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.fh.close()
+
+        def fileno(self):
+            return self.fh.fileno()
+
+        def read(self, *args):
+            data = self.fh.read(*args)
+            reads.append((self.path.name, len(data)))
+            return data
+
+    def tracking_open(self, mode="r", *args, **kwargs):
+        fh = original_open(self, mode, *args, **kwargs)
+        return TrackingFile(self, fh) if mode == "rb" else fh
+
+    sink = io.StringIO()
+    generator = MarkdownGenerator(
+        root_dir=root,
+        output_file=tmp_path / "out.md",
+        sink=sink,
+        jobs=jobs,
+        max_file_size=4096,
+    )
+    with pytest.MonkeyPatch.context() as mp, caplog.at_level(logging.DEBUG):
+        mp.setattr(Path, "open", tracking_open)
+        generator.generate_markdown({}, files)
+    output = sink.getvalue()
+
+    assert "[oversized file, 5000 bytes (limit 4096): contents omitted]\n" in output
+    assert "[binary file, 2570 bytes: contents omitted]\n" in output
+    assert "```python\nprint('ok')\n```" in output
+    assert "big.txt" not in {name for name, _ in reads}
+    assert max(size for name, size in reads if name == "image.png") <= 1024
+    assert generator.read_stats.counts == {"binary": 1, "oversized": 1, "text": 1}
+    assert "File reads: classified 3 files" in caplog.text
@@ -0,0 +1,106 @@
+# tests/reposnap/test_metrics.py
+
+import json
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+from reposnap.controllers.project_controller import ProjectController
+from reposnap.core.file_system import FileSystem
+from reposnap.core.metrics import Metrics
+from reposnap.interfaces.cli import build_parser, main
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "repo"
+    (root / "src").mkdir(parents=True)
+    (root / ".gitignore").write_text("*.log\n")
+    (root / "README.md").write_text("hello\n")
+    (root / "debug.log").write_text("noise\n")
+    (root / "src" / "a.py").write_text("import os\n")
+    (root / "src" / "b.py").write_text("x = 1\n")
+    return root
+
+
+def test_stages_add_up_and_format():
+    metrics = Metrics()
+    with metrics.stage("collect") as stage:
+        stage.files_out = 3
+    with metrics.stage("collect"):
+        pass
+    metrics.record("filter", files_in=3, files_out=1)
+
+    assert list(metrics.stages) == ["collect", "filter"]
+    assert metrics.stages["collect"].seconds > 0
+    assert metrics.stages["filter"].seconds is None
+    table = metrics.format("table").splitlines()
+    assert table[0].split() == [
+        "stage",
+        "ms",
+        "files",
+        "in",
+        "files",
+        "out",
+        "read",
+        "written",
+        "hits",
+    ]
+    assert table[2].split() == ["filter", "-", "3", "1", "-", "-", "-"]
+    assert table[-1].startswith("total")
+    data = json.loads(metrics.format("json"))
+    assert data["stages"][1] == {
+        "name": "filter",
+        "seconds": None,
+        "files_in": 3,
+        "files_out": 1,
+        "bytes_read": None,
+        "bytes_written": None,
+        "cache_hits": None,
+    }
+
+
+def test_run_records_every_stage(root, monkeypatch):
+    monkeypatch.chdir(root)
+    output = root.parent / "out.md"
+    args = build_parser().parse_args(["-S", "import", "-o", str(output), "."])
+    controller = ProjectController(args)
+    controller.run()
+
+    stages = controller.metrics.stages
+    assert [name for name in stages if not name.startswith("path filters/")] == [
+        "collect",
+        "path filters",
+        "contains",
+        "tree",
+        "render",
+    ]
+    assert stages["collect"].files_out == 5
+    assert stages["path filters/.gitignore"].files_in == 5
+    assert stages["path filters/.gitignore"].files_out == 4
+    assert (stages["contains"].files_in, stages["contains"].files_out) == (4, 1)
+    assert stages["render"].files_in == 1
+    assert stages["render"].bytes_read == len("import os\n")
+    assert stages["render"].bytes_written == output.stat().st_size
+
+
+def test_cli_profile_prints_json_to_stderr(root, monkeypatch, capsys):
+    monkeypatch.chdir(root)
+    monkeypatch.setattr(
+        sys, "argv", ["reposnap", "--no-daemon", "--profile", "json", "-o", "-", "."]
+    )
+    main()
+    captured = capsys.readouterr()
+    assert captured.out.startswith("# Project Structure")
+    report = json.loads(captured.err[captured.err.index("{") :])
+    assert "render" in [stage["name"] for stage in report["stages"]]
+
+
+def test_tree_structure_is_not_formatted_for_debug_logs(caplog):
+    files = [Path(f"d/f{i}.py") for i in range(3)]
+    with caplog.at_level(logging.DEBUG, logger="reposnap.core.file_system"):
+        FileSystem(Path(".")).build_tree_structure(files)
+    assert "f0.py" not in caplog.text
+    assert "3 files" in caplog.text
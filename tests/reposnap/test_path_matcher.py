@@ -0,0 +1,114 @@
+# tests/reposnap/test_path_matcher.py
+
+import itertools
+
+import pathspec
+import pytest
+
+from reposnap.core.path_matcher import PathMatcher, compile_matcher
+from reposnap.models.file_tree import FileTree
+
+PATHS = [
+    "a.py",
+    "x.log",
+    "keep.log",
+    ".env",
+    "build",
+    "build/out.o",
+    "src/build/out.o",
+    "src/a.py",
+    "src/a.pyc",
+    "src/pkg/module.py",
+    "node_modules/lib/index.js",
+    "pkg.egg-info/PKG-INFO",
+    "dist/pkg-1.0.tar.gz",
+    "docs/index.md",
+    "docs/docs",
+    "a/b",
+    "a/x/y/b",
+    "foo.bar/baz.txt",
+]
+
+PATTERN_SETS = [
+    [],
+    ["*.log"],
+    ["build/", "node_modules", ".env", "*.egg-info/", "*.tar.gz"],
+    ["/build", "src/*.py", "a/**/b", "*.py[co]", "docs/"],
+    ["*.log", "!keep.log"],
+    ["*", "!*.py", "!src/"],
+    ["*foo*", "**/module.py", "# comment", "", "*."],
+    ["*/", "!docs/"],
+    ["**"],
+    ["a/*", "src/**", "docs/**/", "[ab].py", "?.py", "/**", "**/"],
+    ["*", "!a/**/b", "!*.[lo]*", "!src/*/", "!\\#x"],
+]
+
+
+def spec_for(patterns):
+    return pathspec.PathSpec.from_lines(pathspec.patterns.GitWildMatchPattern, patterns)
+
+
+@pytest.mark.parametrize("patterns", PATTERN_SETS)
+def test_matcher_agrees_with_pathspec(patterns):
+    spec = spec_for(patterns)
+    matcher = PathMatcher(patterns)
+
+    for path in PATHS:
+        assert matcher.match_file(path) == spec.match_file(path), path
+
+
+def test_matcher_agrees_with_pathspec_on_pattern_orders():
+    patterns = ["*.log", "!keep.log", "build/", "!build/", "src/", "*.py"]
+    for order in itertools.permutations(patterns, 3):
+        spec = spec_for(order)
+        matcher = PathMatcher(order)
+        for path in PATHS:
+            assert matcher.match_file(path) == spec.match_file(path), (order, path)
+
+
+def test_names_and_extensions_use_hash_index():
+    matcher = PathMatcher(["node_modules", "build/", "*.tar.gz", "*.egg-info/"])
+
+    assert matcher.names == {"node_modules"}
+    assert matcher.dir_names == {"build"}
+    assert matcher.suffixes == {".tar.gz"}
+    assert matcher.dir_suffixes == {".egg-info"}
+    assert matcher._regex is None
+
+
+def test_exact_mode_matches_the_path_itself():
+    matcher = PathMatcher(["*", "!*/", "!*.js", "src/**", "a/**/"], exact=True)
+
+    assert matcher.decide("lib/") is False
+    assert matcher.decide("style.css") is True
+    assert matcher.decide("util.js") is False
+    assert matcher.decide("src/") is False
+    assert matcher.decide("src/x") is True
+    assert matcher.decide("a/b") is True
+    assert matcher.decide("a/b/") is True
+    assert PathMatcher(["a/**/"], exact=True).decide("a/b") is None
+
+
+def test_invalid_patterns_raise_unless_exact():
+    with pytest.raises(ValueError):
+        PathMatcher(["[ab", "*.py"])
+    assert PathMatcher(["[ab", "*.py", "x\\"], exact=True).match_file("a.py")
+
+
+def test_compile_matcher_is_cached():
+    first = compile_matcher(["*.log", "build/"])
+
+    assert compile_matcher(("*.log", "build/")) is first
+    assert compile_matcher(["build/", "*.log"]) is not first
+
+
+def test_file_tree_filters_with_path_matcher():
+    compact = FileTree.from_paths(PATHS)
+    legacy = FileTree.from_paths(PATHS)
+    assert "src" in legacy.structure  # switches to the dict backend
+    patterns = ["*.log", "!keep.log", "build/", "*.pyc"]
+
+    compact.filter_files(compile_matcher(patterns))
+    legacy.filter_files(spec_for(patterns))
+
+    assert compact.get_all_files() == legacy.get_all_files()
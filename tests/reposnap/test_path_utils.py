@@ -9,3 +9,10 @@ def test_format_tree():
     formatted = "".join(format_tree(tree))
     expected = "dir1/\n    file1.py\nfile2.py\n"
     assert formatted == expected
+
+
+def test_format_tree_markers():
+    tree = {"dir1": {"file1.py": "file1.py"}, "file2.py": "file2.py"}
+    markers = {"dir1/file1.py": "  [skipped]"}
+    formatted = "".join(format_tree(tree, markers=markers))
+    assert formatted == "dir1/\n    file1.py  [skipped]\nfile2.py\n"
@@ -0,0 +1,53 @@
+# tests/reposnap/test_pipeline.py
+
+from pathlib import Path
+
+from reposnap.core.pipeline import CollectionPipeline, PrefixRouter
+
+
+def test_pipeline_counts_each_stage_once():
+    seen = []
+
+    def include(path):
+        seen.append(path)
+        return path.endswith(".py")
+
+    pipeline = CollectionPipeline()
+    pipeline.add_filter("include", include)
+    pipeline.add_filter("exclude", lambda path: not path.startswith("tests/"))
+
+    kept = pipeline.run(["a.py", "b.md", "tests/t.py", "c.py"])
+    pipeline.record("contains", len(kept), 1)
+
+    assert kept == ["a.py", "c.py"]
+    assert seen == ["a.py", "b.md", "tests/t.py", "c.py"]
+    assert [(c.name, c.seen, c.kept) for c in pipeline.counters()] == [
+        ("include", 4, 3),
+        ("exclude", 3, 2),
+        ("contains", 2, 1),
+    ]
+    assert pipeline.summary() == (
+        "listed 4 -> include 3 (-1) -> exclude 2 (-1) -> contains 1 (-1)"
+    )
+
+
+def test_pipeline_groups_survivors_by_input_bucket():
+    pipeline = CollectionPipeline(PrefixRouter(["src", "README.md"]))
+    files = [Path(p) for p in ["README.md", "docs/x.md", "src/a.py", "src/b.py"]]
+
+    kept = pipeline.run(files, key=Path.as_posix)
+
+    assert kept == [Path("src/a.py"), Path("src/b.py"), Path("README.md")]
+    assert (pipeline.route_counter.seen, pipeline.route_counter.kept) == (4, 3)
+
+
+def test_prefix_router_picks_first_containing_input():
+    route = PrefixRouter(["src/pkg/mod.py", "docs", "src", "src/pkg"])
+
+    assert route("src/pkg/mod.py") == 0
+    assert route("src/pkg/other.py") == 2
+    assert route("src/main.py") == 2
+    assert route("docs/index.md") == 1
+    assert route("docs") == 1
+    assert route("srcx/a.py") is None
+    assert route("README.md") is None
@@ -0,0 +1,86 @@
+# tests/reposnap/test_profiling.py
+
+import pstats
+import sys
+import time
+
+import pytest
+
+from reposnap.controllers.project_controller import ProjectController
+from reposnap.core.profiling import StackSampler, profile_call
+from reposnap.interfaces import cli
+from reposnap.interfaces.cli import main
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "repo"
+    (root / "src").mkdir(parents=True)
+    for i in range(20):
+        (root / "src" / f"m{i}.py").write_text(f"value = {i}\n" * 50)
+    return root
+
+
+def _busy_loop():
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampler_collapses_stacks_of_other_threads(tmp_path):
+    out = tmp_path / "run.folded"
+    profile_call(_busy_loop, out)
+
+    lines = out.read_text().splitlines()
+    assert lines
+    stack, _, count = lines[0].rpartition(" ")
+    assert int(count) > 0
+    assert stack.startswith("MainThread;")
+    assert any("test_profiling._busy_loop" in line for line in lines)
+    assert not any("reposnap-sampler" in line for line in lines)
+
+
+def test_sampler_writes_profile_when_the_call_fails(tmp_path):
+    def fail():
+        raise RuntimeError("boom")
+
+    out = tmp_path / "run.collapsed"
+    with pytest.raises(RuntimeError):
+        profile_call(fail, out)
+    assert out.exists()
+
+    sampler = StackSampler()
+    sampler.sample()
+    assert sampler.samples == 1 and sampler.stacks
+
+
+def test_cli_profile_out_writes_pstats(root, tmp_path, monkeypatch):
+    monkeypatch.chdir(root)
+    out = tmp_path / "run.prof"
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "reposnap",
+            "-j",
+            "4",
+            "-o",
+            str(tmp_path / "o.md"),
+            "--profile-out",
+            str(out),
+            ".",
+        ],
+    )
+    jobs = []
+
+    def controller(args):
+        jobs.append(args.jobs)
+        return ProjectController(args)
+
+    monkeypatch.setattr(cli, "ProjectController", controller)
+    main()
+
+    functions = {name for _, _, name in pstats.Stats(str(out)).stats}
+    assert {"run", "_write_single_file", "_read_file"} <= functions
+    # cProfile records one thread, so the reads must not go to a pool.
+    assert jobs == [1]
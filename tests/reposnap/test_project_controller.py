@@ -429,3 +429,105 @@ def test_project_controller_changes_only_false():
                 # Verify get_git_files was called instead of get_uncommitted_files
                 mock_git_repo.get_git_files.assert_called_once()
                 mock_git_repo.get_uncommitted_files.assert_not_called()
+
+
+def test_project_controller_cache_reuses_clean_files():
+    """Second cached run serves clean tracked files without reading them."""
+    import subprocess
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        create_directory_structure(
+            temp_dir,
+            {"a.py": "import os\n", "b.py": "print('b')\n", ".gitignore": "*.md\n"},
+        )
+        for cmd in (
+            ["git", "init", "-q"],
+            ["git", "add", "."],
+            ["git", "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", "i"],
+        ):
+            subprocess.run(cmd, cwd=temp_dir, check=True)
+        args = type(
+            "Args",
+            (object,),
+            {
+                "paths": [],
+                "output": os.path.join(temp_dir, "output.md"),
+                "structure_only": False,
+                "include": [],
+                "exclude": [],
+                "contains": ["import"],
+                "cache": True,
+            },
+        )
+
+        def run():
+            with patch(
+                "reposnap.controllers.project_controller.ProjectController._get_repo_root",
+                return_value=Path(temp_dir),
+            ):
+                ProjectController(args).run()
+            with open(args.output) as f:
+                return f.read()
+
+        first = run()
+        assert (Path(temp_dir) / ".git" / "reposnap" / "cache.sqlite3").exists()
+        with patch(
+            "reposnap.core.markdown_generator.MarkdownGenerator._read_file"
+        ) as read_file, patch(
+            "reposnap.core.content_search.file_matches"
+        ) as file_matches:
+            second = run()
+        read_file.assert_not_called()
+        file_matches.assert_not_called()
+        assert second == first
+        assert "import os" in second and "print('b')" not in second
+
+
+def test_collect_file_tree_searches_contents_of_survivors_only():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        create_directory_structure(
+            temp_dir,
+            {
+                ".gitignore": "*.log\n",
+                "a.py": "import os\n",
+                "b.txt": "import sys\n",
+                "debug.log": "import nothing\n",
+                "docs": {"c.py": "import re\n"},
+            },
+        )
+        args = MagicMock(
+            paths=[],
+            output=os.path.join(temp_dir, "output.md"),
+            structure_only=True,
+            include=["*.py", "*.log"],
+            exclude=["docs"],
+            changes=False,
+            contains=["import"],
+            contains_case=False,
+            contains_max_size=None,
+            jobs=1,
+            cache=False,
+            incremental=False,
+            rev=None,
+            since=None,
+            range=None,
+        )
+        with patch(
+            "reposnap.controllers.project_controller.ProjectController._get_repo_root",
+            return_value=Path(temp_dir),
+        ), patch(
+            "reposnap.core.content_search.filter_files_by_content",
+            side_effect=lambda files, *a, **k: list(files),
+        ) as search:
+            controller = ProjectController(args)
+            controller.collect_file_tree()
+
+        assert search.call_args[0][0] == [Path(temp_dir).resolve() / "a.py"]
+        assert controller.file_tree.get_all_files() == [Path("a.py")]
+        counts = {
+            c.name: (c.seen, c.kept) for c in controller.collection_pipeline.counters()
+        }
+        assert counts["include"][1] == 3
+        assert counts["exclude"] == (3, 2)
+        assert counts[".gitignore"] == (2, 1)
+        assert counts["contains"] == (1, 1)
@@ -0,0 +1,113 @@
+# tests/reposnap/test_tokens.py
+
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+from reposnap.controllers.project_controller import ProjectController
+from reposnap.core.cache import SnapshotCache
+from reposnap.core.markdown_generator import MarkdownGenerator
+from reposnap.core.tokens import STRUCTURE_ROW, TokenStats, get_tokenizer
+from reposnap.interfaces.cli import build_parser
+
+
+@pytest.fixture
+def word_tokenizer(monkeypatch):
+    """Register ``fake_tok:words`` (whitespace split) and record its calls."""
+    calls = []
+    module = types.ModuleType("fake_tok")
+
+    def words(text):
+        calls.append(text)
+        return text.split()
+
+    module.words = words
+    monkeypatch.setitem(sys.modules, "fake_tok", module)
+    return calls
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "repo"
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "README.md").write_text("one two three\n")
+    (root / "src" / "a.py").write_text("x = 1\n")
+    (root / "src" / "pkg" / "b.py").write_text("y = 2\nz = 3\n")
+    return root
+
+
+FILES = [Path("README.md"), Path("src/a.py"), Path("src/pkg/b.py")]
+TREE = {"README.md": None, "src": {"a.py": None, "pkg": {"b.py": None}}}
+
+
+def generate(root, output, stats, incremental=False):
+    generator = MarkdownGenerator(
+        root_dir=root, output_file=output, token_stats=stats, incremental=incremental
+    )
+    generator.generate_markdown(TREE, FILES)
+    return stats
+
+
+def test_get_tokenizer(word_tokenizer):
+    assert get_tokenizer().count("abcdefghi") == 3
+    assert not get_tokenizer("bytes").cacheable
+    assert get_tokenizer("fake_tok:words").count("a b c") == 3
+    for spec in ("nope", "fake_tok:missing", "no_such_module:f"):
+        with pytest.raises(ValueError):
+            get_tokenizer(spec)
+
+
+def test_stats_cover_the_whole_output(root, tmp_path):
+    output = tmp_path / "out.md"
+    stats = generate(root, output, TokenStats(get_tokenizer()))
+
+    assert stats.total[1] == output.stat().st_size
+    assert set(stats.rows) == {STRUCTURE_ROW, "README.md", "src/a.py", "src/pkg/b.py"}
+    dirs = stats.directory_totals()
+    assert set(dirs) == {"src", "src/pkg"}
+    assert dirs["src"][0] == stats.rows["src/a.py"][0] + stats.rows["src/pkg/b.py"][0]
+
+    report = stats.format_report().splitlines()
+    assert [line[25:] for line in report[1:-1]] == [
+        STRUCTURE_ROW,
+        "README.md",
+        "src/",
+        "src/a.py",
+        "src/pkg/",
+        "src/pkg/b.py",
+    ]
+    assert report[-1].endswith("total (bytes)")
+
+
+def test_counts_are_cached_by_content(root, tmp_path, word_tokenizer):
+    tokenizer = get_tokenizer("fake_tok:words")
+    cache = SnapshotCache(tmp_path / "cache.sqlite3")
+    first = generate(root, tmp_path / "out.md", TokenStats(tokenizer, cache))
+    assert len(word_tokenizer) == 4
+    cache.close()
+
+    word_tokenizer.clear()
+    (root / "src" / "a.py").write_text("x = 10\n")
+    cache = SnapshotCache(tmp_path / "cache.sqlite3")
+    second = generate(root, tmp_path / "out.md", TokenStats(tokenizer, cache), True)
+    cache.close()
+
+    assert len(word_tokenizer) == 1 and "x = 10" in word_tokenizer[0]
+    assert second.rows["README.md"] == first.rows["README.md"]
+
+
+def test_controller_stats(root, monkeypatch):
+    monkeypatch.chdir(root)
+    args = build_parser().parse_args(["--stats", "--structure-only", str(root)])
+    controller = ProjectController(args)
+    controller.run()
+
+    assert set(controller.token_stats.rows) == {STRUCTURE_ROW}
+
+
+def test_cli_rejects_unknown_tokenizer(capsys):
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(["--tokenizer", "nope", "."])
+    assert "Unknown tokenizer" in capsys.readouterr().err